@@ -17,3 +17,4 @@ from .sequence.alphabets import Alphabet
 from .sequence import Sequence, NucleicAcid
 from .sequence import DNA, RNA, Peptide, Primer, RestrictionSite, ssDNA
 from .sequence import Feature
+from .sequence import SequenceBatch
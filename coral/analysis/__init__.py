@@ -1,3 +1,6 @@
 '''Analyze sequences.'''
-from .anneal import anneal, PrimerLengthError
+from .anneal import anneal, anneal_many, PrimerLengthError
 from .repeats import repeats
+from .sequence_index import SequenceIndex
+from .pattern_set import PatternSet
+from .mispriming import mispriming, MisprimingSite
@@ -1,4 +1,6 @@
 '''Primer Annealing Event Simulation.'''
+import multiprocessing
+import coral as cr
 
 
 class PrimerLengthError(Exception):
@@ -44,88 +46,131 @@ def anneal(template, primer, min_tm=50.0, min_len=10):
         msg = 'Template is shorter than the min_len argument.'
         raise AnnealError(msg)
 
-    # Strategy: locate all min-length matches, then extend them until they
-    # no longer match. This provides an advantage over the previous strategy of
-    # updating a dictionary with indices from coral.DNA.locate() as keys, as
-    # the latter's indices may actually move for a given primer as it passes
-    # over the origin
-    def update_match_linear(base, location_length, anneal_seq):
-        '''Increase the location and length of binding site, if applicable.'''
-        # TODO: this is very inefficient - should stop updating once the first
-        # mismatch occurs.
-        location, length = location_length
+    # Strategy: locate all min-length matches of the primer's 3' end (the
+    # seed), then extend each one base at a time towards the primer's 5' end
+    # until the first mismatch. Locating only the seed provides an advantage
+    # over updating a dictionary with indices from coral.DNA.locate() as
+    # keys, as the latter's indices may actually move for a given primer as
+    # it passes over the origin
+    primer_seq = str(primer.to_ds())
+    seed = primer_seq[-min_len:]
+    strands = [str(template.top), str(template.bottom)]
+    min_anneal_len = _min_anneal_length(primer_seq, min_tm)
+    return _bind(template, strands, primer_seq, template.locate(seed),
+                 min_len, min_anneal_len)
+
+
+def anneal_many(template, primers, min_tm=50.0, min_len=10, processes=None):
+    '''Simulate the binding of many primers to one template. The template
+    is searched for the 3' ends of every primer in a single pass over each
+    strand, rather than once per primer.
+
+    :param template: DNA template for which to bind primers.
+    :type template: coral.DNA
+    :param primers: Primers to bind to template.
+    :type primers: list of coral.Primer
+    :param min_tm: The cutoff melting temperature for primer binding - a binder
+                   with a lower Tm will be rejected.
+    :type min_tm: float
+    :param min_len: The cutoff for bases required for binding - a binder with
+                    fewer bases will be rejected.
+    :type min_len: int
+    :param processes: Number of worker processes to split the primers
+                      between. By default, everything runs in this process.
+    :type processes: int
+    :returns: For each primer, its matches as returned by
+              coral.analysis.anneal.
+    :rtype: list
+    :raises: PrimerLengthError if a primer's length is too small.
+             AnnealError if the template is too short.
+
+    '''
+    primers = list(primers)
+    if processes is not None and processes > 1 and len(primers) > 1:
+        chunk_size = -(-len(primers) // processes)
+        args_list = [[template, primers[i:i + chunk_size], min_tm, min_len]
+                     for i in range(0, len(primers), chunk_size)]
+        pool = multiprocessing.Pool(processes)
+        try:
+            chunks = pool.map(run_anneal_many, args_list)
+        finally:
+            pool.close()
+            pool.join()
+        return [matches for chunk in chunks for matches in chunk]
+
+    primer_seqs = [str(primer.to_ds()) for primer in primers]
+    if any(len(primer_seq) < min_len for primer_seq in primer_seqs):
+        msg = 'Primer length is shorter than min_len argument.'
+        raise PrimerLengthError(msg)
+    if len(template) < min_len:
+        msg = 'Template is shorter than the min_len argument.'
+        raise AnnealError(msg)
+    if not primers:
+        return []
+
+    seeds = [primer_seq[-min_len:] for primer_seq in primer_seqs]
+    strands = [str(template.top), str(template.bottom)]
+    # Primers often share their 3' ends or are repeated
+    min_anneal_lens = {}
+    binding_data = []
+    for primer_seq, strand_locs in zip(primer_seqs,
+                                       template.locate_many(seeds)):
+        if primer_seq not in min_anneal_lens:
+            min_anneal_lens[primer_seq] = _min_anneal_length(primer_seq,
+                                                             min_tm)
+        binding_data.append(_bind(template, strands, primer_seq, strand_locs,
+                                  min_len, min_anneal_lens[primer_seq]))
+    return binding_data
 
-        if location == 0:
-            return location_length
-
-        location_next = location - 1
-        length_next = length + 1
-        seq = base[location_next:location_next + length_next]
-
-        if seq == anneal_seq:
-            return (location_next, length_next)
-        else:
-            return location_length
-
-    def update_match_circular(base, location_length, anneal_seq):
-        '''Increase the location and length of binding site, if applicable.'''
-        # TODO: this is very inefficient - should stop updating once the first
-        # mismatch occurs.
-        base_len = len(base)
-        location, length = location_length
-        if location == 0:
-            location_next = base_len - 1
-        else:
-            location_next = location - 1
-        length_next = length + 1
-
-        if (location_next + length_next) > base_len:
-            upstream = base[location_next:]
-            downstream = base[:length_next - (base_len - location_next)]
-            seq = upstream + downstream
-        else:
-            # No need to 'rotate' sequence
-            seq = base[location_next:location_next + length_next]
-
-        if seq == anneal_seq:
-            return (location_next, length_next)
-        else:
-            return location_length
-
-    if template.circular:
-        update_fun = update_match_circular
-    else:
-        update_fun = update_match_linear
 
+def run_anneal_many(args):
+    '''Run anneal_many using a 4-tuple of the arguments (in the same order).
+    Necessary to make picklable function for multiprocessing.'''
+    return anneal_many(*args)
+
+
+def _bind(template, strands, primer_seq, strand_locs, min_len,
+          min_anneal_len):
+    '''Extend the seed matches of a primer, keep the long enough ones, and
+    report them by their 3' ends (see anneal).
+
+    :param template: DNA template.
+    :type template: coral.DNA
+    :param strands: Top and bottom strand sequences of the template.
+    :type strands: list of str
+    :param primer_seq: Primer sequence.
+    :type primer_seq: str
+    :param strand_locs: Top and bottom strand locations of the seed.
+    :type strand_locs: list of lists of ints
+    :param min_len: Seed length.
+    :type min_len: int
+    :param min_anneal_len: Minimum length of a match to keep.
+    :type min_anneal_len: int
+    :returns: Top and bottom strand matches, as returned by anneal.
+    :rtype: list
+
+    '''
+    seed = primer_seq[-min_len:]
     # Maximum annealing length to test (can't exceed template length)
-    max_len = min(len(template), len(primer))
+    max_len = min(len(template), len(primer_seq))
 
-    primer_dna = primer.to_ds()
-    anneal_len = min_len
-    anneal_seq = primer_dna[-anneal_len:]
     binding_data = []
-    for k, strand_locs in enumerate(template.locate(anneal_seq)):
-        matches = zip(strand_locs, [min_len] * len(strand_locs))
-        for i in range(anneal_len + 1, max_len + 1):
-            anneal_seq = primer_dna[-i:]
-            for j, match in enumerate(matches):
-                if k == 0:
-                    matches[j] = update_fun(template.top, match, anneal_seq)
-                else:
-                    matches[j] = update_fun(template.bottom, match,
-                                            anneal_seq)
+    for strand, locations in zip(strands, strand_locs):
+        matches = []
+        for location in locations:
+            if 'N' in seed and \
+               _window(strand, location, min_len) != seed:
+                # Wildcard seeds only extend over exact matches
+                matches.append((location, min_len))
+                continue
+            matches.append(_extend(strand, primer_seq, location, min_len,
+                                   max_len, template.circular))
         binding_data.append(matches)
 
     # Now, filter out all the matches that are too short
-    for i in reversed(range(len(primer_dna) + 1)):
-        min_len = i + 1
-        tm = primer_dna[-min_len:].tm()
-        if tm < min_tm:
-            break
-
     for strand in binding_data:
         for i in reversed(range(len(strand))):
-            if strand[i][1] < min_len:
+            if strand[i][1] < min_anneal_len:
                 strand.pop(i)
 
     # Finally, adjust the position to be the 3' end
@@ -138,23 +183,66 @@ def anneal(template, primer, min_tm=50.0, min_len=10):
                 loc_new = loc_new - len(template)
             strand[i] = [loc_new, length]
 
-    # Overwriting dictionary keys ensures uniqueness
-    # fwd_matches = {}
-    # rev_matches = {}
-    # for i in range(len(primer) - min_len + 1)[::-1]:
-    #     primer_dna = primer.overhang + primer.anneal
-    #     annealing = primer_dna[i:]
-    #     anneal_temp = annealing.tm()
-    #     anneal_len = len(annealing)
-    #     if anneal_temp > min_tm:
-    #         p_matches = template.locate(annealing)
-    #         for match in p_matches[0]:
-    #             fwd_matches[match + anneal_len] = anneal_len
-    #         for match in p_matches[1]:
-    #             rev_matches[match + anneal_len] = anneal_len
-
-    # # Convert dictionaries to lists
-    # fwds = [[key, val] for key, val in fwd_matches.iteritems()]
-    # revs = [[key, val] for key, val in rev_matches.iteritems()]
-
     return binding_data
+
+
+def _window(strand, location, length):
+    '''Read part of a strand, continuing over the origin if necessary.'''
+    window = strand[location:location + length]
+    if len(window) < length:
+        window += strand[:length - len(window)]
+    return window
+
+
+def _extend(strand, primer_seq, location, length, max_len, circular):
+    '''Extend a match of the 3' end of a primer towards the primer's 5'
+    end, stopping at the first mismatch.
+
+    :param strand: Template strand sequence.
+    :type strand: str
+    :param primer_seq: Primer sequence.
+    :type primer_seq: str
+    :param location: Start of the match on the strand.
+    :type location: int
+    :param length: Length of the match.
+    :type length: int
+    :param max_len: Maximum length of the match.
+    :type max_len: int
+    :param circular: Whether the match can extend over the origin.
+    :type circular: bool
+    :returns: Start and length of the extended match.
+    :rtype: tuple of ints
+
+    '''
+    while length < max_len:
+        if location == 0:
+            if not circular:
+                break
+            location = len(strand)
+        if strand[location - 1] != primer_seq[-length - 1]:
+            break
+        location -= 1
+        length += 1
+    if location == len(strand):
+        location = 0
+    return location, length
+
+
+def _min_anneal_length(primer_seq, min_tm):
+    '''Find the shortest match length that is kept by anneal: the length of
+    the longest 3' end of the primer whose Tm is below min_tm (or 1 if there
+    is none). If the Tm of the full primer is below min_tm, no match is
+    kept.
+
+    :param primer_seq: Primer sequence.
+    :type primer_seq: str
+    :param min_tm: The cutoff melting temperature for primer binding.
+    :type min_tm: float
+    :returns: Minimum match length.
+    :rtype: int
+
+    '''
+    for length in reversed(range(1, len(primer_seq) + 2)):
+        if cr.thermo.tm(primer_seq[-length:]) < min_tm:
+            return length
+    return 1
@@ -0,0 +1,182 @@
+# -*- coding: utf-8
+'''Find sites where a primer can bind a template despite mismatches.'''
+import collections
+import string
+from math import log
+import numpy as np
+import coral as cr
+
+
+MisprimingSite = collections.namedtuple('MisprimingSite',
+                                        ['strand', 'location', 'mismatches',
+                                         'dg', 'score'])
+
+_COMPLEMENT = string.maketrans('ACGT', 'TGCA')
+
+# Number of bases at the 3' end of a primer where mismatches block extension
+_THREE_PRIME_WINDOW = 5
+
+
+def mispriming(template, primer, max_mismatches=3, min_dg=-10.0,
+               salt_conc=50, temperature=37.0, three_prime_penalty=4.0):
+    '''Find sites on both strands of a template where a primer can bind with
+    a few mismatches, ranked from most to least likely to prime. The intended
+    binding site (if any) is reported too, with no mismatches.
+
+    :param template: DNA template to search.
+    :type template: coral.DNA
+    :param primer: Primer (its annealing sequence is used) or sequence.
+    :type primer: coral.Primer, coral.ssDNA, or str
+    :param max_mismatches: Maximum number of mismatched bases in a site.
+    :type max_mismatches: int
+    :param min_dg: Sites that bind more weakly than this free energy of
+                   binding (kcal/mol) are rejected.
+    :type min_dg: float
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :param temperature: Temperature in °C at which to calculate free
+                        energies.
+    :type temperature: float
+    :param three_prime_penalty: Penalty (kcal/mol) for a mismatch at the 3'
+                                terminal base when ranking sites. Mismatches
+                                further in get linearly smaller penalties,
+                                down to none 5 bases from the 3' end.
+    :type three_prime_penalty: float
+    :returns: Binding sites, sorted by their scores. Each site gives its
+              strand (0 for top, 1 for bottom), the location on that strand
+              of the 3' end of the primer (as in coral.analysis.anneal), the
+              positions of mismatches counted from the 3' end of the primer
+              (0 is the 3' terminal base), the nearest-neighbor free energy
+              of binding (kcal/mol), and the score (free energy plus 3'
+              mismatch penalties - the lower, the likelier priming is).
+    :rtype: list of coral.analysis.MisprimingSite
+    :raises: ValueError if the primer is empty or max_mismatches is
+             negative.
+
+    '''
+    if isinstance(primer, cr.Primer):
+        primer = primer.anneal
+    seq = str(primer).upper()
+    if not seq:
+        raise ValueError('Cannot search for an empty primer.')
+    if max_mismatches < 0:
+        raise ValueError('max_mismatches must be at least 0.')
+
+    sites = []
+    for strand_index, strand in enumerate([template.top, template.bottom]):
+        text = str(strand)
+        n = len(text)
+        if template.circular and n:
+            # Sites can span the origin
+            n_starts = n
+            text = (text * (len(seq) // n + 2))[:n + len(seq) - 1]
+        else:
+            n_starts = n - len(seq) + 1
+
+        for start in _approximate_matches(text, seq, max_mismatches,
+                                          n_starts).tolist():
+            site = text[start:start + len(seq)]
+            dg = _duplex_dg(seq, site, salt_conc, temperature)
+            if dg > min_dg:
+                continue
+            mismatches = tuple(len(seq) - 1 - i for i in
+                               reversed(range(len(seq))) if
+                               site[i] != seq[i])
+            penalty = sum(max(_THREE_PRIME_WINDOW - distance, 0) for
+                          distance in mismatches)
+            score = dg + (three_prime_penalty * penalty /
+                          float(_THREE_PRIME_WINDOW))
+            if template.circular:
+                location = (start + len(seq) - 1) % n + 1
+            else:
+                location = start + len(seq)
+            sites.append(MisprimingSite(strand_index, location, mismatches,
+                                        dg, score))
+    sites.sort(key=lambda site: (site.score, site.strand, site.location))
+    return sites
+
+
+def _approximate_matches(text, pattern, max_mismatches, n_starts):
+    '''Find where a pattern matches a text with at most max_mismatches
+    mismatches. Each base of the pattern is compared with the text at every
+    start at once, beginning at the 3' end, and starts are dropped as soon as
+    they have too many mismatches.
+
+    :param text: Text to search.
+    :type text: str
+    :param pattern: Pattern to find.
+    :type pattern: str
+    :param max_mismatches: Maximum number of mismatches.
+    :type max_mismatches: int
+    :param n_starts: Only matches starting before this position count.
+    :type n_starts: int
+    :returns: Start of every match.
+    :rtype: numpy.ndarray
+
+    '''
+    if n_starts <= 0:
+        return np.zeros(0, dtype=np.int64)
+    text = np.frombuffer(text, dtype=np.uint8)
+    pattern = np.frombuffer(pattern, dtype=np.uint8)
+    # Compare a few bases against every start, after which few enough starts
+    # are left to index them individually
+    n_full = min(len(pattern), max_mismatches + 4)
+    counts = np.zeros(n_starts, dtype=np.int32)
+    for i in range(len(pattern) - n_full, len(pattern)):
+        counts += text[i:i + n_starts] != pattern[i]
+    starts = np.flatnonzero(counts <= max_mismatches)
+    counts = counts[starts]
+    for i in reversed(range(len(pattern) - n_full)):
+        counts += text[starts + i] != pattern[i]
+        kept = counts <= max_mismatches
+        starts = starts[kept]
+        counts = counts[kept]
+    return starts
+
+
+def _duplex_dg(seq, site, salt_conc, temperature):
+    '''Calculate the free energy of a primer bound to a site, using
+    SantaLucia 98 nearest-neighbor parameters and single mismatch
+    parameters. Stacks of two mismatches add nothing.
+
+    :param seq: Primer sequence.
+    :type seq: str
+    :param site: Template sequence at the site, in the same sense as the
+                 primer.
+    :type site: str
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :param temperature: Temperature in °C.
+    :type temperature: float
+    :returns: Free energy of binding (kcal/mol).
+    :rtype: float
+
+    '''
+    model = cr.thermo.get_model('santalucia98')
+    mismatch_params = cr.thermo.tm_params.SANTALUCIA_MISMATCHES
+    bottom = site.translate(_COMPLEMENT)
+    delta_h = 0
+    delta_s = 0
+    for i in range(len(seq) - 1):
+        top_pair = seq[i:i + 2]
+        matched = [site[i] == seq[i], site[i + 1] == seq[i + 1]]
+        if all(matched):
+            delta_h += model.pair_delta_h.get(top_pair, 0)
+            delta_s += model.pair_delta_s.get(top_pair, 0)
+        elif any(matched):
+            bottom_pair = bottom[i:i + 2]
+            stack = top_pair + '/' + bottom_pair
+            if stack not in mismatch_params['delta_h']:
+                # Read the duplex from the other strand
+                stack = bottom_pair[::-1] + '/' + top_pair[::-1]
+            delta_h += mismatch_params['delta_h'].get(stack, 0)
+            delta_s += mismatch_params['delta_s'].get(stack, 0)
+
+    gc_count = seq.count('G') + seq.count('C')
+    deltas = model.correct(seq[0] in 'GC', seq[-1] in 'GC', gc_count, False)
+    delta_h += deltas[0]
+    delta_s += deltas[1]
+    # Parameters are stored negated. SantaLucia 98 salt correction.
+    salt_adjustment = 0.368 * (len(seq) - 1) * log(salt_conc / 1e3)
+    entropy = -delta_s + salt_adjustment
+    return -delta_h - (temperature + 273.15) * entropy / 1e3
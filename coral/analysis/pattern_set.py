@@ -0,0 +1,181 @@
+'''Find many patterns in a sequence in a single pass.'''
+from collections import deque
+import coral as cr
+
+
+class PatternSet(object):
+    '''Aho-Corasick automaton for a set of patterns. Compile it once, then
+    find every pattern in a sequence (or many sequences) with one pass over
+    each strand.'''
+
+    def __init__(self, patterns, any_char='N'):
+        '''
+        :param patterns: Patterns to find.
+        :type patterns: list of str or coral.DNA
+        :param any_char: Character representing \'any\' in patterns.
+        :type any_char: str
+        :returns: coral.analysis.PatternSet instance.
+        :raises: ValueError if a pattern is empty.
+
+        '''
+        self.patterns = [str(pattern).upper() for pattern in patterns]
+        self.any_char = any_char
+
+        # Patterns with wildcards are found through their longest exact
+        # fragment (the anchor), then checked in full
+        keywords = {}
+        self._anchored = []
+        self._unanchored = []
+        for i, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError('Cannot search for an empty pattern.')
+            fragments = pattern.split(any_char)
+            anchor = max(fragments, key=len)
+            if not anchor:
+                # Only wildcards - matches anywhere
+                self._unanchored.append(i)
+                continue
+            offset = 0
+            for fragment in fragments:
+                if fragment == anchor:
+                    break
+                offset += len(fragment) + 1
+            keyword_id = keywords.setdefault(anchor, len(keywords))
+            self._anchored.append((keyword_id, i, offset))
+
+        self._keywords = sorted(keywords, key=keywords.get)
+        self._targets = [[] for _ in self._keywords]
+        for keyword_id, i, offset in self._anchored:
+            self._targets[keyword_id].append((i, offset))
+        self._compile()
+
+    def _compile(self):
+        '''Build the automaton as a table of state transitions.'''
+        symbols = sorted(set(''.join(self._keywords)))
+        # Characters that aren't in any keyword are all mapped to the last
+        # column, which always leads back to the root
+        encoding = [chr(len(symbols))] * 256
+        for i, symbol in enumerate(symbols):
+            encoding[ord(symbol)] = chr(i)
+        self._encoding = ''.join(encoding)
+        n_symbols = len(symbols) + 1
+        codes = dict((symbol, i) for i, symbol in enumerate(symbols))
+
+        # Trie of keywords
+        goto = [{}]
+        outputs = [[]]
+        for keyword_id, keyword in enumerate(self._keywords):
+            state = 0
+            for char in keyword:
+                code = codes[char]
+                if code not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][code] = len(goto) - 1
+                state = goto[state][code]
+            outputs[state].append(keyword_id)
+
+        # Resolve failure links breadth-first into a full transition table
+        transitions = [None] * len(goto)
+        transitions[0] = [goto[0].get(column, 0) for column in
+                          range(n_symbols)]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            row = list(transitions[fail[state]])
+            for code, child in goto[state].items():
+                fail[child] = transitions[fail[state]][code] if state else 0
+                row[code] = child
+                queue.append(child)
+            transitions[state] = row
+            outputs[state] = outputs[state] + outputs[fail[state]]
+        self._transitions = transitions
+        self._outputs = [tuple(output) for output in outputs]
+
+    def _scan(self, text, n_starts):
+        '''Find every pattern in a text.
+
+        :param text: Text to search.
+        :type text: str
+        :param n_starts: Only matches starting before this position count.
+        :type n_starts: int
+        :returns: Sorted start positions for each pattern.
+        :rtype: list of lists of ints
+
+        '''
+        hits = [[] for _ in self.patterns]
+        keyword_hits = [[] for _ in self._keywords]
+        # Map characters to columns of the transition table
+        encoded = bytearray(text.translate(self._encoding))
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for end, code in enumerate(encoded, 1):
+            state = transitions[state][code]
+            if outputs[state]:
+                for keyword_id in outputs[state]:
+                    keyword_hits[keyword_id].append(end)
+
+        for keyword_id, ends in enumerate(keyword_hits):
+            keyword_length = len(self._keywords[keyword_id])
+            for i, offset in self._targets[keyword_id]:
+                pattern = self.patterns[i]
+                exact = len(pattern) == keyword_length
+                for end in ends:
+                    start = end - keyword_length - offset
+                    if start < 0 or start >= n_starts or \
+                       start + len(pattern) > len(text):
+                        continue
+                    if exact or self._matches(text, start, pattern):
+                        hits[i].append(start)
+        for i in self._unanchored:
+            last = min(n_starts, len(text) - len(self.patterns[i]) + 1)
+            hits[i] = range(last)
+        return hits
+
+    def _matches(self, text, start, pattern):
+        '''Check a pattern with wildcards at a position of the text.'''
+        for text_char, pattern_char in zip(text[start:], pattern):
+            if pattern_char != text_char and pattern_char != self.any_char:
+                return False
+        return True
+
+    def locate(self, sequence):
+        '''Find every pattern in a sequence. For a circular sequence, the
+        search extends over the origin.
+
+        :param sequence: Sequence to search.
+        :type sequence: coral.DNA, coral.ssDNA, or coral.RNA
+        :returns: For each pattern, a list of top and bottom strand indices
+                  of matches (like DNA.locate) for double-stranded
+                  sequences, otherwise a list of indices.
+        :rtype: list
+        :raises: ValueError if a pattern is longer than either the input
+                 sequence (for linear DNA) or twice as long as the input
+                 sequence (for circular DNA).
+
+        '''
+        if isinstance(sequence, cr.DNA):
+            strands = [sequence.top, sequence.bottom]
+        else:
+            strands = [sequence]
+
+        longest = max([len(pattern) for pattern in self.patterns] + [1])
+        strand_hits = []
+        for strand in strands:
+            text = str(strand)
+            n_starts = len(text)
+            if strand.circular:
+                if longest >= 2 * len(text):
+                    raise ValueError('Search pattern longer than searchable ' +
+                                     'sequence.')
+                text = (text * 3)[:len(text) + longest - 1]
+            elif longest > len(text):
+                raise ValueError('Search pattern longer than searchable ' +
+                                 'sequence.')
+            strand_hits.append(self._scan(text, n_starts))
+
+        if len(strands) == 1:
+            return strand_hits[0]
+        return [list(hits) for hits in zip(*strand_hits)]
@@ -0,0 +1,146 @@
+'''Search index for repeated exact-match queries against one sequence.'''
+import numpy as np
+import coral as cr
+
+
+# Occurrence counts are stored every _CHECKPOINT characters of the BWT
+_CHECKPOINT = 64
+
+
+class SequenceIndex(object):
+    '''FM-index over every strand of a sequence. Circular strands are
+    indexed by their rotations, so matches extend over the origin. Built
+    once, each exact-match query takes time proportional to the pattern
+    length plus the number of matches.'''
+
+    def __init__(self, sequence):
+        '''
+        :param sequence: Sequence to index.
+        :type sequence: coral.DNA, coral.ssDNA, or coral.RNA
+        :returns: coral.analysis.SequenceIndex instance.
+
+        '''
+        self.ds = isinstance(sequence, cr.DNA)
+        if self.ds:
+            self.strands = [sequence.top.copy(), sequence.bottom.copy()]
+        else:
+            self.strands = [sequence.copy()]
+        self._indexes = [_StrandIndex(str(strand), strand.circular) for
+                         strand in self.strands]
+
+    def locate(self, pattern):
+        '''Find sequences matching a pattern. For a circular sequence, the
+        search extends over the origin.
+
+        :param pattern: Sequence for which to find matches.
+        :type pattern: str or coral.DNA
+        :returns: For double-stranded sequences, a list of top and bottom
+                  strand indices of matches. Otherwise, a list of indices.
+        :rtype: list of lists of ints or list of ints
+        :raises: ValueError if the pattern is longer than either the input
+                 sequence (for linear DNA) or twice as long as the input
+                 sequence (for circular DNA).
+
+        '''
+        pattern = str(pattern).upper()
+        matches = []
+        for strand, index in zip(self.strands, self._indexes):
+            if not pattern or strand.any_char in pattern or \
+               len(pattern) > len(strand):
+                # Wildcards and patterns that would wrap around a circular
+                # sequence more than once are left to a regex search (which
+                # also raises errors for patterns that are too long)
+                matches.append(strand.locate(pattern))
+            else:
+                matches.append(index.locate(pattern))
+        if self.ds:
+            return matches
+        return matches[0]
+
+
+class _StrandIndex(object):
+    '''FM-index of a single strand.'''
+
+    def __init__(self, strand, circular):
+        '''
+        :param strand: Sequence of the strand.
+        :type strand: str
+        :param circular: Whether the strand is circular.
+        :type circular: bool
+
+        '''
+        if not circular:
+            # A unique, smallest terminator makes rotations act as suffixes
+            strand += '\x00'
+        text = np.frombuffer(strand, dtype=np.uint8)
+        self.suffix_array = _sort_rotations(text)
+        bwt = text[(self.suffix_array - 1) % len(text)]
+        self.bwt = bwt.tostring()
+
+        # Number of characters in the text smaller than each character, and
+        # counts of each character in the BWT up to every checkpoint
+        self.first = {}
+        self.checkpoints = {}
+        total = 0
+        for code in np.unique(text):
+            char = chr(code)
+            self.first[char] = total
+            total += np.count_nonzero(text == code)
+            counts = np.concatenate([[0], np.cumsum(bwt == code)])
+            self.checkpoints[char] = counts[::_CHECKPOINT].tolist()
+
+    def _occurrences(self, char, i):
+        '''Count `char` in the first i characters of the BWT.'''
+        checkpoint = i // _CHECKPOINT
+        return (self.checkpoints[char][checkpoint] +
+                self.bwt.count(char, checkpoint * _CHECKPOINT, i))
+
+    def locate(self, pattern):
+        '''Find exact matches of a pattern.
+
+        :param pattern: Sequence to find.
+        :type pattern: str
+        :returns: Sorted start positions of matches.
+        :rtype: list of ints
+
+        '''
+        lo = 0
+        hi = len(self.bwt)
+        for char in reversed(pattern):
+            if char not in self.first:
+                return []
+            lo = self.first[char] + self._occurrences(char, lo)
+            hi = self.first[char] + self._occurrences(char, hi)
+            if lo >= hi:
+                return []
+        return sorted(self.suffix_array[lo:hi].tolist())
+
+
+def _sort_rotations(text):
+    '''Sort the rotations of a text by prefix doubling.
+
+    :param text: Text to sort.
+    :type text: numpy.ndarray
+    :returns: Start positions of the rotations, in sorted order.
+    :rtype: numpy.ndarray
+
+    '''
+    n = len(text)
+    rank = np.unique(text, return_inverse=True)[1].astype(np.int64)
+    order = np.argsort(rank, kind='mergesort')
+    positions = np.arange(n)
+    k = 1
+    while k < n:
+        # Rank rotations by their first 2k characters
+        keys = rank * n + rank[(positions + k) % n]
+        order = np.argsort(keys, kind='mergesort')
+        sorted_keys = keys[order]
+        new_rank = np.empty(n, dtype=np.int64)
+        new_rank[order] = np.concatenate([[0], np.cumsum(sorted_keys[1:] !=
+                                                         sorted_keys[:-1])])
+        rank = new_rank
+        if rank[order[-1]] == n - 1:
+            # All rotations are distinct
+            break
+        k *= 2
+    return order
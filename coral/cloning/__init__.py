@@ -1,4 +1,7 @@
 '''Cloning design classes and functions.'''
-from ._primers import primer, primers
+from ._primers import primer, primers, primer_candidates, PrimerCandidate
+from ._primers import design_primers_batch, iter_design_primers, PrimerDesign
+from ._multiplex import multiplex_primers
+from ._inventory import PrimerInventory
 from ._templateless import Templateless
 from ._gibson import gibson, gibson_primers
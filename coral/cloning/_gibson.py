@@ -13,7 +13,7 @@ class TmError(Exception):
 
 
 def gibson_primers(dna1, dna2, overlap='mixed', maxlen=80, overlap_tm=65.0,
-                   insert=None, primer_kwargs=None):
+                   insert=None, primer_kwargs=None, inventory=None):
     '''Design Gibson primers given two DNA sequences (connect left to right)
 
     :param dna1: First piece of DNA for which to design primers. Once Gibsoned,
@@ -35,6 +35,9 @@ def gibson_primers(dna1, dna2, overlap='mixed', maxlen=80, overlap_tm=65.0,
     :type insert: coral.DNA
     :param primer_kwargs: keyword arguments to pass to design_primer()
     :type primer_kwargs: dict
+    :param inventory: Existing primers to reuse when they have the same
+                      overhang and anneal within the Tm settings.
+    :type inventory: coral.cloning.PrimerInventory
     :returns: Reverse, then forward primer for bridging the two sequences.
               Note that the forward primer binds dna2, reverse dna1.
     :rtype: A sequence.Primer tuple
@@ -65,20 +68,22 @@ def gibson_primers(dna1, dna2, overlap='mixed', maxlen=80, overlap_tm=65.0,
             rev_overhang = overlap.primer().reverse_complement()
         elif overlap == 'mixed':
             # If mixed, grow size of both until overlap Tm is reached
-            overlap_l = dna1[0:0]  # Empty sequence.DNA
-            overlap_r = dna2[0]  # First base
-            overlap_melt = overlap_r.tm()
+            # Tms of any part of the junction
+            profile = cr.thermo.TmProfile(str(dna1) + str(dna2))
+            junction = len(dna1)
+            llen = 0  # Empty left side
+            rlen = 1  # First base
+            overlap_melt = profile.tm(junction, junction + rlen)
             while overlap_melt < overlap_tm:
-                rlen = len(overlap_r)
-                llen = len(overlap_l)
                 if rlen > llen:
                     # Increase left side of overlap
-                    overlap_l = dna1[-(rlen + 1):]
+                    llen = min(rlen + 1, len(dna1))
                 else:
                     # Increase right side of overlap
-                    overlap_r = dna2[:(llen + 1)]
-                overlap = overlap_l + overlap_r
-                overlap_melt = overlap.tm()
+                    rlen = min(llen + 1, len(dna2))
+                overlap_melt = profile.tm(junction - llen, junction + rlen)
+            overlap_l = dna1[len(dna1) - llen:]
+            overlap_r = dna2[:rlen]
             fwd_overhang = overlap_l
             rev_overhang = overlap_r.reverse_complement()
         else:
@@ -126,6 +131,21 @@ def gibson_primers(dna1, dna2, overlap='mixed', maxlen=80, overlap_tm=65.0,
                             overhang=rev_overhang)
             # Increase 'trimming' index
             right_trim += 1
+    if inventory is not None:
+        # Swap in stored primers with the same overhangs that follow the
+        # same design rules and fit within maxlen
+        settings = dict((key, primer_kwargs[key]) for key in
+                        ['tm', 'min_len', 'tm_undershoot', 'tm_overshoot',
+                         'end_gc', 'tm_parameters', 'max_run', 'min_end_dg',
+                         'max_end_gc'] if key in primer_kwargs)
+        settings['max_len'] = maxlen
+        stored = inventory.find(dna2, overhang=fwd.overhang, **settings)
+        if stored is not None:
+            fwd = stored
+        stored = inventory.find(dna1.flip(), overhang=rev.overhang,
+                                **settings)
+        if stored is not None:
+            rev = stored
     # Check primer lengths
     if any([len(primer) > maxlen for primer in (fwd, rev)]):
         raise LengthError('At least one of the primers is longer than maxlen.')
@@ -134,7 +154,8 @@ def gibson_primers(dna1, dna2, overlap='mixed', maxlen=80, overlap_tm=65.0,
 
 
 def gibson(seq_list, circular=True, overlaps='mixed', overlap_tm=65,
-           maxlen=80, terminal_primers=True, primer_kwargs=None):
+           maxlen=80, terminal_primers=True, primer_kwargs=None,
+           inventory=None):
     '''Design Gibson primers given a set of sequences
 
     :param seq_list: List of DNA sequences to stitch together
@@ -159,6 +180,8 @@ def gibson(seq_list, circular=True, overlaps='mixed', overlap_tm=65,
     :type terminal_primers: bool
     :param primer_kwargs: keyword arguments to pass to design.primer
     :type primer_kwargs: dict
+    :param inventory: Existing primers to reuse (see gibson_primers).
+    :type inventory: coral.cloning.PrimerInventory
     :returns: Forward and reverse primers for amplifying every fragment.
     :rtype: a list of sequence.Primer tuples
     :raises: ValueError if split parameter is an invalid string or wrong size.
@@ -190,16 +213,20 @@ def gibson(seq_list, circular=True, overlaps='mixed', overlap_tm=65,
     for i, (left, right) in enumerate(zip(seq_list[:-1], seq_list[1:])):
         primers_list.append(gibson_primers(left, right, overlaps[i],
                                            overlap_tm=overlap_tm,
-                                           primer_kwargs=primer_kwargs))
+                                           primer_kwargs=primer_kwargs,
+                                           inventory=inventory))
     if circular:
         primers_list.append(gibson_primers(seq_list[-1], seq_list[0],
                                            overlaps[-1],
                                            overlap_tm=overlap_tm,
-                                           primer_kwargs=primer_kwargs))
+                                           primer_kwargs=primer_kwargs,
+                                           inventory=inventory))
     else:
         if terminal_primers:
-            primer_f = cr.cloning.primer(seq_list[0], **primer_kwargs)
+            primer_f = cr.cloning.primer(seq_list[0], inventory=inventory,
+                                         **primer_kwargs)
             primer_r = cr.cloning.primer(seq_list[-1].reverse_complement(),
+                                         inventory=inventory,
                                          **primer_kwargs)
             primers_list.append((primer_r, primer_f))
 
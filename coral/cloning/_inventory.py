@@ -0,0 +1,156 @@
+'''Reuse of stored primers in primer design.'''
+import numpy as np
+import coral as cr
+from ..sequence import alphabets
+from ._primers import _end_scores, _follows_end_rules
+
+
+class PrimerInventory(object):
+    '''Collection of existing primers, indexed by the last bases of their
+    annealing sequences so that design functions can quickly find a stored
+    primer that already does the job.'''
+
+    def __init__(self, primers=None, k=10):
+        '''
+        :param primers: Stored primers.
+        :type primers: coral.Primer list
+        :param k: Number of bases at the 3' end of each annealing sequence
+                  to index. Primers with shorter annealing sequences are
+                  never reused.
+        :type k: int
+        :returns: coral.cloning.PrimerInventory instance.
+        :raises: ValueError if `k` is less than 1.
+
+        '''
+        if k < 1:
+            raise ValueError('k must be at least 1.')
+        self.k = k
+        self.primers = []
+        self._anneals = []
+        self._overhangs = []
+        # 3' end scores of each annealing sequence (see _end_scores)
+        self._end_scores = []
+        self._index = {}
+        self._max_len = 0
+        for primer in primers or []:
+            self.add(primer)
+
+    @classmethod
+    def from_csv(cls, path, k=10, alphabet=alphabets.dna):
+        '''Load an inventory from a csv file written by
+        coral.io.write_primers.
+
+        :param path: Path to the csv file.
+        :type path: str
+        :param k: Number of 3' bases to index (see PrimerInventory).
+        :type k: int
+        :param alphabet: Alphabet of the primer sequences (see
+                         coral.io.read_primers).
+        :type alphabet: coral.Alphabet
+        :returns: coral.cloning.PrimerInventory instance.
+
+        '''
+        return cls(cr.io.read_primers(path, alphabet=alphabet), k=k)
+
+    def add(self, primer):
+        '''Store a primer.
+
+        :param primer: The primer.
+        :type primer: coral.Primer
+
+        '''
+        anneal = str(primer.anneal).upper()
+        index = len(self.primers)
+        self.primers.append(primer)
+        self._anneals.append(anneal)
+        self._overhangs.append(str(primer.overhang).upper())
+        if anneal:
+            scores = _end_scores(anneal, np.array([len(anneal)]))
+            self._end_scores.append([score[0] for score in scores])
+        else:
+            self._end_scores.append(None)
+        if len(anneal) >= self.k:
+            self._index.setdefault(anneal[-self.k:], []).append(index)
+            self._max_len = max(self._max_len, len(anneal))
+
+    def find(self, dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
+             end_gc=False, tm_parameters='cloning', overhang=None,
+             max_run=None, min_end_dg=None, max_end_gc=None, max_len=None):
+        '''Find a stored primer that anneals to the start of a sequence and
+        follows the same rules as a primer designed by coral.cloning.primer.
+
+        :param dna: Sequence the primer anneals to.
+        :type dna: coral.DNA or str
+        :param tm: Ideal primer Tm in degrees C.
+        :type tm: float
+        :param min_len: Minimum primer length.
+        :type min_len: int
+        :param tm_undershoot: Allowed Tm undershoot.
+        :type tm_undershoot: float
+        :param tm_overshoot: Allowed Tm overshoot.
+        :type tm_overshoot: float
+        :param end_gc: Obey the 'end on G or C' rule.
+        :type end_gc: bool
+        :param tm_parameters: Melting temp calculator method to use.
+        :type tm_parameters: str or coral.thermo.ThermoModel
+        :param overhang: Overhang the primer must have.
+        :type overhang: coral.DNA, coral.ssDNA or str
+        :param max_run: Maximum run of a single base.
+        :type max_run: int
+        :param min_end_dg: Minimum free energy of the last 5 bases (see
+                           coral.cloning.primer_candidates).
+        :type min_end_dg: float
+        :param max_end_gc: Maximum number of G and C bases in the last 5
+                           bases.
+        :type max_end_gc: int
+        :param max_len: Maximum length of the whole primer, overhang
+                        included.
+        :type max_len: int
+        :returns: A copy of the stored primer whose annealing sequence is
+                  closest to the Tm setpoint, or None if there is none.
+        :rtype: coral.Primer
+
+        '''
+        seq = str(dna[0:self._max_len]).upper()
+        overhang = str(overhang).upper() if overhang else ''
+        # Look up the 3' end of every primer length that could anneal
+        matches = []
+        for stop in range(max(self.k, min_len), len(seq) + 1):
+            for index in self._index.get(seq[stop - self.k:stop], []):
+                anneal = self._anneals[index]
+                if len(anneal) == stop and anneal == seq[:stop] and \
+                   self._overhangs[index] == overhang:
+                    if max_len is None or \
+                       len(anneal) + len(overhang) <= max_len:
+                        matches.append(index)
+        if not matches:
+            return None
+
+        # Check the 3' end rules of every match at once
+        ends_gc, end_gc_counts, end_dgs, max_runs = [
+            np.array(score) for score in
+            zip(*[self._end_scores[index] for index in matches])]
+        follows = _follows_end_rules(ends_gc, end_gc_counts, end_dgs,
+                                     max_runs, end_gc, max_run, min_end_dg,
+                                     max_end_gc)
+        best = None
+        best_diff = None
+        for index, kept in zip(matches, follows.tolist()):
+            if not kept:
+                continue
+            melt = cr.thermo.tm(self._anneals[index],
+                                parameters=tm_parameters)
+            if not tm - tm_undershoot <= melt <= tm + tm_overshoot:
+                continue
+            if best is None or abs(melt - tm) < best_diff:
+                best = index
+                best_diff = abs(melt - tm)
+        if best is None:
+            return None
+        return self.primers[best].copy()
+
+    def __len__(self):
+        return len(self.primers)
+
+    def __repr__(self):
+        return 'PrimerInventory of {} primers'.format(len(self.primers))
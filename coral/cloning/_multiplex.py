@@ -0,0 +1,198 @@
+'''Multiplex PCR primer design.'''
+import random
+import time
+import warnings
+import numpy as np
+import coral as cr
+from ._primers import _candidates, _make_primer, _target_sequence
+
+
+def multiplex_primers(targets, tm_window=(58, 62), max_dimer_dg=-6.0,
+                      min_len=10, tm_parameters='cloning', candidates=5,
+                      overhangs=None, min_run=4, time_budget=5.0):
+    '''Design primers for amplifying many sequences in the same reaction.
+    Every primer falls within a shared Tm window, and primers are chosen
+    from several candidates per target so that as few of them as possible
+    can form dimers (see coral.structure.dimer_screen).
+
+    Primer pairs are first chosen greedily, most constrained target first,
+    then targets whose primers still form dimers are redesigned one at a
+    time until there are none or the time budget runs out.
+
+    :param targets: Sequences to amplify, or regions of templates given as
+                    (template, start, stop) (see design_primers_batch).
+    :type targets: list of coral.DNA, str or tuple
+    :param tm_window: Lowest and highest allowed primer Tms in degrees C.
+    :type tm_window: tuple of floats
+    :param max_dimer_dg: Primers whose 3' ends bind another primer (or
+                         themselves) at least this strongly (free energy in
+                         kcal/mol) form dimers.
+    :type max_dimer_dg: float
+    :param min_len: Minimum primer length.
+    :type min_len: int
+    :param tm_parameters: Melting temp calculator method to use.
+    :type tm_parameters: str or coral.thermo.ThermoModel
+    :param candidates: Number of candidate primers per end of each target.
+    :type candidates: int
+    :param overhangs: 2-tuple of overhang sequences added to every forward
+                      and reverse primer. Overhangs are included when
+                      screening for dimers.
+    :type overhangs: tuple
+    :param min_run: Minimum number of 3' bases that must bind to form a
+                    dimer.
+    :type min_run: int
+    :param time_budget: Maximum time (in seconds) to spend removing dimers.
+    :type time_budget: float
+    :returns: Forward and reverse primers of each target.
+    :rtype: list of lists of coral.Primer
+    :raises: ValueError if a target has no primers in the Tm window.
+
+    '''
+    if not overhangs:
+        overhangs = [None, None]
+    low, high = tm_window
+    setpoint = (low + high) / 2.0
+
+    # Candidates of each end of each target, numbered in one list
+    overhang_seqs = [str(overhang) if overhang else '' for overhang in
+                     overhangs]
+    sequences = []
+    screened = []
+    tm_diffs = []
+    options = []
+    for i, target in enumerate(targets):
+        seq = _target_sequence(target)
+        seq_tm = cr.thermo.TmProfile(seq, parameters=tm_parameters).tm(
+            0, len(seq))
+        starts = [seq[0:90].upper(),
+                  str(cr.DNA(seq[-90:]).reverse_complement())]
+        ends = []
+        for start, overhang in zip(starts, overhang_seqs):
+            end = _candidates(start, seq_tm, setpoint, min_len,
+                              setpoint - low, high - setpoint, False,
+                              tm_parameters, None, None, None)
+            end = [candidate for candidate in end if candidate.tm <= high]
+            if not end:
+                msg = 'No primers for target {} fall in the Tm window.'
+                raise ValueError(msg.format(i))
+            ends.append(range(len(sequences), len(sequences) +
+                              len(end[:candidates])))
+            for candidate in end[:candidates]:
+                sequences.append(candidate.sequence)
+                screened.append(overhang + candidate.sequence)
+                tm_diffs.append(abs(candidate.tm - setpoint))
+        # Every combination of forward and reverse candidates, closest to
+        # the Tm setpoint first
+        pairs = [(forward, reverse) for forward in ends[0] for reverse in
+                 ends[1]]
+        pairs.sort(key=lambda pair: tm_diffs[pair[0]] + tm_diffs[pair[1]])
+        options.append(np.array(pairs))
+
+    # Dimers between candidates, with self-dimers and hairpins on the
+    # diagonal
+    conflicts = np.zeros((len(screened), len(screened)), dtype=np.int64)
+    for interaction in cr.structure.dimer_screen(screened, min_run=min_run,
+                                                 max_dg=max_dimer_dg):
+        conflicts[interaction.primer1, interaction.primer2] = 1
+        conflicts[interaction.primer2, interaction.primer1] = 1
+    # The budget only covers removing dimers, however long the setup took
+    chosen = _choose(options, conflicts, time.time() + time_budget)
+
+    primer_list = []
+    for pair in chosen:
+        pair_primers = []
+        for index, overhang in zip(pair, overhangs):
+            melt = cr.thermo.tm(sequences[index], parameters=tm_parameters)
+            pair_primers.append(_make_primer(sequences[index], melt,
+                                             overhang, False))
+        primer_list.append(pair_primers)
+    return primer_list
+
+
+def _choose(options, conflicts, deadline):
+    '''Choose a candidate pair for each target with as few dimers as
+    possible, preferring pairs that are listed first.
+
+    :param options: Candidate pairs of each target, best first.
+    :type options: list of numpy.ndarray
+    :param conflicts: Matrix of the candidates that form dimers.
+    :type conflicts: numpy.ndarray
+    :param deadline: Time at which to stop improving the choice.
+    :type deadline: float
+    :returns: Chosen pair of each target.
+    :rtype: list of numpy.ndarray
+
+    '''
+    # Greedy: most constrained targets first, each taking its best pair
+    # given the pairs already taken
+    choice = [None] * len(options)
+    taken = []
+    for target in sorted(range(len(options)),
+                         key=lambda target: len(options[target])):
+        counts = _option_conflicts(options[target], conflicts, taken)
+        choice[target] = int(np.argmin(counts))
+        taken.extend(options[target][choice[target]])
+
+    # Local improvement: move the targets whose pairs form dimers to their
+    # best pair given the rest, and shake things up when no move helps
+    rng = random.Random(0)
+    total = _count_dimers(options, conflicts, choice)
+    best_choice = list(choice)
+    best_total = total
+    while total and time.time() < deadline:
+        improved = False
+        for target in _conflicted(options, conflicts, choice):
+            others = _selected(options, choice, skip=target)
+            counts = _option_conflicts(options[target], conflicts, others)
+            option = int(np.argmin(counts))
+            if counts[option] < counts[choice[target]]:
+                total += counts[option] - counts[choice[target]]
+                choice[target] = option
+                improved = True
+        if not improved:
+            target = rng.choice(_conflicted(options, conflicts, choice))
+            choice[target] = rng.randrange(len(options[target]))
+            total = _count_dimers(options, conflicts, choice)
+        if total < best_total:
+            best_choice = list(choice)
+            best_total = total
+    if best_total:
+        warnings.warn('Could not avoid all primer dimers - {} '
+                      'remain.'.format(best_total))
+    return [pairs[index] for pairs, index in zip(options, best_choice)]
+
+
+def _selected(options, choice, skip=None):
+    '''List the candidates chosen for every target but one.'''
+    return [index for target, option in enumerate(choice) if target != skip
+            for index in options[target][option]]
+
+
+def _option_conflicts(pairs, conflicts, others):
+    '''Count the dimers each candidate pair would form with itself and the
+    other chosen candidates.'''
+    forward = pairs[:, 0]
+    reverse = pairs[:, 1]
+    counts = (conflicts[forward, forward] + conflicts[reverse, reverse] +
+              conflicts[forward, reverse])
+    if others:
+        counts += conflicts[forward][:, others].sum(axis=1)
+        counts += conflicts[reverse][:, others].sum(axis=1)
+    return counts
+
+
+def _conflicted(options, conflicts, choice):
+    '''List the targets whose chosen pairs form dimers.'''
+    selected = np.array(_selected(options, choice))
+    sub = conflicts[np.ix_(selected, selected)]
+    bad = sub.sum(axis=1) > 0
+    return [target for target in range(len(choice)) if
+            bad[2 * target] or bad[2 * target + 1]]
+
+
+def _count_dimers(options, conflicts, choice):
+    '''Count the distinct dimers (including self-dimers and hairpins) among
+    the chosen candidates.'''
+    selected = np.array(_selected(options, choice))
+    sub = conflicts[np.ix_(selected, selected)]
+    return int(np.triu(sub).sum())
@@ -1,11 +1,186 @@
 '''Primer design tools.'''
+import collections
+import inspect
+import multiprocessing
+import numpy as np
 import coral as cr
 import warnings
 
 
+PrimerCandidate = collections.namedtuple('PrimerCandidate',
+                                         ['sequence', 'tm', 'end_gc_count',
+                                          'end_dg', 'max_run'])
+
+PrimerDesign = collections.namedtuple('PrimerDesign', ['primers', 'error'])
+
+# Codes of A, C, G, and T, the order of coral.thermo.ThermoModel tables
+_BASE_CODES = np.zeros(256, dtype=np.int64) - 1
+for _code, _base in enumerate('ACGT'):
+    _BASE_CODES[ord(_base)] = _code
+
+# Number of bases at the 3' end of a primer whose GC content and stability
+# are scored
+_END_WINDOW = 5
+
+
+def primer_candidates(dna, tm=65, min_len=10, tm_undershoot=1,
+                      tm_overshoot=3, end_gc=False, tm_parameters='cloning',
+                      max_run=None, min_end_dg=None, max_end_gc=None):
+    '''Score every primer that could be designed to a nearest-neighbor Tm
+    setpoint at the start of a sequence. All primer lengths are scored at
+    once, from cumulative sums over the sequence.
+
+    :param dna: Sequence for which to design a primer.
+    :type dna: coral.DNA or str
+    :param tm: Ideal primer Tm in degrees C.
+    :type tm: float
+    :param min_len: Minimum primer length.
+    :type min_len: int
+    :param tm_undershoot: Allowed Tm undershoot.
+    :type tm_undershoot: float
+    :param tm_overshoot: Allowed Tm overshoot.
+    :type tm_overshoot: float
+    :param end_gc: Obey the 'end on G or C' rule.
+    :type end_gc: bool
+    :param tm_parameters: Melting temp calculator method to use.
+    :type tm_parameters: str or coral.thermo.ThermoModel
+    :param max_run: Reject primers with longer runs of a single base.
+    :type max_run: int
+    :param min_end_dg: Reject primers whose last 5 bases bind more stably
+                       than this free energy (kcal/mol at 37 degrees C).
+    :type min_end_dg: float
+    :param max_end_gc: Reject primers with more G and C bases in their last
+                       5 bases.
+    :type max_end_gc: int
+    :returns: The primers that meet the settings, best first (closest to the
+              set Tm, then shortest). Each gives its sequence, Tm, number of G
+              and C bases in its last 5 bases, nearest-neighbor free energy
+              of its last 5 bases (SantaLucia 98, kcal/mol at 37 degrees C),
+              and longest run of a single base.
+    :rtype: list of coral.cloning.PrimerCandidate
+    :raises: ValueError if the input sequence is lower than the Tm settings
+             allow.
+
+    '''
+    seq = str(dna).upper()
+    profile = cr.thermo.TmProfile(seq, parameters=tm_parameters)
+    return _candidates(seq, profile.tm(0, len(seq)), tm, min_len,
+                       tm_undershoot, tm_overshoot, end_gc, tm_parameters,
+                       max_run, min_end_dg, max_end_gc)
+
+
+def _candidates(seq, seq_tm, tm, min_len, tm_undershoot, tm_overshoot,
+                end_gc, tm_parameters, max_run, min_end_dg, max_end_gc):
+    '''Score the primers at the start of a sequence whose Tm is known (see
+    primer_candidates).
+
+    :param seq: Uppercase sequence.
+    :type seq: str
+    :param seq_tm: Tm of the whole sequence.
+    :type seq_tm: float
+    :returns: Ranked candidates.
+    :rtype: list of coral.cloning.PrimerCandidate
+
+    '''
+    # Check Tm of input sequence to see if it's already too low
+    if seq_tm < (tm - tm_undershoot):
+        msg = 'Input sequence Tm is lower than primer Tm setting'
+        raise ValueError(msg)
+    # Focus on first 90 bases - shouldn't need more than 90bp to anneal
+    seq = seq[0:90]
+
+    # Score primers from min_len to 'tm' + tm_overshoot
+    profile = cr.thermo.TmProfile(seq, parameters=tm_parameters)
+    lengths = np.arange(min_len, len(seq))
+    melts = profile.tms(np.zeros(len(lengths), dtype=int), lengths)
+    overshot = np.flatnonzero(melts > tm + tm_overshoot)
+    if len(overshot):
+        # Keep the first primer that overshoots, as the scan did
+        lengths = lengths[:overshot[0] + 1]
+        melts = melts[:overshot[0] + 1]
+    if np.isnan(melts).any():
+        raise ValueError('Can\'t calculate Tm of an N base.')
+
+    ends_gc, end_gc_counts, end_dgs, max_runs = _end_scores(seq, lengths)
+    # Trim primer list based on tm_undershoot and the 3' end rules
+    kept = melts >= tm - tm_undershoot
+    kept &= _follows_end_rules(ends_gc, end_gc_counts, end_dgs, max_runs,
+                               end_gc, max_run, min_end_dg, max_end_gc)
+
+    order = np.lexsort((lengths, np.abs(melts - tm)))
+    order = order[kept[order]]
+    return [PrimerCandidate(seq[:length], melt, end_gc_count, end_dg, run)
+            for length, melt, end_gc_count, end_dg, run in
+            zip(lengths[order].tolist(), melts[order].tolist(),
+                end_gc_counts[order].tolist(), end_dgs[order].tolist(),
+                max_runs[order].tolist())]
+
+
+def _end_scores(seq, lengths):
+    '''Score the 3' ends of the primers at the start of a sequence.
+
+    :param seq: Uppercase sequence.
+    :type seq: str
+    :param lengths: Lengths of the primers (at least 1).
+    :type lengths: numpy.ndarray
+    :returns: For each primer, whether it ends with G or C, the number of G
+              and C bases in its last 5 bases, the nearest-neighbor free
+              energy of its last 5 bases, and its longest run of a single
+              base (see primer_candidates).
+    :rtype: tuple of numpy.ndarray
+
+    '''
+    raw = np.frombuffer(seq, dtype=np.uint8)
+    codes = _BASE_CODES[raw]
+    codes = np.where(codes < 0, 0, codes)
+    ends = lengths - 1
+    end_starts = np.maximum(lengths - _END_WINDOW, 0)
+    # G and C bases in the last 5 bases
+    gc = np.concatenate([[0], np.cumsum((codes == 1) | (codes == 2))])
+    end_gc_counts = gc[lengths] - gc[end_starts]
+    # Free energy of the stacks of the last 5 bases. Parameters are stored
+    # negated.
+    model = cr.thermo.get_model('santalucia98')
+    stack_dgs = -model.delta_h_table + 310.15 * model.delta_s_table / 1e3
+    dgs = np.concatenate([[0], np.cumsum(stack_dgs[4 * codes[:-1] +
+                                                   codes[1:]])])
+    end_dgs = dgs[ends] - dgs[end_starts]
+    # Longest run of a single base: the longest run ending at or before the
+    # last base
+    positions = np.arange(len(seq))
+    run_starts = np.ones(len(seq), dtype=bool)
+    run_starts[1:] = raw[1:] != raw[:-1]
+    run_starts = np.maximum.accumulate(np.where(run_starts, positions, 0))
+    max_runs = np.maximum.accumulate(positions - run_starts + 1)[ends]
+    ends_gc = (codes[ends] == 1) | (codes[ends] == 2)
+    return ends_gc, end_gc_counts, end_dgs, max_runs
+
+
+def _follows_end_rules(ends_gc, end_gc_counts, end_dgs, max_runs, end_gc,
+                       max_run, min_end_dg, max_end_gc):
+    '''Check scored primers (see _end_scores) against the 3' end rules of
+    primer_candidates.
+
+    :returns: Whether each primer follows the rules.
+    :rtype: numpy.ndarray
+
+    '''
+    kept = np.ones(len(ends_gc), dtype=bool)
+    if end_gc:
+        kept &= ends_gc
+    if max_run is not None:
+        kept &= max_runs <= max_run
+    if min_end_dg is not None:
+        kept &= end_dgs >= min_end_dg
+    if max_end_gc is not None:
+        kept &= end_gc_counts <= max_end_gc
+    return kept
+
+
 def primer(dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
            end_gc=False, tm_parameters='cloning', overhang=None,
-           structure=False):
+           structure=False, max_run=None, min_end_dg=None, max_end_gc=None,
+           inventory=None):
     '''Design primer to a nearest-neighbor Tm setpoint.
 
     :param dna: Sequence for which to design a primer.
@@ -21,12 +196,24 @@ def primer(dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
     :param end_gc: Obey the 'end on G or C' rule.
     :type end_gc: bool
     :param tm_parameters: Melting temp calculator method to use.
-    :type tm_parameters: string
+    :type tm_parameters: str or coral.thermo.ThermoModel
     :param overhang: Append the primer to this overhang sequence.
     :type overhang: str
     :param structure: Evaluate primer for structure, with warning for high
                       structure.
     :type structure: bool
+    :param max_run: Maximum run of a single base.
+    :type max_run: int
+    :param min_end_dg: Minimum free energy of the last 5 bases (see
+                       primer_candidates).
+    :type min_end_dg: float
+    :param max_end_gc: Maximum number of G and C bases in the last 5 bases.
+    :type max_end_gc: int
+    :param inventory: Existing primers to reuse. If one anneals to the start
+                      of the sequence with the same overhang and a Tm within
+                      the allowed range, it is returned instead of a new
+                      design.
+    :type inventory: coral.cloning.PrimerInventory
     :returns: A primer.
     :rtype: coral.Primer
     :raises: ValueError if the input sequence is lower than the Tm settings
@@ -35,72 +222,112 @@ def primer(dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
              the Tm settings.
 
     '''
-    # Check Tm of input sequence to see if it's already too low
-    seq_tm = cr.thermo.tm(dna, parameters=tm_parameters)
-    if seq_tm < (tm - tm_undershoot):
-        msg = 'Input sequence Tm is lower than primer Tm setting'
-        raise ValueError(msg)
-    # Focus on first 90 bases - shouldn't need more than 90bp to anneal
-    dna = dna[0:90]
-
-    # Generate primers from min_len to 'tm' + tm_overshoot
-    # TODO: this is a good place for optimization. Only calculate as many
-    # primers as are needed. Use binary search.
-    primers_tms = []
-    last_tm = 0
-    bases = min_len
-    while last_tm <= tm + tm_overshoot and bases != len(dna):
-        next_primer = dna[0:bases]
-        last_tm = cr.thermo.tm(next_primer, parameters=tm_parameters)
-        primers_tms.append((next_primer, last_tm))
-        bases += 1
-
-    # Trim primer list based on tm_undershoot and end_gc
-    primers_tms = [(primer, melt) for primer, melt in primers_tms if
-                   melt >= tm - tm_undershoot]
-    if end_gc:
-        primers_tms = [pair for pair in primers_tms if
-                       pair[0][-1] == cr.DNA('C') or
-                       pair[0][-1] == cr.DNA('G')]
-    if not primers_tms:
-        raise ValueError('No primers could be generated using these settings')
+    if inventory is not None:
+        stored = inventory.find(dna, tm=tm, min_len=min_len,
+                                tm_undershoot=tm_undershoot,
+                                tm_overshoot=tm_overshoot, end_gc=end_gc,
+                                tm_parameters=tm_parameters,
+                                overhang=overhang, max_run=max_run,
+                                min_end_dg=min_end_dg, max_end_gc=max_end_gc)
+        if stored is not None:
+            if structure:
+                _structure(stored)
+            return stored
+    candidates = primer_candidates(dna, tm=tm, min_len=min_len,
+                                   tm_undershoot=tm_undershoot,
+                                   tm_overshoot=tm_overshoot, end_gc=end_gc,
+                                   tm_parameters=tm_parameters,
+                                   max_run=max_run, min_end_dg=min_end_dg,
+                                   max_end_gc=max_end_gc)
+    return _best_primer(candidates, tm_parameters, overhang, structure)
 
-    # Find the primer closest to the set Tm, make it single stranded
-    tm_diffs = [abs(melt - tm) for primer, melt in primers_tms]
-    best_index = tm_diffs.index(min(tm_diffs))
-    best_primer, best_tm = primers_tms[best_index]
-    best_primer = best_primer.top
 
-    # Apply overhang
-    if overhang:
-        overhang = overhang.top
+def _best_primer(candidates, tm_parameters, overhang, structure):
+    '''Make the best candidate into a primer.
+
+    :param candidates: Ranked candidates.
+    :type candidates: list of coral.cloning.PrimerCandidate
+    :param tm_parameters: Melting temp calculator method to use.
+    :type tm_parameters: str or coral.thermo.ThermoModel
+    :param overhang: Append the primer to this overhang sequence.
+    :type overhang: coral.DNA
+    :param structure: Evaluate primer for structure.
+    :type structure: bool
+    :returns: A primer.
+    :rtype: coral.Primer
+    :raises: ValueError if there are no candidates.
+
+    '''
+    best_primer, best_tm = _best_design(candidates, tm_parameters)
+    return _make_primer(best_primer, best_tm, overhang, structure)
+
+
+def _best_design(candidates, tm_parameters):
+    '''Find the sequence and Tm of the best candidate.
+
+    :param candidates: Ranked candidates.
+    :type candidates: list of coral.cloning.PrimerCandidate
+    :param tm_parameters: Melting temp calculator method to use.
+    :type tm_parameters: str or coral.thermo.ThermoModel
+    :returns: Sequence and Tm.
+    :rtype: tuple
+    :raises: ValueError if there are no candidates.
+
+    '''
+    if not candidates:
+        raise ValueError('No primers could be generated using these settings')
+    # The best primer is closest to the set Tm
+    best_primer = candidates[0].sequence
+    return best_primer, cr.thermo.tm(best_primer, parameters=tm_parameters)
 
-    output_primer = cr.Primer(best_primer, best_tm, overhang=overhang)
 
-    def _structure(primer):
-        '''Check annealing sequence for structure.
+def _make_primer(sequence, melt, overhang, structure):
+    '''Make a designed sequence into a primer.
 
-        :param primer: Primer for which to evaluate structure
-        :type primer: sequence.Primer
+    :param sequence: Annealing sequence.
+    :type sequence: str
+    :param melt: Tm of the annealing sequence.
+    :type melt: float
+    :param overhang: Append the primer to this overhang sequence.
+    :type overhang: coral.DNA
+    :param structure: Evaluate primer for structure.
+    :type structure: bool
+    :returns: A primer.
+    :rtype: coral.Primer
+
+    '''
+    # Make it single stranded and apply overhang
+    if overhang:
+        overhang = overhang.top
 
-        '''
-        # Check whole primer for high-probability structure, focus in on
-        # annealing sequence, report average
-        nupack = cr.structure.Nupack(primer.primer())
-        pairs = nupack.pairs(0)
-        anneal_len = len(primer.anneal)
-        pairs_mean = sum(pairs[-anneal_len:]) / anneal_len
-        if pairs_mean < 0.5:
-            warnings.warn('High probability structure', Warning)
-        return pairs_mean
+    output_primer = cr.Primer(cr.ssDNA(sequence), melt, overhang=overhang)
     if structure:
         _structure(output_primer)
     return output_primer
 
 
+def _structure(primer):
+    '''Check annealing sequence for structure.
+
+    :param primer: Primer for which to evaluate structure
+    :type primer: sequence.Primer
+
+    '''
+    # Check whole primer for high-probability structure, focus in on
+    # annealing sequence, report average
+    nupack = cr.structure.Nupack(primer.primer())
+    pairs = nupack.pairs(0)
+    anneal_len = len(primer.anneal)
+    pairs_mean = sum(pairs[-anneal_len:]) / anneal_len
+    if pairs_mean < 0.5:
+        warnings.warn('High probability structure', Warning)
+    return pairs_mean
+
+
 def primers(dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
             end_gc=False, tm_parameters='cloning', overhangs=None,
-            structure=False):
+            structure=False, max_run=None, min_end_dg=None, max_end_gc=None,
+            inventory=None):
     '''Design primers for PCR amplifying any arbitrary sequence.
 
     :param dna: Input sequence.
@@ -116,25 +343,277 @@ def primers(dna, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
     :param end_gc: Obey the 'end on G or C' rule.
     :type end_gc: bool
     :param tm_parameters: Melting temp calculator method to use.
-    :type tm_parameters: string
+    :type tm_parameters: str or coral.thermo.ThermoModel
     :param overhangs: 2-tuple of overhang sequences.
     :type overhangs: tuple
     :param structure: Evaluate each primer for structure, with warning for high
                       structure.
     :type structure: bool
+    :param max_run: Maximum run of a single base.
+    :type max_run: int
+    :param min_end_dg: Minimum free energy of the last 5 bases (see
+                       primer_candidates).
+    :type min_end_dg: float
+    :param max_end_gc: Maximum number of G and C bases in the last 5 bases.
+    :type max_end_gc: int
+    :param inventory: Existing primers to reuse (see primer).
+    :type inventory: coral.cloning.PrimerInventory
     :returns: A list primers (the output of primer).
     :rtype: list
 
     '''
     if not overhangs:
         overhangs = [None, None]
-    templates = [dna, dna.reverse_complement()]
+    stored = [None, None]
+    if inventory is not None:
+        stored = _stored_primers(inventory, str(dna), overhangs, tm=tm,
+                                 min_len=min_len, tm_undershoot=tm_undershoot,
+                                 tm_overshoot=tm_overshoot, end_gc=end_gc,
+                                 tm_parameters=tm_parameters, max_run=max_run,
+                                 min_end_dg=min_end_dg, max_end_gc=max_end_gc)
+    # Only design the ends that aren't stored
+    ends = [i for i, existing in enumerate(stored) if existing is None]
+    designs = _design_pair(str(dna), tm=tm, min_len=min_len,
+                           tm_undershoot=tm_undershoot,
+                           tm_overshoot=tm_overshoot, end_gc=end_gc,
+                           tm_parameters=tm_parameters, max_run=max_run,
+                           min_end_dg=min_end_dg, max_end_gc=max_end_gc,
+                           ends=ends)
+    return _pair_primers(designs, overhangs, stored, structure)
+
+
+def _stored_primers(inventory, seq, overhangs, **kwargs):
+    '''Find stored primers that amplify a sequence (see primers).
+
+    :param inventory: Existing primers to reuse.
+    :type inventory: coral.cloning.PrimerInventory
+    :param seq: Input sequence.
+    :type seq: str
+    :param overhangs: Overhangs of the forward and reverse primers.
+    :type overhangs: list
+    :param kwargs: Design rules (see PrimerInventory.find).
+    :returns: The forward and reverse primers, or None for those that aren't
+              stored.
+    :rtype: list
+
+    '''
+    starts = [seq, str(cr.DNA(seq[-90:]).reverse_complement())]
+    return [inventory.find(start, overhang=overhang, **kwargs) for
+            start, overhang in zip(starts, overhangs)]
+
+
+def _pair_primers(designs, overhangs, stored, structure):
+    '''Make the forward and reverse primers from designs and stored primers.
+
+    :param designs: Sequence and Tm of each designed primer (see
+                    _design_pair).
+    :type designs: list
+    :param overhangs: Overhangs of the forward and reverse primers.
+    :type overhangs: list
+    :param stored: Stored primers to use instead of designs, or None.
+    :type stored: list
+    :param structure: Evaluate each primer for structure.
+    :type structure: bool
+    :returns: The forward and reverse primers.
+    :rtype: list
+
+    '''
     primer_list = []
-    for template, overhang in zip(templates, overhangs):
-        primer_i = primer(template, tm=tm, min_len=min_len,
-                          tm_undershoot=tm_undershoot,
-                          tm_overshoot=tm_overshoot, end_gc=end_gc,
-                          tm_parameters=tm_parameters,
-                          overhang=overhang, structure=structure)
-        primer_list.append(primer_i)
+    for design, overhang, existing in zip(designs, overhangs, stored):
+        if existing is None:
+            existing = _make_primer(design[0], design[1], overhang,
+                                    structure)
+        elif structure:
+            _structure(existing)
+        primer_list.append(existing)
     return primer_list
+
+
+def _design_pair(seq, tm=65, min_len=10, tm_undershoot=1, tm_overshoot=3,
+                 end_gc=False, tm_parameters='cloning', max_run=None,
+                 min_end_dg=None, max_end_gc=None, ends=(0, 1)):
+    '''Find the sequences and Tms of the primers that amplify a sequence
+    (see primers).
+
+    :param seq: Input sequence.
+    :type seq: str
+    :param ends: Which primers to design (0 for forward, 1 for reverse).
+    :type ends: list of ints
+    :returns: Sequence and Tm of the forward and reverse primers (None for
+              those that weren't designed).
+    :rtype: list of tuples
+    :raises: ValueError if either primer can't be designed.
+
+    '''
+    designs = [None, None]
+    if not ends:
+        return designs
+    # Both strands have the same Tm, and each primer only needs the start of
+    # its strand
+    seq_tm = cr.thermo.TmProfile(seq, parameters=tm_parameters).tm(0, len(seq))
+    starts = [seq[0:90].upper(),
+              str(cr.DNA(seq[-90:]).reverse_complement())]
+    for end in ends:
+        start = starts[end]
+        candidates = _candidates(start, seq_tm, tm, min_len, tm_undershoot,
+                                 tm_overshoot, end_gc, tm_parameters, max_run,
+                                 min_end_dg, max_end_gc)
+        designs[end] = _best_design(candidates, tm_parameters)
+    return designs
+
+
+def design_primers_batch(targets, processes=None, pool=None, chunk_size=16,
+                         **kwargs):
+    '''Design primers for PCR amplifying many sequences. Only the sequence
+    of each target is sent to the worker processes, and only the primer
+    sequences and Tms are sent back.
+
+    :param targets: Sequences to amplify, or regions of templates given as
+                    (template, start, stop). Regions of circular templates
+                    can span the origin (stop before start).
+    :type targets: list of coral.DNA, str or tuple
+    :param processes: Number of worker processes. By default, everything runs
+                      in this process.
+    :type processes: int
+    :param pool: Worker pool to use instead of starting one, so that it can be
+                 reused between batches. It is not closed.
+    :type pool: multiprocessing.Pool
+    :param chunk_size: Number of targets handed to a worker at a time.
+    :type chunk_size: int
+    :param kwargs: Keyword arguments of coral.cloning.primers (including
+                   inventory), applied to every target.
+    :returns: For each target (in order), its primers (the output of primers)
+              and None, or None and the reason primers couldn't be designed.
+    :rtype: list of coral.cloning.PrimerDesign
+    :raises: TypeError if a keyword argument isn't an argument of primers.
+
+    '''
+    return list(iter_design_primers(targets, processes=processes, pool=pool,
+                                    chunk_size=chunk_size, **kwargs))
+
+
+def iter_design_primers(targets, processes=None, pool=None, chunk_size=16,
+                        **kwargs):
+    '''Design primers for PCR amplifying many sequences, yielding each
+    target's primers as soon as they and those of every earlier target are
+    designed (see design_primers_batch).
+
+    Stored primers are looked up in this process before any designs are
+    sent to the workers. A pool started here is closed when the iterator is
+    exhausted, and terminated if it is closed early.
+
+    :param targets: Sequences to amplify, or (template, start, stop).
+    :type targets: list of coral.DNA, str or tuple
+    :param processes: Number of worker processes.
+    :type processes: int
+    :param pool: Worker pool to use instead of starting one. It is not
+                 closed.
+    :type pool: multiprocessing.Pool
+    :param chunk_size: Number of targets handed to a worker at a time.
+    :type chunk_size: int
+    :param kwargs: Keyword arguments of coral.cloning.primers (including
+                   inventory), applied to every target.
+    :returns: For each target (in order), its primers and None, or None and
+              the reason primers couldn't be designed.
+    :rtype: iterator of coral.cloning.PrimerDesign
+    :raises: TypeError if a keyword argument isn't an argument of primers.
+
+    '''
+    overhangs = kwargs.pop('overhangs', None) or [None, None]
+    structure = kwargs.pop('structure', False)
+    inventory = kwargs.pop('inventory', None)
+    allowed = set(inspect.getargspec(_design_pair).args[1:]) - set(['ends'])
+    unknown = set(kwargs) - allowed
+    if unknown:
+        raise TypeError('Unexpected keyword arguments: '
+                        '{}'.format(', '.join(sorted(unknown))))
+
+    args_list = []
+    stored_list = []
+    for target in targets:
+        seq = _target_sequence(target)
+        stored = [None, None]
+        if inventory is not None:
+            stored = _stored_primers(inventory, seq, overhangs, **kwargs)
+        # Only design the ends that aren't stored
+        ends = [i for i, existing in enumerate(stored) if existing is None]
+        args_list.append([seq, dict(kwargs, ends=ends)])
+        stored_list.append(stored)
+    owned_pool = None
+    if pool is None and processes is not None and processes > 1:
+        pool = owned_pool = multiprocessing.Pool(processes)
+    return _stream_designs(args_list, stored_list, overhangs, structure, pool,
+                           owned_pool, chunk_size)
+
+
+def _stream_designs(args_list, stored_list, overhangs, structure, pool,
+                    owned_pool, chunk_size):
+    '''Yield the primers of each target of iter_design_primers in order.
+
+    :param args_list: Arguments of run_design_primers for each target.
+    :type args_list: list
+    :param stored_list: Stored primers of each target (see _stored_primers).
+    :type stored_list: list
+    :param overhangs: Overhangs of the forward and reverse primers.
+    :type overhangs: list
+    :param structure: Evaluate each primer for structure.
+    :type structure: bool
+    :param pool: Worker pool, or None to design in this process.
+    :type pool: multiprocessing.Pool
+    :param owned_pool: The pool if it was started for these targets.
+    :type owned_pool: multiprocessing.Pool
+    :param chunk_size: Number of targets handed to a worker at a time.
+    :type chunk_size: int
+
+    '''
+    finished = False
+    try:
+        if pool is not None:
+            designed = pool.imap(run_design_primers, args_list, chunk_size)
+        else:
+            designed = (run_design_primers(args) for args in args_list)
+        for i, designs in enumerate(designed):
+            if isinstance(designs, basestring):
+                yield PrimerDesign(None, designs)
+                continue
+            primer_list = _pair_primers(designs, overhangs, stored_list[i],
+                                        structure)
+            yield PrimerDesign(primer_list, None)
+        finished = True
+    finally:
+        if owned_pool is not None:
+            if finished:
+                owned_pool.close()
+            else:
+                # Don't wait for designs nobody will read
+                owned_pool.terminate()
+            owned_pool.join()
+
+
+def run_design_primers(args):
+    '''Design the primers for one target using a 2-tuple of its sequence and
+    the keyword arguments of design_primers_batch. Necessary to make
+    picklable function for multiprocessing. Returns the error message instead
+    of raising ValueErrors.'''
+    seq, kwargs = args
+    try:
+        return _design_pair(seq, **kwargs)
+    except ValueError as error:
+        return str(error)
+
+
+def _target_sequence(target):
+    '''Find the sequence of a target of design_primers_batch.
+
+    :param target: Sequence, or (template, start, stop).
+    :type target: coral.DNA, str or tuple
+    :returns: The sequence.
+    :rtype: str
+
+    '''
+    if not isinstance(target, tuple):
+        return str(target)
+    template, start, stop = target
+    if stop <= start and template.circular:
+        return str(template[start:]) + str(template[:stop])
+    return str(template[start:stop])
@@ -145,16 +145,20 @@ class Templateless(object):
         self._has_run = True
         return assembly_dict
 
-    def primers(self, tm=60):
+    def primers(self, tm=60, inventory=None):
         '''Design primers for amplifying the assembled sequence.
 
         :param tm: melting temperature (lower than overlaps is best).
         :type tm: float
+        :param inventory: Existing primers to reuse (see
+                          coral.cloning.primer).
+        :type inventory: coral.cloning.PrimerInventory
         :returns: Primer list (the output of coral.design.primers).
         :rtype: list
 
         '''
-        self.primers = cr.cloning.primers(self.template, tm=tm)
+        self.primers = cr.cloning.primers(self.template, tm=tm,
+                                          inventory=inventory)
         return self.primers
 
     def write(self, path):
@@ -1,3 +1,3 @@
 '''Read and write cloning-relevant formats (sequences, chromatograms, etc).'''
-from ._dna import read_dna, read_dnas, write_dna, write_primers
+from ._dna import read_dna, read_dnas, write_dna, write_primers, read_primers
 from ._abi import read_abi, read_abis
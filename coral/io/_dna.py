@@ -4,6 +4,7 @@ import csv
 import os
 from . import parsers
 from . import writers
+from ..sequence import alphabets
 from .exceptions import UnsupportedFileError
 
 
@@ -118,3 +119,36 @@ def write_primers(primer_list, path, names=None, notes=None):
         for primer in primer_list:
             string_rep = str(primer.overhang).lower() + str(primer.anneal)
             writer.writerow([primer.name, string_rep, primer.note])
+
+
+def read_primers(path, alphabet=alphabets.dna):
+    '''Read primers from a csv file written by write_primers. Lowercase
+    bases at the start of a sequence are its overhang.
+
+    :param path: Path to the csv file.
+    :type path: str
+    :param alphabet: Alphabet of the primer sequences, e.g. one that allows
+                     degenerate bases.
+    :type alphabet: coral.Alphabet
+    :returns: A list of primers, with their names and notes.
+    :rtype: coral.Primer list
+
+    '''
+    primer_list = []
+    with open(path) as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            name, sequence = row[:2]
+            note = row[2] if len(row) > 2 else ''
+            # The overhang is the leading run of lowercase bases
+            split = 0
+            while split < len(sequence) and sequence[split].islower():
+                split += 1
+            anneal = cr.ssDNA(sequence[split:], alphabet=alphabet)
+            overhang = cr.ssDNA(sequence[:split], alphabet=alphabet)
+            primer_list.append(cr.Primer(anneal, overhang=overhang,
+                                         name=name, note=note))
+    return primer_list
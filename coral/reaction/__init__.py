@@ -3,6 +3,7 @@ from ._resect import three_resect, five_resect
 from ._central_dogma import transcribe, translate, reverse_transcribe
 from ._central_dogma import coding_sequence
 from ._restriction import digest
-from ._pcr import pcr
+from ._pcr import pcr, pcr_products, PCRProduct
+from ._pcr_screen import pcr_screen, PCRScreenResult
 from ._gibson import gibson
 from ._oligo_assembly import assemble_oligos, bind_unique
@@ -1,4 +1,5 @@
 '''PCR reaction(s).'''
+import bisect
 import coral as cr
 
 
@@ -31,10 +32,10 @@ def pcr(template, primer1, primer2, min_tm=50.0, min_primer_len=14):
 
     '''
     # Find match in top or bottom strands for each primer
-    p1_matches = cr.analysis.anneal(template, primer1, min_tm=min_tm,
-                                    min_len=min_primer_len)
-    p2_matches = cr.analysis.anneal(template, primer2, min_tm=min_tm,
-                                    min_len=min_primer_len)
+    p1_matches, p2_matches = cr.analysis.anneal_many(template,
+                                                     [primer1, primer2],
+                                                     min_tm=min_tm,
+                                                     min_len=min_primer_len)
     p1_binding_locations = [m[0] for strand in p1_matches for m in strand]
     p2_binding_locations = [m[0] for strand in p2_matches for m in strand]
 
@@ -159,3 +160,163 @@ def pcr(template, primer1, primer2, min_tm=50.0, min_primer_len=14):
                 rev_overhang.to_ds().reverse_complement())
 
     return amplicon
+
+
+class PCRProduct(object):
+    '''A possible product of a PCR. The amplicon sequence is only built from
+    the template when it is first needed.'''
+
+    def __init__(self, template, forward, reverse, start, span, forward_len,
+                 reverse_len):
+        '''
+        :param template: DNA template of the PCR.
+        :type template: coral.DNA
+        :param forward: Primer that binds the template's bottom strand
+                        (extending along the top strand).
+        :type forward: coral.Primer
+        :param reverse: Primer that binds the template's top strand.
+        :type reverse: coral.Primer
+        :param start: Top strand index where the forward primer's annealing
+                      region starts.
+        :type start: int
+        :param span: Number of template bases amplified, which may be more
+                     than the length of a circular template.
+        :type span: int
+        :param forward_len: Number of bases of the forward primer that anneal.
+        :type forward_len: int
+        :param reverse_len: Number of bases of the reverse primer that anneal.
+        :type reverse_len: int
+        :returns: coral.reaction.PCRProduct instance.
+
+        '''
+        self.template = template
+        self.forward = forward
+        self.reverse = reverse
+        self.start = start
+        self.span = span
+        self.forward_len = forward_len
+        self.reverse_len = reverse_len
+        self.size = (len(forward) - forward_len + span + len(reverse) -
+                     reverse_len)
+        self._amplicon = None
+
+    @property
+    def amplicon(self):
+        '''The amplified sequence, including primer overhangs.'''
+        if self._amplicon is None:
+            template = self.template
+            amplicon = self.forward.primer()[:-self.forward_len].to_ds()
+            start = self.start
+            remaining = self.span
+            while remaining:
+                # Continue over the origin of circular templates
+                stop = min(start + remaining, len(template))
+                amplicon += template[start:stop]
+                remaining -= stop - start
+                start = 0
+            rev_overhang = self.reverse.primer()[:-self.reverse_len].to_ds()
+            self._amplicon = amplicon + rev_overhang.reverse_complement()
+        return self._amplicon
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return 'PCRProduct of {} bp from template position {}'.format(
+            self.size, self.start)
+
+
+def pcr_products(template, primer1, primer2, max_size, min_tm=50.0,
+                 min_primer_len=14):
+    '''Find every product a pair of primers can amplify from a template,
+    including products of either primer on its own. Unlike coral.reaction.pcr,
+    primers may bind any number of times.
+
+    :param template: DNA template from which to PCR.
+    :type template: coral.DNA
+    :param primer1: First PCR primer.
+    :type primer1: coral.Primer
+    :param primer2: Second PCR primer.
+    :type primer2: coral.Primer
+    :param max_size: Maximum length of a product, including overhangs.
+    :type max_size: int
+    :param min_tm: Minimum melting temperature (Tm) at which primers must bind
+                   to the template.
+    :type min_tm: float
+    :param min_primer_len: Minimum amount of template homology required at the
+                           3' end of each primer.
+    :type min_primer_len: int
+    :returns: Products, shortest first. Their sequences are built when their
+              `amplicon` is first accessed.
+    :rtype: list of coral.reaction.PCRProduct
+
+    '''
+    primers = [primer1, primer2]
+    if primer1 == primer2:
+        # The same primer would find every product twice
+        primers = [primer1]
+    matches = cr.analysis.anneal_many(template, primers, min_tm=min_tm,
+                                      min_len=min_primer_len)
+    return _join_products(template, primers, matches, max_size)
+
+
+def _join_products(template, primers, matches, max_size):
+    '''Pair up the binding sites of primers into products.
+
+    :param template: DNA template from which to PCR.
+    :type template: coral.DNA
+    :param primers: Distinct primers.
+    :type primers: list of coral.Primer
+    :param matches: Binding sites of each primer, as returned by
+                    coral.analysis.anneal_many.
+    :type matches: list
+    :param max_size: Maximum length of a product, including overhangs.
+    :type max_size: int
+    :returns: Products, shortest first.
+    :rtype: list of coral.reaction.PCRProduct
+
+    '''
+    n = len(template)
+
+    # Forward primers (bound to the bottom strand), sorted by the top strand
+    # start of their annealing regions
+    forwards = []
+    for primer, (tops, _) in zip(primers, matches):
+        sites = [(location - length, length) for location, length in tops]
+        if template.circular:
+            # Products can start before the origin
+            sites = [((start % n) - shift, length) for start, length in sites
+                     for shift in [0, n]]
+        sites.sort()
+        forwards.append((primer, [start for start, _ in sites], sites))
+
+    products = []
+    for reverse, (_, bottoms) in zip(primers, matches):
+        for location, reverse_len in bottoms:
+            # Top strand location of the reverse primer's 3' end
+            rev_3_top = n - location
+            rev_overhang = len(reverse) - reverse_len
+            for forward, starts, sites in forwards:
+                # Sweep over the forward primers that start before the
+                # reverse primer's 3' end, close enough to fit max_size
+                lowest = rev_3_top + reverse_len - (max_size - rev_overhang)
+                if template.circular:
+                    lowest = max(lowest, rev_3_top - n + 1)
+                first = bisect.bisect_left(starts, lowest)
+                last = bisect.bisect_right(starts, rev_3_top)
+                for start, forward_len in sites[first:last]:
+                    span = rev_3_top + reverse_len - start
+                    if span < forward_len:
+                        # The reverse primer binds within the forward one -
+                        # only a circular template can be copied all the way
+                        # around to it
+                        if not template.circular:
+                            continue
+                        span += n
+                    product = PCRProduct(template, forward, reverse,
+                                         start % n, span, forward_len,
+                                         reverse_len)
+                    if len(product) <= max_size:
+                        products.append(product)
+    products.sort(key=lambda product: (product.size, product.start))
+    return products
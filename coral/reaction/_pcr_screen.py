@@ -0,0 +1,252 @@
+'''Screen many templates against many PCR primer pairs.'''
+import collections
+import csv
+import hashlib
+import multiprocessing
+import os
+import coral as cr
+from ._pcr import _join_products
+
+
+PCRScreenResult = collections.namedtuple('PCRScreenResult',
+                                         ['template', 'pair', 'sizes',
+                                          'reason'])
+
+# Checkpoint files start with the screen's settings, then list the results
+_SETTINGS = ['pairs', 'pairs_digest', 'max_size', 'min_tm', 'min_primer_len']
+_FIELDS = ['index', 'template', 'pair', 'sizes', 'reason']
+
+
+def pcr_screen(templates, primer_pairs, max_size=10000, min_tm=50.0,
+               min_primer_len=14, processes=None, chunk_size=8,
+               checkpoint=None, progress=None):
+    '''Find the sizes of the products of every primer pair on every
+    template. Templates are handed to the worker processes in chunks as
+    they free up, and each template is annealed to all of the primers at
+    once.
+
+    :param templates: Templates, or paths of files to read them from (see
+                      coral.io.read_dna). Files are read by the workers.
+    :type templates: list of coral.DNA or str
+    :param primer_pairs: Pairs of primers.
+    :type primer_pairs: list of 2-tuples of coral.Primer
+    :param max_size: Maximum length of a product, including overhangs.
+    :type max_size: int
+    :param min_tm: Minimum melting temperature (Tm) at which primers must bind
+                   to the template.
+    :type min_tm: float
+    :param min_primer_len: Minimum amount of template homology required at the
+                           3' end of each primer.
+    :type min_primer_len: int
+    :param processes: Number of worker processes. By default, everything runs
+                      in this process.
+    :type processes: int
+    :param chunk_size: Number of templates handed to a worker at a time.
+    :type chunk_size: int
+    :param checkpoint: Path of a csv file to which results are appended as
+                       each template is finished. If the file exists,
+                       templates it has results for are not screened again,
+                       so an interrupted screen can be resumed by running it
+                       again with the same templates (in the same order) and
+                       checkpoint. The primer pairs and settings must be the
+                       same too.
+    :type checkpoint: str
+    :param progress: Function called with the number of finished templates
+                     and the total number of templates each time a template
+                     is finished.
+    :type progress: function
+    :returns: A row for each template and pair, in the order they were
+              given. Each row gives the template (its path, or its name or
+              index if it was given as a sequence), the index of the pair,
+              the sizes of its products (shortest first) and the reason there
+              are none (None if there are products).
+    :rtype: list of coral.reaction.PCRScreenResult
+    :raises: ValueError if `chunk_size` is less than 1.
+             ValueError if `checkpoint` was written by a screen with other
+             primer pairs or settings.
+
+    '''
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
+    templates = list(templates)
+    primer_pairs = [tuple(pair) for pair in primer_pairs]
+    settings = _checkpoint_settings(primer_pairs, max_size, min_tm,
+                                    min_primer_len)
+
+    finished = {}
+    if checkpoint is not None and os.path.exists(checkpoint):
+        finished, size = _read_checkpoint(checkpoint, settings,
+                                          len(primer_pairs))
+        if size < os.path.getsize(checkpoint):
+            # Drop the rows of a template that was being written in a crash
+            with open(checkpoint, 'r+b') as checkpoint_file:
+                checkpoint_file.truncate(size)
+    args_list = [[index, template, primer_pairs, max_size, min_tm,
+                  min_primer_len] for index, template in enumerate(templates)
+                 if index not in finished]
+
+    if progress is not None:
+        progress(len(finished), len(templates))
+    if processes is not None and processes > 1 and len(args_list) > 1:
+        pool = multiprocessing.Pool(processes)
+        screened = pool.imap_unordered(run_pcr_screen, args_list, chunk_size)
+    else:
+        pool = None
+        screened = (run_pcr_screen(args) for args in args_list)
+
+    checkpoint_file = None
+    try:
+        if checkpoint is not None:
+            new_file = not os.path.exists(checkpoint) or \
+                os.path.getsize(checkpoint) == 0
+            checkpoint_file = open(checkpoint, 'ab')
+            writer = csv.writer(checkpoint_file)
+            if new_file:
+                writer.writerow(_SETTINGS)
+                writer.writerow(settings)
+                writer.writerow(_FIELDS)
+        for index, rows in screened:
+            finished[index] = rows
+            if checkpoint_file is not None:
+                # Write whole templates at once - resuming drops the rows of
+                # a template that wasn't finished
+                writer.writerows(_checkpoint_row(index, row) for row in rows)
+                checkpoint_file.flush()
+            if progress is not None:
+                progress(len(finished), len(templates))
+    finally:
+        if checkpoint_file is not None:
+            checkpoint_file.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return [row for index in sorted(finished) for row in finished[index]]
+
+
+def run_pcr_screen(args):
+    '''Screen a single template using a 6-tuple of its index, the template,
+    and the rest of the arguments of pcr_screen (in the same order).
+    Necessary to make picklable function for multiprocessing.'''
+    index, template, primer_pairs, max_size, min_tm, min_primer_len = args
+    if isinstance(template, basestring):
+        label = template
+    else:
+        label = template.name or str(index)
+
+    def failed(reason):
+        return index, [PCRScreenResult(label, i, (), reason) for i in
+                       range(len(primer_pairs))]
+
+    if isinstance(template, basestring):
+        try:
+            template = cr.io.read_dna(template)
+        except Exception as error:
+            # Parsers raise all sorts of errors on malformed files - one bad
+            # file shouldn't stop the screen
+            return failed('Could not read template: {!r}'.format(error))
+    if len(template) < min_primer_len:
+        return failed('Template is shorter than min_primer_len.')
+
+    # Anneal every distinct primer once
+    primers = []
+    for pair in primer_pairs:
+        for primer in pair:
+            if len(primer) >= min_primer_len and primer not in primers:
+                primers.append(primer)
+    matches = cr.analysis.anneal_many(template, primers, min_tm=min_tm,
+                                      min_len=min_primer_len)
+
+    rows = []
+    for i, (primer1, primer2) in enumerate(primer_pairs):
+        if min(len(primer1), len(primer2)) < min_primer_len:
+            reason = 'Primer is shorter than min_primer_len.'
+            rows.append(PCRScreenResult(label, i, (), reason))
+            continue
+        pair_primers = [primer1] if primer1 == primer2 else [primer1, primer2]
+        pair_matches = [matches[primers.index(primer)] for primer in
+                        pair_primers]
+        products = _join_products(template, pair_primers, pair_matches,
+                                  max_size)
+        if products:
+            sizes = tuple(product.size for product in products)
+            rows.append(PCRScreenResult(label, i, sizes, None))
+        elif not any(strand for primer_matches in pair_matches for strand in
+                     primer_matches):
+            rows.append(PCRScreenResult(label, i, (), 'No binding sites.'))
+        else:
+            rows.append(PCRScreenResult(label, i, (), 'No products.'))
+    return index, rows
+
+
+def _checkpoint_settings(primer_pairs, max_size, min_tm, min_primer_len):
+    '''Describe the primer pairs and settings of a screen as a row of a
+    checkpoint file.'''
+    sequences = '\n'.join(str(primer.primer()).upper() for pair in
+                           primer_pairs for primer in pair)
+    return [str(len(primer_pairs)), hashlib.sha1(sequences).hexdigest(),
+            str(max_size), repr(float(min_tm)), str(min_primer_len)]
+
+
+def _checkpoint_row(index, row):
+    '''Convert a result to a row of a checkpoint file.'''
+    return [index, row.template, row.pair,
+            ' '.join(str(size) for size in row.sizes), row.reason or '']
+
+
+def _read_checkpoint(path, settings, pair_count):
+    '''Read the results in a checkpoint file.
+
+    :param path: Path of the checkpoint file.
+    :type path: str
+    :param settings: Settings of the screen being resumed (see
+                     _checkpoint_settings).
+    :type settings: list of str
+    :param pair_count: Number of primer pairs, and so of rows per template.
+    :type pair_count: int
+    :returns: Results of each finished template, keyed by its index, and the
+              length of the file up to the end of the last finished template.
+    :rtype: tuple
+    :raises: ValueError if the file isn't a checkpoint, or was written by a
+             screen with other primer pairs or settings.
+
+    '''
+    with open(path, 'rb') as checkpoint_file:
+        lines = checkpoint_file.readlines()
+    # A crash can leave the last line unfinished
+    if lines and not lines[-1].endswith('\n'):
+        lines.pop()
+    ends = [0]
+    for line in lines:
+        ends.append(ends[-1] + len(line))
+    reader = csv.reader(lines)
+    records = []
+    try:
+        for record in reader:
+            records.append((record, ends[reader.line_num]))
+    except csv.Error:
+        # Unfinished quoted value
+        pass
+
+    if records and records[0][0] != _SETTINGS:
+        raise ValueError('{} is not a pcr_screen checkpoint.'.format(path))
+    if len(records) > 1 and records[1][0] != settings:
+        raise ValueError('{} was written by a screen with other primer pairs '
+                         'or settings.'.format(path))
+    if len(records) < 3:
+        # Not even the header was finished
+        return {}, 0
+
+    finished = {}
+    unfinished = {}
+    size = records[2][1]
+    for record, end in records[3:]:
+        index, template, pair, sizes, reason = record
+        sizes = tuple(int(value) for value in sizes.split())
+        row = PCRScreenResult(template, int(pair), sizes, reason or None)
+        rows = unfinished.setdefault(int(index), [])
+        rows.append(row)
+        if len(rows) == pair_count:
+            finished[int(index)] = unfinished.pop(int(index))
+            size = end
+    return finished, size
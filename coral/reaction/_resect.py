@@ -14,6 +14,8 @@ def five_resect(dna, n_bases):
 
     '''
     new_instance = dna.copy()
+    # Only the top strand is resected - keep the bottom strand as it is
+    new_instance.bottom = dna.bottom.copy()
     if n_bases >= len(dna):
         new_instance.top.seq = ''.join(['-' for i in range(len(dna))])
     else:
@@ -36,6 +38,8 @@ def three_resect(dna, n_bases):
 
     '''
     new_instance = dna.copy()
+    # Only the top strand is resected - keep the bottom strand as it is
+    new_instance.bottom = dna.bottom.copy()
     if n_bases >= len(dna):
         new_instance.top.seq = ''.join(['-' for i in range(len(dna))])
     else:
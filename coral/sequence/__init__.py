@@ -4,4 +4,6 @@ from ._dna import DNA, ssDNA, RestrictionSite, Primer
 from ._peptide import Peptide
 from ._rna import RNA
 from ._sequence import Feature, Sequence
+from ._features import FeatureList
 from ._nucleicacid import NucleicAcid
+from ._batch import SequenceBatch
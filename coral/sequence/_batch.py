@@ -0,0 +1,318 @@
+'''Columnar storage for many DNA sequences.'''
+import re
+import numpy as np
+import coral as cr
+from ..constants.codons import CODONS
+from . import alphabets
+from ._dna import DNA
+from ._peptide import Peptide
+
+
+# 2-bit codes of bases for translation (U is read as T). Anything else is
+# marked invalid and translates to X.
+_CODON_BASES = np.zeros(256, dtype=np.int64) - 1
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'TtUu']):
+    for _base in _bases:
+        _CODON_BASES[ord(_base)] = _code
+
+_GC = np.zeros(256, dtype=np.bool_)
+for _base in 'GCgc':
+    _GC[ord(_base)] = True
+
+# Amino acid for each codon, indexed by 16 * b1 + 4 * b2 + b3, followed by X
+# for invalid codons
+_AMINO_ACIDS = np.frombuffer(''.join([CODONS[a + b + c] for a in 'ACGU' for
+                                      b in 'ACGU' for c in 'ACGU']) + 'X',
+                             dtype=np.uint8)
+
+
+class SequenceBatch(object):
+    '''Many DNA sequences stored in one contiguous buffer. Each sequence is
+    a window of the buffer given by `offsets`, so operations run over every
+    sequence at once rather than once per Python object. Sequences are
+    stored by their top strand and are assumed to be fully double-stranded.
+    '''
+
+    def __init__(self, sequences, names=None, circular=None,
+                 alphabet=alphabets.dna, skip_checks=False):
+        '''
+        :param sequences: Sequences to store.
+        :type sequences: list of str or coral.DNA
+        :param names: Name of each sequence. Defaults to the names of DNA
+                      inputs (or '').
+        :type names: list of str
+        :param circular: Topology of every sequence, or of each sequence.
+                         Defaults to the topology of DNA inputs (strings are
+                         linear).
+        :type circular: bool or list of bools
+        :param alphabet: Alphabet of the sequences.
+        :type alphabet: coral.Alphabet
+        :param skip_checks: Skips input checking (alphabet check), useful for
+                            computationally intense tasks.
+        :type skip_checks: bool
+        :returns: coral.SequenceBatch instance.
+        :raises: ValueError if `names` or `circular` don't match the number
+                 of sequences.
+
+        '''
+        sequences = list(sequences)
+        strings = [str(sequence) for sequence in sequences]
+        joined = ''.join(strings)
+        if not skip_checks:
+            joined = alphabet.validate(joined)
+
+        if names is None:
+            names = [getattr(sequence, 'name', '') for sequence in
+                     sequences]
+        if circular is None:
+            circular = [getattr(sequence, 'circular', False) for sequence in
+                        sequences]
+        elif isinstance(circular, bool):
+            circular = [circular] * len(sequences)
+        if len(names) != len(sequences) or len(circular) != len(sequences):
+            raise ValueError('Need a name and topology for every sequence.')
+
+        lengths = [len(string) for string in strings]
+        self.data = np.frombuffer(joined, dtype=np.uint8)
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.offsets = self.offsets.astype(np.int64)
+        self.names = list(names)
+        self.circular = np.array(circular, dtype=np.bool_)
+        self.alphabet = alphabet
+
+    @classmethod
+    def _from_buffer(cls, data, offsets, names, circular, alphabet):
+        '''Build a batch around an existing buffer without checking it.'''
+        batch = cls.__new__(cls)
+        batch.data = data
+        batch.offsets = offsets
+        batch.names = names
+        batch.circular = circular
+        batch.alphabet = alphabet
+        return batch
+
+    @property
+    def lengths(self):
+        '''The length of each sequence, as a numpy array.'''
+        return np.diff(self.offsets)
+
+    def _gather(self, starts, lengths):
+        '''Copy windows of the buffer into a new buffer.
+
+        :param starts: Start of each window in the buffer.
+        :type starts: numpy.ndarray
+        :param lengths: Length of each window.
+        :type lengths: numpy.ndarray
+        :returns: The new buffer and its offsets.
+        :rtype: tuple of numpy.ndarray
+
+        '''
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        index = (np.repeat(starts - offsets[:-1], lengths) +
+                 np.arange(offsets[-1]))
+        return self.data[index], offsets
+
+    def __getitem__(self, key):
+        '''Get a sequence or a subset of the batch.
+
+        :param key: Index of a sequence, or a slice, list or array of indices
+                    of sequences.
+        :type key: int, slice, list, or numpy.ndarray
+        :returns: A single sequence for an int, otherwise a new batch.
+        :rtype: coral.DNA or coral.SequenceBatch
+
+        '''
+        if isinstance(key, (int, long, np.integer)):
+            name = self.names[key]
+            key %= len(self)
+            sequence = self.data[self.offsets[key]:self.offsets[key + 1]]
+            return DNA(sequence.tostring(), alphabet=self.alphabet,
+                       circular=bool(self.circular[key]), name=name,
+                       skip_checks=True)
+
+        members = np.arange(len(self))[key]
+        data, offsets = self._gather(self.offsets[members],
+                                     self.lengths[members])
+        names = [self.names[i] for i in members]
+        return self._from_buffer(data, offsets, names,
+                                 self.circular[members], self.alphabet)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'SequenceBatch of {} sequences'.format(len(self))
+
+    def to_dna(self):
+        '''Convert the batch into DNA.
+
+        :returns: A DNA sequence for each member of the batch.
+        :rtype: list of coral.DNA
+
+        '''
+        return [self[i] for i in range(len(self))]
+
+    def slice(self, start=0, stop=None):
+        '''Take the same slice of every sequence, e.g. the last 20 bases
+        with `batch.slice(-20)`. Negative indices count back from the end of
+        each sequence, as they do for Python slices.
+
+        :param start: Start of the slice.
+        :type start: int
+        :param stop: End of the slice. Defaults to the end of each sequence.
+        :type stop: int
+        :returns: A batch of linear slices.
+        :rtype: coral.SequenceBatch
+
+        '''
+        lengths = self.lengths
+
+        def resolve(index):
+            if index < 0:
+                return np.maximum(lengths + index, 0)
+            return np.minimum(index, lengths)
+
+        starts = resolve(start)
+        if stop is None:
+            stops = lengths
+        else:
+            stops = resolve(stop)
+        new_lengths = np.maximum(stops - starts, 0)
+        data, offsets = self._gather(self.offsets[:-1] + starts, new_lengths)
+        return self._from_buffer(data, offsets, list(self.names),
+                                 np.zeros(len(self), dtype=np.bool_),
+                                 self.alphabet)
+
+    def reverse_complement(self):
+        '''Reverse complement every sequence.
+
+        :returns: A batch of the reverse complements.
+        :rtype: coral.SequenceBatch
+
+        '''
+        complement = self.alphabet.complement_lookup[self.data]
+        # Each position reads from the mirror position of its own sequence
+        ends = np.repeat(self.offsets[:-1] + self.offsets[1:] - 1,
+                         self.lengths)
+        index = ends - np.arange(len(self.data))
+        return self._from_buffer(complement[index], self.offsets.copy(),
+                                 list(self.names), self.circular.copy(),
+                                 self.alphabet)
+
+    def gc(self):
+        '''Find the frequency of G and C in every sequence.
+
+        :returns: GC content of each sequence (NaN for empty sequences).
+        :rtype: numpy.ndarray
+
+        '''
+        counts = np.concatenate([[0], np.cumsum(_GC[self.data])])
+        gc = counts[self.offsets[1:]] - counts[self.offsets[:-1]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return gc / self.lengths.astype(np.float64)
+
+    def tm(self, parameters='cloning', dna_conc=50, salt_conc=50):
+        '''Calculate the melting temperature of every sequence.
+
+        :param parameters: Nearest-neighbor parameter set (see
+                           coral.thermo.tm).
+        :type parameters: str or coral.thermo.ThermoModel
+        :param dna_conc: DNA concentration in nM.
+        :type dna_conc: float
+        :param salt_conc: Salt concentration in mM.
+        :type salt_conc: float
+        :returns: Melting temperature of each sequence.
+        :rtype: numpy.ndarray
+
+        '''
+        return cr.thermo.tm_batch(self, dna_conc=dna_conc,
+                                  salt_conc=salt_conc, parameters=parameters)
+
+    def _text(self, wrap):
+        '''Join the sequences into one string, separated by newlines.
+
+        :param wrap: Number of bases from the start of each sequence to
+                     repeat at its end.
+        :type wrap: numpy.ndarray
+        :returns: The text, and the start of each sequence in it.
+        :rtype: tuple of str and numpy.ndarray
+
+        '''
+        lengths = self.lengths
+        text_lengths = lengths + wrap + 1
+        text_offsets = np.concatenate([[0], np.cumsum(text_lengths)])
+        position = (np.arange(text_offsets[-1]) -
+                    np.repeat(text_offsets[:-1], text_lengths))
+        members = np.repeat(np.arange(len(self)), text_lengths)
+        source = (self.offsets[:-1][members] +
+                  position % np.maximum(lengths, 1)[members])
+        # Separators read from a newline past the end of the buffer
+        source[position == lengths[members] + wrap[members]] = len(self.data)
+        text = np.append(self.data, np.uint8(ord('\n')))[source]
+        return text.tostring(), text_offsets[:-1]
+
+    def _locate_strand(self, re_pattern, length):
+        '''Find matches of a regex in every sequence of the batch.'''
+        lengths = self.lengths
+        wrap = np.where(self.circular, np.minimum(length - 1, lengths), 0)
+        text, text_offsets = self._text(wrap)
+        starts = np.array([match.start() for match in
+                           re.finditer(re_pattern, text)], dtype=np.int64)
+        members = np.searchsorted(text_offsets, starts, side='right') - 1
+        positions = (starts - text_offsets[members]) % lengths[members]
+        matches = [[] for _ in range(len(self))]
+        for member, position in zip(members.tolist(), positions.tolist()):
+            matches[member].append(position)
+        return matches
+
+    def locate(self, pattern):
+        '''Find a pattern in every sequence. For circular sequences, the
+        search extends over the origin. Sequences shorter than the pattern
+        have no matches.
+
+        :param pattern: Sequence for which to find matches.
+        :type pattern: str or coral.DNA
+        :returns: For each sequence, a list of top and bottom strand indices
+                  of matches (as returned by coral.DNA.locate).
+        :rtype: list of lists of lists of ints
+        :raises: ValueError if the pattern is empty.
+
+        '''
+        pattern = str(pattern).upper()
+        if not pattern:
+            raise ValueError('Cannot search for an empty pattern.')
+        # Wildcards don't match the newlines that separate sequences
+        re_pattern = re.compile('(?=' + pattern.replace('N', '.') + ')')
+        top = self._locate_strand(re_pattern, len(pattern))
+        bottom = self.reverse_complement()._locate_strand(re_pattern,
+                                                          len(pattern))
+        return [[top_matches, bottom_matches] for top_matches, bottom_matches
+                in zip(top, bottom)]
+
+    def translate(self):
+        '''Translate every sequence from its first base until the first stop
+        codon. Codons with bases other than A, T (or U), G, and C translate
+        to X.
+
+        :returns: A peptide for each sequence.
+        :rtype: list of coral.Peptide
+
+        '''
+        n_codons = self.lengths // 3
+        codon_offsets = np.concatenate([[0], np.cumsum(n_codons)])
+        starts = (np.repeat(self.offsets[:-1], n_codons) +
+                  3 * (np.arange(codon_offsets[-1]) -
+                       np.repeat(codon_offsets[:-1], n_codons)))
+        bases = _CODON_BASES[self.data]
+        first, second, third = [bases[starts + i] for i in range(3)]
+        codons = 16 * first + 4 * second + third
+        invalid = (first < 0) | (second < 0) | (third < 0)
+        codons[invalid] = 64
+        amino_acids = _AMINO_ACIDS[codons].tostring()
+
+        peptides = []
+        for start, stop in zip(codon_offsets[:-1].tolist(),
+                               codon_offsets[1:].tolist()):
+            peptide = amino_acids[start:stop].split('*', 1)[0]
+            peptides.append(Peptide(peptide, skip_checks=True))
+        return peptides
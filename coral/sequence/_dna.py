@@ -1,4 +1,5 @@
 '''DNA object classes.'''
+import hashlib
 import os
 import shutil
 import subprocess
@@ -6,7 +7,11 @@ import tempfile
 import coral as cr
 from . import alphabets
 from ._sequence import Feature
+from ._features import FeatureList, shift_features
 from ._nucleicacid import NucleicAcid
+from ._packed import PackedSequence
+from ._rope import SequenceRope, concatenate
+from ._view import SequenceView, materialize
 
 
 class IPythonDisplayImportError(ImportError):
@@ -21,7 +26,7 @@ class ssDNA(NucleicAcid):
     '''ssDNA sequence.'''
 
     def __init__(self, sequence, alphabet=alphabets.dna, circular=False,
-                 skip_checks=False):
+                 skip_checks=False, packed=False):
         '''
         :param sequence: Input sequence (DNA).
         :type sequence: str or iterable
@@ -36,26 +41,32 @@ class ssDNA(NucleicAcid):
         :param skip_checks: Skips input checking (alphabet check), useful for
                             computationally intense tasks.
         :type skip_checks: bool
+        :param packed: Store the sequence using 2 bits per base, greatly
+                       reducing memory use for long sequences.
+        :type packed: bool
 
         '''
         super(ssDNA, self).__init__(sequence, alphabet=alphabet,
                                     circular=circular, skip_checks=skip_checks,
                                     any_char='N')
+        if packed and not self.packed:
+            self._seq = PackedSequence(self._seq)
 
     def copy(self):
-        return type(self)(self.seq, alphabet=self.alphabet,
+        return type(self)(materialize(self._seq), alphabet=self.alphabet,
                           circular=self.circular, skip_checks=True)
 
     def to_ds(self):
-        return DNA(self.seq, alphabet=self.alphabet, circular=self.circular,
-                   skip_checks=True)
+        return DNA(materialize(self._seq), alphabet=self.alphabet,
+                   circular=self.circular, skip_checks=True)
 
 
 class DNA(object):
     '''dsDNA sequence.'''
 
     def __init__(self, dna, alphabet=alphabets.dna, circular=False,
-                 features=None, skip_checks=False, bottom=None, name=None):
+                 features=None, skip_checks=False, bottom=None, name=None,
+                 packed=False):
         '''
         :param dna: Input sequence (DNA).
         :type dna: str
@@ -72,10 +83,15 @@ class DNA(object):
                             computationally intense tasks.
         :type skip_checks: bool
         :param bottom: String for the bottom sequence for manually setting
-                       overhangs, fast copying.
+                       overhangs. If not set, the bottom strand is the
+                       reverse complement of the top strand and is only
+                       computed when first used.
         :type bottom: str
         :param name: Optional name field for your DNA sequence.
         :type name: str
+        :param packed: Store both strands using 2 bits per base, greatly
+                       reducing memory use for long sequences.
+        :type packed: bool
         :returns: coral.DNA instance.
         :rtype: coral.DNA
         :raises: ValueError if an element of `features` isn't of type
@@ -85,16 +101,18 @@ class DNA(object):
 
         '''
         self.alphabet = alphabet
-        dna = str(dna).strip()
+        if not isinstance(dna, (PackedSequence, SequenceRope, SequenceView)):
+            dna = str(dna).strip()
         self.top = ssDNA(dna, alphabet=self.alphabet, circular=circular,
-                         skip_checks=skip_checks)
-        if bottom is None:
-            # If bottom isn't auto-generated, expectation is that it will be
-            # added manually
-            self.bottom = self.top.reverse_complement()
-        else:
+                         skip_checks=skip_checks, packed=packed)
+        # The bottom strand is derived from the top strand on demand unless
+        # it was set explicitly (e.g. to represent overhangs)
+        self._bottom = None
+        self._derived_from = None
+        if bottom is not None:
             self.bottom = ssDNA(bottom, alphabet=self.alphabet,
-                                circular=circular, skip_checks=True)
+                                circular=circular, skip_checks=True,
+                                packed=packed)
 
         if features is None:
             self.features = []
@@ -102,6 +120,9 @@ class DNA(object):
             self.features = features
         self.circular = circular
         self.ds = True
+        self._index = None
+        self._index_key = None
+        self._digest = None
         if name is None:
             self.name = ''
         else:
@@ -144,11 +165,141 @@ class DNA(object):
 
         '''
         # Significant performance improvements by skipping alphabet check
-        features_copy = [feature.copy() for feature in self.features]
-        copy = type(self)(self.top.seq, alphabet=self.alphabet,
-                          circular=self.circular, features=features_copy,
-                          name=self.name, bottom=self.bottom.seq,
-                          skip_checks=True)
+        bottom = self._explicit_bottom()
+        if bottom is not None:
+            bottom = materialize(bottom._seq)
+        copy = type(self)(materialize(self.top._seq), alphabet=self.alphabet,
+                          circular=self.circular, name=self.name,
+                          bottom=bottom, skip_checks=True)
+        # Features are copied when they're first accessed
+        copy._defer_features(self._feature_parts())
+        # The search index stays valid as long as the copy is unchanged
+        copy._index = self._index
+        copy._index_key = self._index_key
+        copy._digest = self._digest
+        copy.top._min_rotation = self.top._min_rotation
+        return copy
+
+    @property
+    def features(self):
+        '''The annotated features, as a coral.sequence.FeatureList.'''
+        self._detach_features()
+        return self._features
+
+    @features.setter
+    def features(self, value):
+        if not isinstance(value, FeatureList):
+            value = FeatureList(value)
+        self._features = value
+        self._pending_features = None
+
+    def _defer_features(self, parts):
+        '''Share shifted features until they're first accessed or the
+        features they're taken from change.
+
+        :param parts: Feature indexes and the shift to apply to them, as
+                      (index, offset, modulo) tuples (see shift_features).
+        :type parts: list of 3-tuples
+
+        '''
+        self._pending_features = parts
+        for index in set(part[0] for part in parts):
+            index.share(self)
+
+    def _detach_features(self):
+        '''Copy the shared features before they change.'''
+        if self._pending_features is not None:
+            self._features = shift_features(self._pending_features)
+            self._pending_features = None
+
+    def _feature_parts(self, offset=0, modulo=0):
+        '''Describe the features after a shift without copying them.
+
+        :param offset: Number of bases to shift by.
+        :type offset: int
+        :param modulo: Length of the sequence if the shift is a rotation,
+                       otherwise 0.
+        :type modulo: int
+        :returns: Feature indexes and the shift to apply to them, as
+                  (index, offset, modulo) tuples (see shift_features).
+        :rtype: list of 3-tuples
+
+        '''
+        if self._pending_features is not None:
+            parts = []
+            for index, part_offset, part_modulo in self._pending_features:
+                if not offset and not modulo:
+                    parts.append((index, part_offset, part_modulo))
+                elif part_modulo in (0, modulo):
+                    parts.append((index, part_offset + offset, modulo))
+                else:
+                    # A rotation can't be combined with other shifts
+                    break
+            else:
+                return parts
+        if not self.features:
+            return []
+        return [(self.features.interval_index(), offset, modulo)]
+
+    @property
+    def bottom(self):
+        '''The bottom (Crick) strand, 5\' to 3\'.'''
+        if self._derived_from is not None:
+            top_seq, bottom_seq = self._derived_from
+            if self._bottom._seq is not bottom_seq:
+                # The derived strand was edited in place - keep it as is
+                self._derived_from = None
+            elif self.top._seq is not top_seq:
+                # The top strand changed - derive the bottom strand again
+                self._bottom = None
+        if self._bottom is None:
+            self._bottom = self.top.reverse_complement()
+            self._derived_from = (self.top._seq, self._bottom._seq)
+        elif self._derived_from is not None:
+            self._bottom.circular = self.top.circular
+        return self._bottom
+
+    @bottom.setter
+    def bottom(self, value):
+        # Setting the bottom strand to None makes it derived again
+        self._bottom = value
+        self._derived_from = None
+
+    def _explicit_bottom(self):
+        '''Return the bottom strand if it was set explicitly (i.e. it isn't
+        simply derived from the top strand), otherwise None.'''
+        if self._bottom is None:
+            return None
+        if self._derived_from is not None and \
+           self._bottom._seq is self._derived_from[1]:
+            return None
+        return self.bottom
+
+    def _bottom_gap(self, index):
+        '''Check for a gap in the bottom strand without deriving it.'''
+        bottom = self._explicit_bottom()
+        if bottom is None:
+            return self.top[-(index % len(self)) - 1] == '-'
+        return bottom[index] == '-'
+
+    @property
+    def packed(self):
+        '''Whether the strands are stored in 2-bit packed form.'''
+        return self.top.packed
+
+    def pack(self):
+        '''Store the DNA using 2 bits per base. The bottom strand shares the
+        top strand's packed buffer unless it has overhangs.
+
+        :returns: A packed copy of the current sequence.
+        :rtype: coral.DNA
+
+        '''
+        copy = self.copy()
+        copy.top.seq = PackedSequence(self.top.seq)
+        bottom = copy._explicit_bottom()
+        if bottom is not None:
+            bottom.seq = PackedSequence(bottom.seq)
         return copy
 
     def circularize(self):
@@ -158,15 +309,16 @@ class DNA(object):
         :rtype: coral.DNA
 
         '''
-        if self.top[-1].seq == '-' and self.bottom[0].seq == '-':
+        if self.top[-1].seq == '-' and self._bottom_gap(0):
             raise ValueError('Cannot circularize - termini disconnected.')
-        if self.bottom[-1].seq == '-' and self.top[0].seq == '-':
+        if self._bottom_gap(-1) and self.top[0].seq == '-':
             raise ValueError('Cannot circularize - termini disconnected.')
 
         copy = self.copy()
         copy.circular = True
         copy.top.circular = True
-        copy.bottom.circular = True
+        if copy._explicit_bottom() is not None:
+            copy.bottom.circular = True
         return copy
 
     def display(self):
@@ -273,8 +425,11 @@ class DNA(object):
 
         '''
         copy = self.copy()
-        copy.top, copy.bottom = copy.bottom, copy.top
-        copy.features = [_flip_feature(f, len(self)) for f in copy.features]
+        if copy._explicit_bottom() is None:
+            copy.top = copy.top.reverse_complement()
+        else:
+            copy.top, copy.bottom = copy.bottom, copy.top
+        copy.features = [_flip_feature(f, len(self)) for f in self.features]
         return copy
 
     def gc(self):
@@ -282,22 +437,48 @@ class DNA(object):
         the exact frequency of Gs and Cs in each strand, so overhangs are
         counted only once.'''
 
+        if self._explicit_bottom() is None:
+            # Complementing a strand doesn't change its GC content
+            return self.top.gc()
         return (self.top.gc() + self.bottom.gc()) / 2
 
     def is_palindrome(self):
-        if self.top.is_palindrome() and self.bottom.is_palindrome():
-            return True
-        else:
+        if not self.top.is_palindrome():
             return False
+        if self._explicit_bottom() is None:
+            # The reverse complement of a palindrome is the same palindrome
+            return True
+        return self.bottom.is_palindrome()
 
     def is_rotation(self, other):
         top_rotation = self.top.is_rotation(other.top)
+        if self._explicit_bottom() is None and \
+           other._explicit_bottom() is None:
+            # Derived bottom strands rotate along with the top strands
+            return top_rotation
         bottom_rotation = self.bottom.is_rotation(other.bottom)
         if top_rotation and bottom_rotation:
             return True
         else:
             return False
 
+    def canonical(self):
+        '''Reorient circular DNA to the smallest rotation of its top strand,
+        so that every rotation of a plasmid has the same canonical form. Use
+        it to compare or deduplicate DNA regardless of rotation, e.g.
+        `set(dna.canonical() for dna in products)`.
+
+        :returns: The canonical rotation of circular DNA, or a copy of linear
+                  DNA.
+        :rtype: coral.DNA
+
+        '''
+        if not self.circular:
+            return self.copy()
+        canonical = self.rotate_to(self.top.min_rotation())
+        canonical.top._min_rotation = (canonical.top._seq, 0)
+        return canonical
+
     def linearize(self, index=0):
         '''Linearize circular DNA at an index.
 
@@ -316,7 +497,8 @@ class DNA(object):
             return copy[index:] + copy[:index]
         copy.circular = False
         copy.top.circular = False
-        copy.bottom.circular = False
+        if copy._explicit_bottom() is not None:
+            copy.bottom.circular = False
 
         return copy
 
@@ -333,11 +515,79 @@ class DNA(object):
                  sequence (for circular DNA).
 
         '''
+        if self._index is not None and \
+           self._index_key == self._state_key():
+            return self._index.locate(pattern)
+
         top_matches = self.top.locate(pattern)
         bottom_matches = self.bottom.locate(pattern)
 
         return [top_matches, bottom_matches]
 
+    def locate_many(self, patterns):
+        '''Find many patterns at once, with a single pass over each strand.
+        For a circular sequence, the search extends over the origin.
+
+        :param patterns: Patterns for which to find matches, or a compiled
+                         set of patterns.
+        :type patterns: list of str or coral.DNA, or
+                        coral.analysis.PatternSet
+        :returns: For each pattern, a list of top and bottom strand indices
+                  of matches (as returned by .locate()).
+        :rtype: list of lists of lists of indices (ints)
+        :raises: ValueError if a pattern is longer than either the input
+                 sequence (for linear DNA) or twice as long as the input
+                 sequence (for circular DNA).
+
+        '''
+        if not isinstance(patterns, cr.analysis.PatternSet):
+            patterns = cr.analysis.PatternSet(patterns)
+        return patterns.locate(self)
+
+    def build_index(self):
+        '''Build a search index that makes repeated calls to .locate() much
+        faster. The index is ignored once the sequence changes.
+
+        :returns: The search index.
+        :rtype: coral.analysis.SequenceIndex
+
+        '''
+        self._index = cr.analysis.SequenceIndex(self)
+        self._index_key = self._state_key()
+        return self._index
+
+    def _state_key(self):
+        '''Identify the current state of the strands and topology.'''
+        bottom = self._explicit_bottom()
+        if bottom is not None:
+            bottom = bottom._seq
+        return (self.top._seq, bottom, self.circular, self.top.circular)
+
+    def digest(self):
+        '''Compute a stable 128-bit digest of the sequence, its topology and
+        its strand structure. The digest is computed once and recomputed only
+        after the sequence changes, and is the same across processes, so it
+        can key caches of results for the sequence.
+
+        :returns: Hex MD5 digest.
+        :rtype: str
+
+        '''
+        key = self._state_key()
+        if self._digest is None or self._digest[0] != key:
+            top = self.top.seq
+            bottom = self._explicit_bottom()
+            if bottom is None or \
+               bottom.seq == self.alphabet.complement(top[::-1]):
+                # A complementary bottom strand adds no information
+                bottom = ''
+            else:
+                bottom = bottom.seq
+            topology = 'circular' if self.circular else 'linear'
+            content = '\n'.join([topology, top, bottom])
+            self._digest = (key, hashlib.md5(content).hexdigest())
+        return self._digest[1]
+
     def mw(self):
         '''Calculate the molecular weight.
 
@@ -362,16 +612,11 @@ class DNA(object):
             raise ValueError('Cannot rotate linear DNA')
         else:
             copy = self.copy()
-            copy.top = self.top.rotate(n)
-            copy.bottom = self.bottom.rotate(-n)
-            copy.features = []
-            for feature in self.features:
-                feature_copy = feature.copy()
-                feature_copy.move(n)
-                # Adjust the start/stop if we move over the origin
-                feature_copy.start = feature_copy.start % len(self)
-                feature_copy.stop = feature_copy.stop % len(self)
-                copy.features.append(feature_copy)
+            # Strands of DNA read from files aren't always marked circular
+            copy.top = self.top.circularize().rotate(n)
+            if self._explicit_bottom() is not None:
+                copy.bottom = self.bottom.circularize().rotate(-n)
+            copy._defer_features(self._feature_parts(n, len(self)))
 
             return copy.circularize()
 
@@ -413,7 +658,8 @@ class DNA(object):
         # Note: if sequence is double-stranded, swapping strand is basically
         # (but not entirely) the same thing - gaps affect accuracy.
         copy.top = self.top.reverse_complement()
-        copy.bottom = self.bottom.reverse_complement()
+        if self._explicit_bottom() is not None:
+            copy.bottom = self.bottom.reverse_complement()
 
         # Remove all features - the reverse complement isn't flip!
         copy.features = []
@@ -456,7 +702,7 @@ class DNA(object):
 
         :param parameters: The tm method to use (cloning, santalucia98,
                        breslauer86)
-        :type parameters: str
+        :type parameters: str or coral.thermo.ThermoModel
 
         '''
         return cr.thermo.tm(self, parameters=parameters)
@@ -507,8 +753,8 @@ class DNA(object):
         if len(self) != 0 and len(other) != 0:
             # If either is empty, let things proceed anyways
             discontinuity[0] = (self.top[-1] == '-' and
-                                other.bottom[-1] == '-')
-            discontinuity[1] = (self.bottom[0] == '-' and
+                                other._bottom_gap(-1))
+            discontinuity[1] = (self._bottom_gap(0) and
                                 other.top[0] == '-')
 
         for_discontinuity = discontinuity[0]
@@ -518,18 +764,24 @@ class DNA(object):
             msg = 'Concatenated DNA would be discontinuous.'
             raise Exception(msg)
 
-        tops = self.top.seq + other.top.seq
-        bottoms = other.bottom.seq + self.bottom.seq
-
-        self_features = [feature.copy() for feature in self.features]
-        other_features = [feature.copy() for feature in other.features]
-        for feature in other_features:
-            feature.move(len(self))
-        features = self_features + other_features
+        packed = self.packed or other.packed
+        if packed:
+            tops = self.top.seq + other.top.seq
+        else:
+            # Repeated additions (e.g. sum of many parts) extend a shared
+            # rope instead of copying the whole sequence each time
+            tops = concatenate(self.top._seq, other.top._seq)
+        if self._explicit_bottom() is None and \
+           other._explicit_bottom() is None:
+            bottoms = None
+        else:
+            bottoms = other.bottom.seq + self.bottom.seq
 
         new_instance = type(self)(tops, alphabet=self.alphabet, circular=False,
                                   skip_checks=True, bottom=bottoms,
-                                  features=features)
+                                  packed=packed)
+        new_instance._defer_features(self._feature_parts() +
+                                     other._feature_parts(len(self)))
 
         return new_instance
 
@@ -554,8 +806,10 @@ class DNA(object):
         :rtype: coral.DNA
 
         '''
+        bottom = self._explicit_bottom()
+        if bottom is not None:
+            del bottom[len(self) - 1 - (key % len(self))]
         del self.top[key]
-        del self.bottom[-key]
 
     def __getitem__(self, key):
         '''Index and slice sequences.
@@ -566,119 +820,42 @@ class DNA(object):
         :rtype: coral.DNA
 
         '''
-        # Adjust features
-        def in_slice(feature, key, circular=False):
-            '''Classify a coral.Feature object as within a slice or not.
-
-            :param feature: The feature to test.
-            :type feature: coral.Feature
-            :param key: A slice key.
-            :type key: slice
-            :param circular: Sets whether the parent sequence is circular.
-            :type circular: bool
-
-            '''
-            if circular:
-                # FIXME: once circular slicing w/ negative indices is
-                # implemented, need to account for that here.
-                # Decide whether a feature's location is within a slice's
-                # coordinates
-                if key.start is None:
-                    if key.stop is None:
-                        # Both are none - copying whole sequence using [:]
-                        return True
-                    else:
-                        # The slice looks like [:stop], i.e. [0:stop]
-                        if feature.stop > key.stop:
-                            # feature extends beyond key stop
-                            return False
-                        else:
-                            if feature.start > key.stop:
-                                # If feature extends over origin, remove it
-                                return False
-                            else:
-                                # Feature is between 0 and key.stop
-                                return True
-                else:
-                    if key.stop is None:
-                        # The slice looks like [start:] i.e.[start:length]
-                        key_start = key.start % len(self)
-                        if feature.start < key_start:
-                            return False
-                        else:
-                            if feature.stop < key_start:
-                                # Feature extends over origin - remove it
-                                return False
-                            else:
-                                # Feature is between key.start and end of seq
-                                return True
-                    else:
-                        # The slice looks like [key.start:key.stop]
-                        if feature.start < key.start or \
-                           feature.stop > key.stop:
-                            return False
-                        else:
-                            return True
-            if key.start is None:
-                if key.stop is None:
-                    # Copying whole sequence with [:]
-                    return True
-                else:
-                    # Slice looks like [:key.stop]
-                    if feature.stop > key.stop:
-                        # Feature ends after key.stop
-                        return False
-                    else:
-                        # Feature ends before key.stop
-                        return True
-            else:
-                if key.stop is None:
-                    # Slice looks like [key.start:]
-                    if feature.start < key.start:
-                        return False
-                    else:
-                        return True
-                else:
-                    # The slice looks like [key.start:key.stop]
-                    if feature.start < key.start or \
-                       feature.stop > key.stop:
-                        return False
-                    else:
-                        return True
-
-        saved_features = []
-        if self.features:
-            if isinstance(key, slice):
-                # If a slice, remove stuff that isn't in the slice and
-                # adjust feature starts/stops
-                if key.step == 1 or key.step is None:
-                    for feature in self.features:
-                        if in_slice(feature, key, self.circular):
-                            feature_copy = feature.copy()
-                            if key.start:
-                                feature_copy.move(-(key.start % len(self)))
-                            saved_features.append(feature_copy)
-                else:
-                    # Don't copy any features - a non-1 step size should
-                    # not leave any features instace.
-                    pass
-            else:
-                for feature in self.features:
-                    if feature.start == feature.stop == key:
-                        feature_copy = feature.copy()
-                        feature_copy.move(key)
-                        saved_features.append(feature_copy)
-
         # Run __getitem__ on top and bottom sequences
         new_top = self.top.__getitem__(key)
-        # TODO: improve efficiency of bottom's __getitem__ (this is a slow
-        # strategy)
-        new_bottom = self.bottom[::-1][key][::-1]
-
-        copy = type(self)(new_top.seq, alphabet=self.alphabet, circular=False,
-                          features=saved_features, bottom=self.bottom.seq,
-                          skip_checks=True)
-        copy.bottom = new_bottom
+        # The bottom strand runs antiparallel to the top, so a contiguous
+        # slice of the top is a contiguous slice of the bottom
+        bottom = self._explicit_bottom()
+        length = len(self)
+        if bottom is None:
+            new_bottom = None
+        elif isinstance(key, slice):
+            if key.step is None or key.step == 1:
+                start, stop, _ = key.indices(length)
+                new_bottom = bottom[length - stop:length - start]._seq
+            else:
+                new_bottom = bottom[::-1][key][::-1]._seq
+        else:
+            new_bottom = bottom[length - 1 - (key % length)]._seq
+
+        copy = type(self)(new_top._seq, alphabet=self.alphabet,
+                          circular=False, bottom=new_bottom, skip_checks=True)
+
+        # Keep the features that are within the slice
+        if isinstance(key, slice):
+            start, stop, step = key.indices(length)
+            if step != 1:
+                # A non-1 step size should not leave any features intact
+                pass
+            elif start == 0 and stop == length:
+                copy._defer_features(self._feature_parts())
+            elif start < stop:
+                copy.features = shift_features(self._feature_parts(), start,
+                                               stop)
+        else:
+            # Only zero-length features fit at a single index
+            position = key % length
+            copy.features = shift_features(self._feature_parts(), position,
+                                           position)
 
         return copy
 
@@ -691,15 +868,19 @@ class DNA(object):
 
         '''
         tops_equal = self.top == other.top
-        bottoms_equal = self.bottom == other.bottom
-        if tops_equal and bottoms_equal:
-            return True
-        else:
+        if not tops_equal:
             return False
+        if self._explicit_bottom() is None and \
+           other._explicit_bottom() is None:
+            # Both bottom strands are derived from equal top strands
+            return True
+        return self.bottom == other.bottom
 
     def __hash__(self):
-        # Enables the use of functions like set() - hash unique attributes
-        return hash(self.top.seq + self.bottom.seq + str(self.circular))
+        # Enables the use of functions like set() - hash unique attributes.
+        # The digest is cached, so repeated hashing doesn't touch the
+        # sequence.
+        return hash(self.digest())
 
     def __len__(self):
         return len(self.top)
@@ -707,14 +888,12 @@ class DNA(object):
     def __mul__(self, n):
         copy = self.copy()
         copy.top = self.top * n
-        copy.bottom = self.bottom * n
-        copy.features = []
+        if self._explicit_bottom() is not None:
+            copy.bottom = self.bottom * n
+        parts = []
         for i in range(n):
-            for feature in self.features:
-                new_feature = feature.copy()
-                new_feature.start += i * len(self)
-                new_feature.stop += i * len(self)
-                copy.features = []
+            parts += self._feature_parts(i * len(self))
+        copy._defer_features(parts)
 
         return copy
 
@@ -752,14 +931,17 @@ class DNA(object):
         if new_value == '-':
             raise ValueError('Cannot insert gap - split sequence instead.')
 
+        bottom = self._explicit_bottom()
         self.top[index] = new_value
-        self.bottom = self.bottom[::-1][index][::-1]
+        if bottom is not None:
+            bottom_index = len(self) - 1 - (index % len(self))
+            bottom[bottom_index] = self.top[index].complement()
 
     def __str__(self):
         return self.top.seq
 
 
-def _flip_feature(self, feature, parent_len):
+def _flip_feature(feature, parent_len):
     '''Adjust a feature's location when flipping DNA.
 
     :param feature: The feature to flip.
@@ -0,0 +1,348 @@
+'''Interval indexing of sequence features.'''
+import bisect
+import weakref
+
+
+def _invalidating(method):
+    '''Wrap a list method so that it invalidates the feature index.'''
+    def wrapped(self, *args, **kwargs):
+        self._invalidate()
+        return method(self, *args, **kwargs)
+    wrapped.__name__ = method.__name__
+    wrapped.__doc__ = method.__doc__
+    return wrapped
+
+
+class FeatureList(list):
+    '''List of features that supports fast range queries. An interval index
+    is built the first time it is queried and rebuilt after the list or the
+    coordinates of any of its features change.
+
+    Features that cross the origin of a circular sequence have a stop
+    coordinate smaller than their start coordinate.'''
+
+    def __init__(self, features=()):
+        '''
+        :param features: Initial features.
+        :type features: list of coral.Feature
+        :returns: coral.sequence.FeatureList instance.
+
+        '''
+        super(FeatureList, self).__init__(features)
+        self._index = None
+
+    def interval_index(self):
+        '''Get an up-to-date interval index of the features.
+
+        :returns: An immutable index of the features and their current
+                  coordinates.
+        :rtype: coral.sequence._features.FeatureIndex
+
+        '''
+        if self._index is None or not self._index.current:
+            self._index = FeatureIndex(self)
+        return self._index
+
+    def overlapping(self, start, stop):
+        '''Find features that overlap a region. If `stop` is smaller than
+        `start`, the region crosses the origin.
+
+        :param start: Start of the region (0-indexed).
+        :type start: int
+        :param stop: Stop of the region (1-indexed, like slices).
+        :type stop: int
+        :returns: The overlapping features, in list order.
+        :rtype: list of coral.Feature
+
+        '''
+        index = self.interval_index()
+        return [self[i] for i in index.overlapping(start, stop)]
+
+    def within(self, start, stop):
+        '''Find features that are contained in a region. If `stop` is smaller
+        than `start`, the region crosses the origin.
+
+        :param start: Start of the region (0-indexed).
+        :type start: int
+        :param stop: Stop of the region (1-indexed, like slices).
+        :type stop: int
+        :returns: The contained features, in list order.
+        :rtype: list of coral.Feature
+
+        '''
+        index = self.interval_index()
+        return [self[i] for i in index.within(start, stop)]
+
+    def _invalidate(self):
+        if self._index is not None:
+            self._index.current = False
+            self._index = None
+
+    # Any change to the list invalidates the index
+    append = _invalidating(list.append)
+    extend = _invalidating(list.extend)
+    insert = _invalidating(list.insert)
+    pop = _invalidating(list.pop)
+    remove = _invalidating(list.remove)
+    reverse = _invalidating(list.reverse)
+    sort = _invalidating(list.sort)
+    __setitem__ = _invalidating(list.__setitem__)
+    __delitem__ = _invalidating(list.__delitem__)
+    __iadd__ = _invalidating(list.__iadd__)
+    __imul__ = _invalidating(list.__imul__)
+    if hasattr(list, '__setslice__'):
+        __setslice__ = _invalidating(list.__setslice__)
+        __delslice__ = _invalidating(list.__delslice__)
+
+
+class FeatureIndex(object):
+    '''Immutable interval index of a list of features. Coordinates are
+    recorded when the index is built, so an index can be used to place
+    features even after the original features have moved.
+
+    Sequences can share an index instead of copying its features (see
+    share). The first change to an indexed feature detaches them, so that
+    they copy the features before the change.'''
+
+    def __init__(self, features):
+        '''
+        :param features: Features to index.
+        :type features: list of coral.Feature
+        :returns: coral.sequence._features.FeatureIndex instance.
+
+        '''
+        self.features = list(features)
+        self.starts = [feature.start for feature in self.features]
+        self.stops = [feature.stop for feature in self.features]
+        # Becomes False once the indexed features no longer match the index
+        self.current = True
+        # Weak references to the sequences that share the features
+        self._dependents = []
+        self._prune_at = 16
+        for feature in self.features:
+            # Indexes of removed features must still detach their dependents
+            feature._indexes = [index for index in feature._indexes if
+                                index.current or index._dependents]
+            feature._indexes.append(self)
+
+        linear = [i for i, (start, stop) in
+                  enumerate(zip(self.starts, self.stops)) if start <= stop]
+        linear.sort(key=lambda i: (self.starts[i], self.stops[i]))
+        self._positions = linear
+        self._sorted_starts = [self.starts[i] for i in linear]
+        self._sorted_stops = [self.stops[i] for i in linear]
+        # Features that cross the origin are rare - keep them separately
+        self._wrapping = [i for i, (start, stop) in
+                          enumerate(zip(self.starts, self.stops)) if
+                          start > stop]
+
+        # Implicit balanced tree over the sorted features: each node (the
+        # midpoint of a range) stores the largest stop in its range
+        self._max_stops = list(self._sorted_stops)
+        self._build(0, len(linear))
+
+    def share(self, dependent):
+        '''Let a sequence use the indexed features without copying them.
+        Before any of them change, its `_detach_features` method is called.
+
+        :param dependent: The sequence that shares the features.
+        :type dependent: coral.DNA
+
+        '''
+        self._dependents.append(weakref.ref(dependent))
+        if len(self._dependents) > self._prune_at:
+            self._dependents = [ref for ref in self._dependents if
+                                ref() is not None]
+            self._prune_at = max(16, 2 * len(self._dependents))
+
+    def detach(self):
+        '''Make every sequence that shares the features copy them.'''
+        dependents = self._dependents
+        self._dependents = []
+        for ref in dependents:
+            dependent = ref()
+            if dependent is not None:
+                dependent._detach_features()
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        max_stop = max(self._max_stops[mid], self._build(lo, mid),
+                       self._build(mid + 1, hi))
+        self._max_stops[mid] = max_stop
+        return max_stop
+
+    def _overlapping(self, lo, hi, start, stop, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_stops[mid] <= start:
+            # Nothing in this range reaches the region
+            return
+        self._overlapping(lo, mid, start, stop, found)
+        if self._sorted_starts[mid] < stop:
+            if self._sorted_stops[mid] > start:
+                found.append(self._positions[mid])
+            self._overlapping(mid + 1, hi, start, stop, found)
+
+    def _within(self, start, stop):
+        lo = bisect.bisect_left(self._sorted_starts, start)
+        hi = bisect.bisect_right(self._sorted_starts, stop)
+        return [self._positions[i] for i in range(lo, hi) if
+                self._sorted_stops[i] <= stop]
+
+    def overlapping(self, start, stop):
+        '''Find indexed features overlapping a region. If `stop` is smaller
+        than `start`, the region crosses the origin.
+
+        :param start: Start of the region (0-indexed).
+        :type start: int
+        :param stop: Stop of the region (1-indexed, like slices).
+        :type stop: int
+        :returns: Positions of the overlapping features in the indexed list,
+                  in order.
+        :rtype: list of ints
+
+        '''
+        found = []
+        if start <= stop:
+            self._overlapping(0, len(self._positions), start, stop, found)
+            wraps = self._wrapping_overlaps(start, stop)
+        else:
+            self._overlapping(0, len(self._positions), start, float('inf'),
+                              found)
+            self._overlapping(0, len(self._positions), float('-inf'), stop,
+                              found)
+            # Two regions crossing the origin always overlap
+            wraps = self._wrapping
+        return sorted(set(found + wraps))
+
+    def _wrapping_overlaps(self, start, stop):
+        return [i for i in self._wrapping if
+                stop > self.starts[i] or start < self.stops[i]]
+
+    def within(self, start, stop):
+        '''Find indexed features that are contained in a region. If `stop` is
+        smaller than `start`, the region crosses the origin.
+
+        :param start: Start of the region (0-indexed).
+        :type start: int
+        :param stop: Stop of the region (1-indexed, like slices).
+        :type stop: int
+        :returns: Positions of the contained features in the indexed list, in
+                  order.
+        :rtype: list of ints
+
+        '''
+        if start <= stop:
+            return sorted(self._within(start, stop))
+        found = self._within(start, float('inf'))
+        found += self._within(float('-inf'), stop)
+        found += [i for i in self._wrapping if
+                  self.starts[i] >= start and self.stops[i] <= stop]
+        return sorted(set(found))
+
+    def shifted(self, offset, modulo=0):
+        '''Coordinates of all indexed features after a shift.
+
+        :param offset: Number of bases to shift by.
+        :type offset: int
+        :param modulo: Length of the circular sequence if the shift is a
+                       rotation, otherwise 0.
+        :type modulo: int
+        :returns: (position, start, stop) for every feature, in order.
+        :rtype: list of 3-tuples
+
+        '''
+        return [(i,) + self._shift(i, offset, modulo) for i in
+                range(len(self.features))]
+
+    def shifted_within(self, start, stop, offset, modulo=0):
+        '''Find features that are contained in a region after a shift.
+
+        :param start: Start of the region (0-indexed), after shifting.
+        :type start: int
+        :param stop: Stop of the region (1-indexed), after shifting.
+        :type stop: int
+        :param offset: Number of bases to shift by.
+        :type offset: int
+        :param modulo: Length of the circular sequence if the shift is a
+                       rotation, otherwise 0.
+        :type modulo: int
+        :returns: (position, start, stop) for every contained feature, in
+                  order. Coordinates are after shifting.
+        :rtype: list of 3-tuples
+
+        '''
+        if not modulo:
+            found = self._within(start - offset, stop - offset)
+        else:
+            # Translate the region back to unshifted coordinates, splitting
+            # it in two if it crosses the origin there.
+            region_start = (start - offset) % modulo
+            region_stop = region_start + stop - start
+            if region_stop <= modulo:
+                found = self._within(region_start, region_stop)
+            else:
+                found = self._within(region_start, modulo)
+                found += self._within(0, region_stop - modulo)
+            found += self._wrapping
+            # Features at the ends of the translated region can wrap to the
+            # other end of the shifted sequence, so check where they land
+            shifted = []
+            for i in sorted(set(found)):
+                new_start, new_stop = self._shift(i, offset, modulo)
+                if start <= new_start <= new_stop <= stop:
+                    shifted.append((i, new_start, new_stop))
+            return shifted
+        return [(i,) + self._shift(i, offset, modulo) for i in
+                sorted(set(found))]
+
+    def _shift(self, i, offset, modulo):
+        start = self.starts[i]
+        stop = self.stops[i]
+        if not modulo:
+            return start + offset, stop + offset
+        # Lengths are preserved when rotating - a feature that ends at the
+        # end of the sequence keeps its stop coordinate rather than wrapping
+        length = stop - start
+        if length < 0:
+            length += modulo
+        new_start = (start + offset) % modulo
+        new_stop = new_start + length
+        if new_stop > modulo:
+            new_stop -= modulo
+        return new_start, new_stop
+
+
+def shift_features(parts, start=None, stop=None):
+    '''Copy shifted features, optionally only those contained in a region.
+
+    :param parts: Shifted feature indexes as (index, offset, modulo) tuples.
+    :type parts: list of 3-tuples
+    :param start: Start of the region (0-indexed). Copied features are moved
+                  to be relative to it.
+    :type start: int
+    :param stop: Stop of the region (1-indexed, like slices).
+    :type stop: int
+    :returns: Copies of the features at their shifted coordinates.
+    :rtype: coral.sequence.FeatureList
+
+    '''
+    copies = []
+    for index, offset, modulo in parts:
+        if start is None:
+            shifted = index.shifted(offset, modulo)
+            origin = 0
+        else:
+            shifted = index.shifted_within(start, stop, offset, modulo)
+            origin = start
+        for i, new_start, new_stop in shifted:
+            feature_copy = index.features[i].copy()
+            # The copy isn't indexed yet, so its coordinates can be set
+            # directly
+            feature_copy.__dict__.update(_start=new_start - origin,
+                                         _stop=new_stop - origin)
+            copies.append(feature_copy)
+    return FeatureList(copies)
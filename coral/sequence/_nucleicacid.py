@@ -2,6 +2,7 @@
 import collections
 import coral as cr
 from ._sequence import Sequence
+from ._view import materialize
 
 
 class NucleicAcid(Sequence):
@@ -34,9 +35,11 @@ class NucleicAcid(Sequence):
                                           any_char=any_char)
         self.ds = False
         self.circular = circular
+        # Cached start of the smallest rotation, with the storage it is for
+        self._min_rotation = None
 
     def copy(self):
-        return type(self)(self.seq, alphabet=self.alphabet,
+        return type(self)(materialize(self._seq), alphabet=self.alphabet,
                           circular=self.circular, skip_checks=True)
 
     def circularize(self):
@@ -52,8 +55,7 @@ class NucleicAcid(Sequence):
 
     def complement(self):
         copy = self.copy()
-        copy_list = [self.alphabet.complements[str(base)] for base in copy]
-        copy.seq = ''.join(copy_list)
+        copy.seq = self.alphabet.complement(self.seq)
         return copy
 
     def gc(self):
@@ -86,12 +88,45 @@ class NucleicAcid(Sequence):
         '''
         if len(self) != len(other):
             return False
+        # Rotations of a sequence all share the same smallest rotation
+        return self._canonical_seq() == other._canonical_seq()
 
-        for i in range(len(self)):
-            if self.rotate(i) == other:
-                return True
+    def min_rotation(self):
+        '''Find the rotation of the sequence that is lexicographically
+        smallest. Runs in linear time and is cached until the sequence
+        changes.
+
+        :returns: The position at which the smallest rotation starts.
+        :rtype: int
+
+        '''
+        if self._min_rotation is None or \
+           self._min_rotation[0] is not self._seq:
+            self._min_rotation = (self._seq, _minimal_rotation(self.seq))
+        return self._min_rotation[1]
+
+    def canonical(self):
+        '''Reorient a circular sequence to its smallest rotation, so that
+        every rotation of a sequence has the same canonical form. Comparing
+        or hashing canonical forms makes equality and set() insensitive to
+        rotation.
+
+        :returns: The canonical rotation of a circular sequence, or a copy of
+                  a linear sequence.
+        :rtype: coral.sequence._sequence.Sequence
 
-        return False
+        '''
+        if not self.circular:
+            return self.copy()
+        canonical = self.rotate_to(self.min_rotation())
+        canonical._min_rotation = (canonical._seq, 0)
+        return canonical
+
+    def _canonical_seq(self):
+        '''The smallest rotation of the sequence as a string.'''
+        index = self.min_rotation()
+        seq = self.seq
+        return seq[index:] + seq[:index]
 
     def linearize(self, index=0):
         '''Linearize the Sequence at an index.
@@ -185,7 +220,11 @@ class NucleicAcid(Sequence):
 
     def reverse_complement(self):
         copy = self.copy()
-        copy.seq = str(self.reverse().complement())
+        if self.packed:
+            # Packed strands reverse complement without decoding
+            copy.seq = self._seq.reverse_complement()
+        else:
+            copy.seq = self.alphabet.complement(self.seq[::-1])
         return copy
 
     def tm(self, parameters='cloning'):
@@ -193,7 +232,39 @@ class NucleicAcid(Sequence):
 
         :param parameters: The tm method to use (cloning, santalucia98,
                        breslauer86)
-        :type parameters: str
+        :type parameters: str or coral.thermo.ThermoModel
 
         '''
         return cr.thermo.tm(self, parameters=parameters)
+
+
+def _minimal_rotation(seq):
+    '''Find the lexicographically smallest rotation of a string in linear
+    time, by comparing two candidate rotations and skipping past every
+    start that the comparison rules out.
+
+    :param seq: The string.
+    :type seq: str
+    :returns: The position at which the smallest rotation starts.
+    :rtype: int
+
+    '''
+    n = len(seq)
+    doubled = seq + seq
+    i = 0
+    j = 1
+    while i < n and j < n:
+        # Length of the common prefix of the rotations at i and j
+        k = 0
+        while k < n and doubled[i + k] == doubled[j + k]:
+            k += 1
+        if k == n:
+            # The sequence is periodic - both rotations are smallest
+            break
+        if doubled[i + k] > doubled[j + k]:
+            i += k + 1
+        else:
+            j += k + 1
+        if i == j:
+            j += 1
+    return min(i, j)
@@ -0,0 +1,146 @@
+'''Compact 2-bit storage for long DNA strands.'''
+import numpy as np
+
+
+# A, C, G, and T are stored as 2-bit codes. The complement of a code is
+# 3 - code, so reverse complementing never requires decoding.
+_BASES = 'ACGT'
+
+_ENCODE = np.zeros(256, dtype=np.uint8)
+_IS_BASE = np.zeros(256, dtype=np.bool_)
+for _code, _base in enumerate(_BASES):
+    _ENCODE[ord(_base)] = _code
+    _IS_BASE[ord(_base)] = True
+
+_DECODE = np.frombuffer(_BASES, dtype=np.uint8)
+
+# Complements of characters that aren't stored as 2-bit codes (N, gaps, and
+# any other IUPAC symbols). Anything not listed is its own complement.
+_EXCEPTION_COMPLEMENTS = np.arange(256, dtype=np.uint8)
+for _x, _y in ['AT', 'CG', 'RY', 'KM', 'BV', 'DH']:
+    for _a, _b in [(_x, _y), (_x.lower(), _y.lower())]:
+        _EXCEPTION_COMPLEMENTS[ord(_a)] = ord(_b)
+        _EXCEPTION_COMPLEMENTS[ord(_b)] = ord(_a)
+
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+
+class PackedSequence(object):
+    '''Immutable, 2-bit-per-base representation of a DNA strand. Characters
+    other than A, T, G, and C (e.g. N and -) are kept in a sparse exception
+    list. Slices and reverse complements share the packed buffer of the
+    sequence they were derived from.'''
+
+    def __init__(self, sequence):
+        '''
+        :param sequence: Input sequence.
+        :type sequence: str
+        :returns: coral.sequence.PackedSequence instance.
+
+        '''
+        raw = np.frombuffer(str(sequence), dtype=np.uint8)
+        is_exception = ~_IS_BASE[raw]
+
+        codes = _ENCODE[raw]
+        padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+        padded[:len(codes)] = codes
+        padded = padded.reshape(-1, 4)
+        self._data = np.bitwise_or.reduce(padded << _SHIFTS, axis=1)
+        self._data = self._data.astype(np.uint8)
+
+        self._exception_index = np.flatnonzero(is_exception)
+        self._exception_chars = raw[is_exception]
+        self._offset = 0
+        self._length = len(raw)
+        self._rc = False
+
+    @property
+    def nbytes(self):
+        '''Bytes used by the packed buffer and exception list.'''
+        return (self._data.nbytes + self._exception_index.nbytes +
+                self._exception_chars.nbytes)
+
+    def reverse_complement(self):
+        '''Reverse complement the sequence without decoding it.
+
+        :returns: A reverse-complemented view of the same packed buffer.
+        :rtype: coral.sequence.PackedSequence
+
+        '''
+        return self._derive(self._offset, self._length, not self._rc)
+
+    def _derive(self, offset, length, rc):
+        derived = PackedSequence.__new__(PackedSequence)
+        derived._data = self._data
+        derived._exception_index = self._exception_index
+        derived._exception_chars = self._exception_chars
+        derived._offset = offset
+        derived._length = length
+        derived._rc = rc
+        return derived
+
+    def _decode(self, start, stop):
+        '''Decode a range of the sequence (in its own coordinates) to str.'''
+        if stop <= start:
+            return ''
+        # Translate to coordinates of the (forward) packed buffer
+        if self._rc:
+            buf_start = self._offset + self._length - stop
+            buf_stop = self._offset + self._length - start
+        else:
+            buf_start = self._offset + start
+            buf_stop = self._offset + stop
+
+        packed = self._data[buf_start // 4:-(-buf_stop // 4)]
+        codes = (packed[:, np.newaxis] >> _SHIFTS) & 3
+        codes = codes.ravel()[buf_start % 4:buf_start % 4 + buf_stop -
+                              buf_start]
+
+        lo, hi = np.searchsorted(self._exception_index, [buf_start, buf_stop])
+        exception_index = self._exception_index[lo:hi] - buf_start
+        exception_chars = self._exception_chars[lo:hi]
+
+        if self._rc:
+            decoded = _DECODE[3 - codes[::-1]]
+            decoded[len(codes) - 1 - exception_index] = \
+                _EXCEPTION_COMPLEMENTS[exception_chars]
+        else:
+            decoded = _DECODE[codes]
+            decoded[exception_index] = exception_chars
+
+        return decoded.tostring()
+
+    def __getitem__(self, key):
+        '''Index and slice the sequence.
+
+        :param key: int or slice object for subsetting.
+        :type key: int or slice object
+        :returns: A single character for an int, otherwise a packed sequence.
+        :rtype: str or coral.sequence.PackedSequence
+
+        '''
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return PackedSequence(str(self)[key])
+            length = max(stop - start, 0)
+            if self._rc:
+                offset = self._offset + self._length - start - length
+            else:
+                offset = self._offset + start
+            return self._derive(offset, length, self._rc)
+
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError('PackedSequence index out of range')
+        return self._decode(key, key + 1)
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        return self._decode(0, self._length)
+
+    def __repr__(self):
+        return 'PackedSequence({!r})'.format(str(self))
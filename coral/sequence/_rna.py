@@ -2,6 +2,7 @@
 import coral as cr
 from . import alphabets
 from ._nucleicacid import NucleicAcid
+from ._view import materialize
 
 
 class RNA(NucleicAcid):
@@ -26,7 +27,7 @@ class RNA(NucleicAcid):
                                   any_char='N')
 
     def copy(self):
-        return type(self)(self.seq, alphabet=self.alphabet,
+        return type(self)(materialize(self._seq), alphabet=self.alphabet,
                           circular=self.circular, skip_checks=True)
 
     def reverse_transcribe(self):
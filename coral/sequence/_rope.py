@@ -0,0 +1,108 @@
+'''Chunked storage for sequences built by repeated concatenation.'''
+import bisect
+
+
+class SequenceRope(object):
+    '''Immutable sequence stored as a list of chunks. Ropes made by
+    concatenation share their chunk list, so appending to the most recent
+    rope only adds a chunk rather than copying the whole sequence. The
+    chunks are joined the first time the full string is needed.'''
+
+    def __init__(self, chunks):
+        '''
+        :param chunks: Pieces of the sequence, in order.
+        :type chunks: list of str
+        :returns: coral.sequence.SequenceRope instance.
+
+        '''
+        self._chunks = []
+        self._ends = []
+        self._length = 0
+        for chunk in chunks:
+            self._append(chunk)
+        self._count = len(self._chunks)
+        self._string = None
+
+    def _append(self, chunk):
+        if chunk:
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+            self._ends.append(self._length)
+
+    def concatenate(self, other):
+        '''Add a sequence to the end of this one.
+
+        :param other: Sequence to add.
+        :type other: str, coral.sequence.SequenceRope, or other storage
+        :returns: A new rope of both sequences. The current rope is
+                  unchanged.
+        :rtype: coral.sequence.SequenceRope
+
+        '''
+        if isinstance(other, SequenceRope):
+            pieces = other._chunks[:other._count]
+        else:
+            pieces = [str(other)]
+
+        rope = SequenceRope.__new__(SequenceRope)
+        if self._count == len(self._chunks):
+            # Nothing has been added after this rope - extend its chunks
+            rope._chunks = self._chunks
+            rope._ends = self._ends
+        else:
+            rope._chunks = self._chunks[:self._count]
+            rope._ends = self._ends[:self._count]
+        rope._length = self._length
+        for piece in pieces:
+            rope._append(piece)
+        rope._count = len(rope._chunks)
+        rope._string = None
+        return rope
+
+    def __getitem__(self, key):
+        '''Index and slice the rope.
+
+        :param key: int or slice object for subsetting.
+        :type key: int or slice object
+        :returns: The indexed or sliced sequence.
+        :rtype: str
+
+        '''
+        if self._string is None and not isinstance(key, slice):
+            if key < 0:
+                key += self._length
+            if not 0 <= key < self._length:
+                raise IndexError('SequenceRope index out of range')
+            # Find the chunk without joining the rope
+            chunk = bisect.bisect_right(self._ends, key, 0, self._count)
+            start = self._ends[chunk] - len(self._chunks[chunk])
+            return self._chunks[chunk][key - start]
+        return str(self)[key]
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        if self._string is None:
+            self._string = ''.join(self._chunks[:self._count])
+        return self._string
+
+    def __repr__(self):
+        return 'SequenceRope({!r})'.format(str(self))
+
+
+def concatenate(first, second):
+    '''Concatenate sequence storage, reusing the chunks of `first` if it is
+    a rope.
+
+    :param first: Start of the sequence.
+    :type first: str, coral.sequence.SequenceRope, or other storage
+    :param second: End of the sequence.
+    :type second: str, coral.sequence.SequenceRope, or other storage
+    :returns: The concatenated sequence.
+    :rtype: coral.sequence.SequenceRope
+
+    '''
+    if not isinstance(first, SequenceRope):
+        first = SequenceRope([str(first)])
+    return first.concatenate(second)
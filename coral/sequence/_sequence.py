@@ -1,7 +1,9 @@
 '''Base sequence classes.'''
 import re
 from .genbank import featurenames
-from .alphabets import AlphabetError
+from ._packed import PackedSequence
+from ._rope import concatenate
+from ._view import materialize, view
 
 
 class Sequence(object):
@@ -29,20 +31,33 @@ class Sequence(object):
         self.any_char = any_char
 
         if not skip_checks:
-            self.seq = str(sequence).upper()
-            symbols = alphabet.symbols
-            pattern = '[^' + re.escape(symbols + symbols.lower()) + ']'
-            if re.search(pattern, self.seq):
-                msg = 'Sequence doesn\'t match {}'.format(symbols)
-                raise AlphabetError(msg)
+            self._seq = alphabet.validate(str(sequence))
         else:
-            self.seq = sequence
+            self._seq = sequence
 
         if name is None:
             self.name = ''
         else:
             self.name = name
 
+    @property
+    def seq(self):
+        '''The sequence as a string.'''
+        return str(self._seq)
+
+    @seq.setter
+    def seq(self, value):
+        # Edits to a packed sequence stay packed
+        if isinstance(self._seq, PackedSequence) and \
+           not isinstance(value, PackedSequence):
+            value = PackedSequence(value)
+        self._seq = value
+
+    @property
+    def packed(self):
+        '''Whether the sequence is stored in 2-bit packed form.'''
+        return isinstance(self._seq, PackedSequence)
+
     def copy(self):
         '''Create a copy of the current instance.
 
@@ -50,7 +65,7 @@ class Sequence(object):
 
         '''
         # Significant performance improvements by skipping alphabet check
-        return type(self)(self.seq, alphabet=self.alphabet,
+        return type(self)(materialize(self._seq), alphabet=self.alphabet,
                           any_char=self.any_char, skip_checks=True)
 
     def locate(self, pattern):
@@ -93,7 +108,12 @@ class Sequence(object):
                 raise TypeError('Cannot add {} to {}'.format(self, other))
 
         copy = self.copy()
-        copy.seq += other.seq
+        if copy.packed:
+            copy.seq += other.seq
+        else:
+            # Chunks are joined when the sequence is next needed in full, so
+            # a series of additions doesn't copy the sequence each time
+            copy.seq = concatenate(self._seq, other._seq)
         return copy
 
     def __contains__(self, query):
@@ -149,14 +169,16 @@ class Sequence(object):
 
         '''
         # If empty sequence, return empty sequence
-        if not self.seq or self.seq is None:
+        if self._seq is None or not len(self._seq):
             if not isinstance(key, slice):
                 raise IndexError()
             return self.copy()
-        new_seq = self.seq[key]
-        copy = self.copy()
-        copy.seq = new_seq
-        return copy
+        # Slices are views into the current sequence's storage. Since that
+        # storage is never modified in place, a shallow copy is enough.
+        new_instance = object.__new__(type(self))
+        new_instance.__dict__.update(self.__dict__)
+        new_instance._seq = view(self._seq, key)
+        return new_instance
 
     def __len__(self):
         '''Calculate sequence length.
@@ -165,7 +187,7 @@ class Sequence(object):
         :rtype: int
 
         '''
-        return len(self.seq)
+        return len(self._seq)
 
     def __mul__(self, n):
         '''Concatenate copies of the sequence.
@@ -180,7 +202,9 @@ class Sequence(object):
         # Input checking
         if n != int(n):
             raise TypeError('Multiplication by non-integer.')
-        return sum([x for x in _decompose(self, n)])
+        copy = self.copy()
+        copy.seq = self.seq * int(n)
+        return copy
 
     def __ne__(self, other):
         '''Define != operator.
@@ -218,11 +242,11 @@ class Sequence(object):
     def __repr__(self):
         '''String to print when object is called directly.'''
         display_bases = 40
-        if len(self.seq) < 90:
+        if len(self._seq) < 90:
             sequence = self.seq
         else:
-            sequence = ''.join([self.seq[:display_bases], ' ... ',
-                                self.seq[-display_bases:]])
+            sequence = ''.join([str(self._seq[:display_bases]), ' ... ',
+                                str(self._seq[-display_bases:])])
         return str(sequence)
 
     def __setitem__(self, index, new_value):
@@ -252,27 +276,6 @@ class Sequence(object):
         return self.seq
 
 
-def _decompose(string, n):
-    '''Given string and multiplier n, find m**2 decomposition.
-
-    :param string: input string
-    :type string: str
-    :param n: multiplier
-    :type n: int
-    :returns: generator that produces m**2 * string if m**2 is a factor of n
-    :rtype: generator of 0 or 1
-
-    '''
-    binary = [int(x) for x in bin(n)[2:]]
-    new_string = string
-    counter = 1
-    while counter <= len(binary):
-        if binary[-counter]:
-            yield new_string
-        new_string += new_string
-        counter += 1
-
-
 class Feature(object):
     '''Represent an annotated feature - track sequence regions with
     metadata.'''
@@ -307,6 +310,8 @@ class Feature(object):
                  coral.constants.genbank.TO_CORAL.
 
         '''
+        # Interval indexes (see FeatureList) that include this feature
+        self._indexes = []
         self.name = name
         self.start = int(start)
         self.stop = int(stop)
@@ -330,6 +335,42 @@ class Feature(object):
             msg2 = 'must be one of the following: {}'.format(featurenames)
             raise ValueError(msg1 + msg2)
 
+    @property
+    def start(self):
+        '''Where the feature starts (0-indexed).'''
+        return self._start
+
+    @start.setter
+    def start(self, value):
+        if self._indexes:
+            self._invalidate_indexes()
+        self._start = value
+
+    @property
+    def stop(self):
+        '''Where the feature stops (1-indexed, like slices).'''
+        return self._stop
+
+    @stop.setter
+    def stop(self, value):
+        if self._indexes:
+            self._invalidate_indexes()
+        self._stop = value
+
+    def __setattr__(self, name, value):
+        # Sequences that share this feature keep its current state
+        indexes = self.__dict__.get('_indexes')
+        if indexes:
+            for index in indexes:
+                if index._dependents:
+                    index.detach()
+        object.__setattr__(self, name, value)
+
+    def _invalidate_indexes(self):
+        for index in self._indexes:
+            index.current = False
+        self._indexes = []
+
     def move(self, bases):
         '''Move the start and stop positions.
 
@@ -347,9 +388,15 @@ class Feature(object):
         :rtype: coral.Feature
 
         '''
-        return type(self)(self.name, self.start, self.stop, self.feature_type,
-                          gene=self.gene, locus_tag=self.locus_tag,
-                          qualifiers=self.qualifiers, strand=self.strand)
+        # Features are copied in bulk when sequences are copied - fill in the
+        # attributes directly rather than checking them again in __init__
+        copy = object.__new__(type(self))
+        copy.__dict__.update(_indexes=[], name=self.name, _start=self._start,
+                             _stop=self._stop, modified=False, gene=self.gene,
+                             locus_tag=self.locus_tag,
+                             qualifiers=self.qualifiers, strand=self.strand,
+                             gaps=[], feature_type=self.feature_type)
+        return copy
 
     def __repr__(self):
         '''Represent a feature.'''
@@ -0,0 +1,105 @@
+'''Zero-copy slices of sequence strings.'''
+from ._rope import SequenceRope
+
+
+class SequenceView(object):
+    '''Read-only window into a parent sequence string. The window's string is
+    only built (and the reference to the parent dropped) the first time it is
+    needed in full.'''
+
+    def __init__(self, parent, start, length):
+        '''
+        :param parent: The sequence string (or view) to look into.
+        :type parent: str or coral.sequence.SequenceView
+        :param start: Position of the window in `parent`.
+        :type start: int
+        :param length: Length of the window.
+        :type length: int
+        :returns: coral.sequence.SequenceView instance.
+
+        '''
+        if isinstance(parent, SequenceView):
+            # Always look into the underlying string - never chain views
+            if parent._string is None:
+                start += parent._start
+                parent = parent._parent
+            else:
+                parent = parent._string
+        self._parent = parent
+        self._start = start
+        self._length = length
+        self._string = None
+
+    def __getitem__(self, key):
+        '''Index and slice the view.
+
+        :param key: int or slice object for subsetting.
+        :type key: int or slice object
+        :returns: A single character for an int, a view for a contiguous
+                  slice, otherwise a string.
+        :rtype: str or coral.sequence.SequenceView
+
+        '''
+        if self._string is not None:
+            return view(self._string, key)
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                return SequenceView(self, start, max(stop - start, 0))
+            return str(self)[key]
+
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError('SequenceView index out of range')
+        return self._parent[self._start + key]
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        if self._string is None:
+            self._string = self._parent[self._start:self._start +
+                                        self._length]
+            self._parent = None
+        return self._string
+
+    def __repr__(self):
+        return 'SequenceView({!r})'.format(str(self))
+
+
+def view(storage, key):
+    '''Index or slice sequence storage, taking a view of contiguous slices of
+    strings instead of copying them.
+
+    :param storage: Sequence storage.
+    :type storage: str, coral.sequence.SequenceView,
+                   coral.sequence.SequenceRope, or
+                   coral.sequence.PackedSequence
+    :param key: int or slice object for subsetting.
+    :type key: int or slice object
+    :returns: The indexed or sliced storage.
+
+    '''
+    if isinstance(storage, SequenceRope) and isinstance(key, slice):
+        storage = str(storage)
+    if isinstance(storage, str) and isinstance(key, slice):
+        start, stop, step = key.indices(len(storage))
+        if step == 1:
+            return SequenceView(storage, start, max(stop - start, 0))
+    return storage[key]
+
+
+def materialize(storage):
+    '''Convert a view into a standalone string, leaving other kinds of
+    storage as they are.
+
+    :param storage: Sequence storage.
+    :type storage: str, coral.sequence.SequenceView, or
+                   coral.sequence.PackedSequence
+    :returns: Storage that doesn't refer to a parent sequence.
+
+    '''
+    if isinstance(storage, SequenceView):
+        return str(storage)
+    return storage
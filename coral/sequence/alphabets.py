@@ -1,4 +1,6 @@
 '''Defines alphabest available for sequences.'''
+import string
+import numpy as np
 
 
 class AlphabetError(ValueError):
@@ -15,6 +17,9 @@ class Alphabet(object):
     creation of valid characters from a sequence-complement dictionary (e.g.
     A:T pairs).
 
+    Lookup tables for validating and complementing sequences are compiled
+    whenever the symbols or complements are set.
+
     '''
     def __init__(self, complements=None, symbols=None):
         '''
@@ -40,9 +45,91 @@ class Alphabet(object):
         # The value of 'complements' can end up being None, but the symbols
         # attribute will always be not-None (at minimum, an empty string)
 
-        self.complements = complements
+        self._complements = complements
         self.symbols = symbols
 
+    @property
+    def complements(self):
+        '''Dict of complement pairs, e.g. {'A': 'T'}, or None.'''
+        return self._complements
+
+    @complements.setter
+    def complements(self, value):
+        self._complements = value
+        self._compile()
+
+    @property
+    def symbols(self):
+        '''String of valid characters.'''
+        return self._symbols
+
+    @symbols.setter
+    def symbols(self, value):
+        self._symbols = value
+        self._compile()
+
+    def _compile(self):
+        '''Build the lookup tables for the current symbols and complements.'''
+        valid = self._symbols.upper() + self._symbols.lower()
+        # Characters that are valid (either case) - deleting them from a
+        # sequence leaves only the invalid characters
+        self.valid_chars = ''.join(sorted(set(valid)))
+        # Case-folding table
+        self.upper_table = string.maketrans(string.ascii_lowercase,
+                                            string.ascii_uppercase)
+        # Numpy lookups indexed by byte value
+        self.valid_lookup = np.zeros(256, dtype=np.bool_)
+        self.valid_lookup[[ord(char) for char in self.valid_chars]] = True
+        self.complement_lookup = np.arange(256, dtype=np.uint8)
+
+        if self._complements is None:
+            self.complement_table = None
+            self.complement_chars = ''
+            return
+        pairs = dict((key.lower(), value.lower()) for key, value in
+                     self._complements.items())
+        pairs.update(self._complements)
+        keys = ''.join(pairs.keys())
+        values = ''.join(pairs[key] for key in keys)
+        self.complement_table = string.maketrans(keys, values)
+        self.complement_chars = ''.join(sorted(keys))
+        self.complement_lookup[[ord(key) for key in keys]] = \
+            [ord(value) for value in values]
+
+    def validate(self, sequence):
+        '''Check that a sequence only contains symbols in the alphabet.
+
+        :param sequence: Sequence to check.
+        :type sequence: str
+        :returns: The sequence, in upper case.
+        :rtype: str
+        :raises: AlphabetError if the sequence has characters that aren't in
+                 the alphabet.
+
+        '''
+        if sequence.translate(None, self.valid_chars):
+            msg = 'Sequence doesn\'t match {}'.format(self._symbols)
+            raise AlphabetError(msg)
+        return sequence.translate(self.upper_table)
+
+    def complement(self, sequence):
+        '''Complement a sequence.
+
+        :param sequence: Sequence to complement.
+        :type sequence: str
+        :returns: The complement of every character in the sequence.
+        :rtype: str
+        :raises: AlphabetError if the alphabet has no complements or the
+                 sequence has characters without a complement.
+
+        '''
+        if self.complement_table is None:
+            raise AlphabetError('Alphabet has no complements.')
+        if sequence.translate(None, self.complement_chars):
+            raise AlphabetError('Sequence has characters without a '
+                                'complement.')
+        return sequence.translate(self.complement_table)
+
     def __repr__(self):
         return 'complements: {}\nsymbols: {}'.format(self.complements,
                                                      self.symbols)
@@ -2,3 +2,4 @@
 from .nupack import NUPACK
 from .viennarna import ViennaRNA
 from .dimers import dimers
+from .dimer_screen import dimer_screen, PrimerInteraction
@@ -0,0 +1,211 @@
+# -*- coding: utf-8
+'''Screen pools of primers for primer dimers and hairpins without NUPACK.'''
+import collections
+from math import log
+import numpy as np
+import coral as cr
+
+
+PrimerInteraction = collections.namedtuple('PrimerInteraction',
+                                           ['kind', 'primer1', 'primer2',
+                                            'run', 'dg'])
+
+# Codes of A, C, G, and T - complementary bases add up to 3
+_BASE_CODES = np.zeros(256, dtype=np.int8) - 1
+for _code, _base in enumerate('ACGT'):
+    _BASE_CODES[ord(_base)] = _code
+
+
+def dimer_screen(primers, min_run=4, max_dg=-5.0, salt_conc=50,
+                 temperature=37.0, min_loop=3):
+    '''Find the primers of a pool whose 3' ends can be extended after
+    binding another primer, themselves, or another part of themselves
+    (hairpins). Every pair is checked at once, so large pools can be
+    screened quickly and only the few risky pairs need a closer look (e.g.
+    with coral.structure.dimers).
+
+    For each primer and partner, the longest run of bases at the 3' end of
+    the primer that is complementary to some part of the partner is found,
+    along with the nearest-neighbor free energy of binding of that run
+    (SantaLucia 98). The free energy of hairpins is that of their stem -
+    loops are not scored.
+
+    :param primers: Primers (including overhangs) or sequences.
+    :type primers: list of coral.Primer, coral.ssDNA, or str
+    :param min_run: Only report runs of at least this many bases.
+    :type min_run: int
+    :param max_dg: Only report runs that bind at least this strongly (free
+                   energy in kcal/mol).
+    :type max_dg: float
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :param temperature: Temperature in °C at which to calculate free
+                        energies.
+    :type temperature: float
+    :param min_loop: Minimum number of unpaired bases in a hairpin loop.
+    :type min_loop: int
+    :returns: Risky interactions, most stable first. Each gives its kind
+              ('dimer' or 'hairpin'), the index of the primer whose 3' end is
+              bound, the index of its partner (the same for self-dimers and
+              hairpins), the length of the 3' run, and its free energy
+              (kcal/mol).
+    :rtype: list of coral.structure.PrimerInteraction
+    :raises: ValueError if `min_run` is less than 1.
+
+    '''
+    if min_run < 1:
+        raise ValueError('min_run must be at least 1.')
+    seqs = [_sequence(primer) for primer in primers]
+    if not seqs:
+        return []
+    lengths = np.array([len(seq) for seq in seqs])
+    width = max(lengths.max(), 1)
+    # Each primer read from its 3' end, and each primer's complement read
+    # from its 5' end. The 3' end of a primer binds its partner where the
+    # two line up. Padding and bases other than ACGT never match.
+    three_prime = np.zeros((len(seqs), width), dtype=np.int8) - 1
+    complement = np.zeros((len(seqs), width), dtype=np.int8) - 2
+    for i, seq in enumerate(seqs):
+        codes = _BASE_CODES[np.frombuffer(seq, dtype=np.uint8)]
+        three_prime[i, :len(seq)] = codes[::-1]
+        complement[i, :len(seq)] = np.where(codes < 0, -2, 3 - codes)
+
+    dgs = _run_dgs(three_prime, salt_conc, temperature)
+    interactions = []
+    dimer_runs = _dimer_runs(three_prime, complement)
+    hairpin_runs = _hairpin_runs(three_prime, complement, lengths, min_loop)
+    for kind, runs in [('dimer', dimer_runs), ('hairpin', hairpin_runs)]:
+        runs = runs.reshape(len(seqs), -1)
+        primer1, primer2 = np.nonzero(runs >= min_run)
+        run = runs[primer1, primer2]
+        dg = dgs[primer1, run]
+        risky = dg <= max_dg
+        if kind == 'hairpin':
+            primer2 = primer1
+        for values in zip(primer1[risky].tolist(), primer2[risky].tolist(),
+                          run[risky].tolist(), dg[risky].tolist()):
+            interactions.append(PrimerInteraction(kind, *values))
+    interactions.sort(key=lambda interaction: (interaction.dg,
+                                               interaction.kind,
+                                               interaction.primer1,
+                                               interaction.primer2))
+    return interactions
+
+
+def _sequence(primer):
+    '''Find the full sequence of a primer.'''
+    if isinstance(primer, cr.Primer):
+        primer = primer.primer()
+    return str(primer).upper()
+
+
+def _dimer_runs(three_prime, complement):
+    '''Find the longest 3' run of each primer that binds each other primer.
+
+    :param three_prime: Codes of each primer, read from its 3' end.
+    :type three_prime: numpy.ndarray
+    :param complement: Codes of the complement of each primer, read from its
+                       5' end.
+    :type complement: numpy.ndarray
+    :returns: Longest run with a row for each primer and a column for each
+              partner.
+    :rtype: numpy.ndarray
+
+    '''
+    n, width = three_prime.shape
+    best = np.zeros((n, n), dtype=np.int64)
+    for offset in range(width):
+        # Bind the 3' base of every primer to base `offset` of every partner
+        # at once, then follow the pairs that are still bound one base at a
+        # time
+        bound = three_prime[:, 0:1] == complement[:, offset]
+        primer1, primer2 = np.nonzero(bound)
+        run = 1
+        while len(primer1):
+            best[primer1, primer2] = np.maximum(best[primer1, primer2], run)
+            if offset + run == width:
+                break
+            bound = (three_prime[primer1, run] ==
+                     complement[primer2, offset + run])
+            primer1 = primer1[bound]
+            primer2 = primer2[bound]
+            run += 1
+    return best
+
+
+def _hairpin_runs(three_prime, complement, lengths, min_loop):
+    '''Find the longest 3' run of each primer that binds further upstream in
+    the same primer, leaving a loop.
+
+    :param three_prime: Codes of each primer, read from its 3' end.
+    :type three_prime: numpy.ndarray
+    :param complement: Codes of the complement of each primer, read from its
+                       5' end.
+    :type complement: numpy.ndarray
+    :param lengths: Length of each primer.
+    :type lengths: numpy.ndarray
+    :param min_loop: Minimum number of unpaired bases in the loop.
+    :type min_loop: int
+    :returns: Longest run of each primer.
+    :rtype: numpy.ndarray
+
+    '''
+    n, width = three_prime.shape
+    best = np.zeros(n, dtype=np.int64)
+    for offset in range(width):
+        primers = np.arange(n)
+        run = 0
+        while len(primers):
+            # Base `run` from the 3' end pairs with base offset + run from
+            # the 5' end, which must leave enough bases between them
+            fits = offset + 2 * run + min_loop + 2 <= lengths[primers]
+            primers = primers[fits]
+            if offset + run == width:
+                break
+            bound = (three_prime[primers, run] ==
+                     complement[primers, offset + run])
+            primers = primers[bound]
+            run += 1
+            best[primers] = np.maximum(best[primers], run)
+    return best
+
+
+def _run_dgs(three_prime, salt_conc, temperature):
+    '''Calculate the free energy of binding of every 3' run of every primer
+    to its complement, using SantaLucia 98 nearest-neighbor parameters.
+
+    :param three_prime: Codes of each primer, read from its 3' end.
+    :type three_prime: numpy.ndarray
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :param temperature: Temperature in °C.
+    :type temperature: float
+    :returns: Free energy (kcal/mol) with a row for each primer and a column
+              for each run length (starting at 0).
+    :rtype: numpy.ndarray
+
+    '''
+    model = cr.thermo.get_model('santalucia98')
+    n, width = three_prime.shape
+    codes = np.where(three_prime < 0, 0, three_prime).astype(np.int64)
+    runs = np.arange(width + 1)
+    # Stacks read from the 3' end: the base before each base, then the base
+    stacks = 4 * codes[:, 1:] + codes[:, :-1]
+    zeros = np.zeros((n, 1))
+    delta_h = np.hstack([zeros, zeros,
+                         np.cumsum(model.delta_h_table[stacks], axis=1)])
+    delta_s = np.hstack([zeros, zeros,
+                         np.cumsum(model.delta_s_table[stacks], axis=1)])
+    gc = (codes == 1) | (codes == 2)
+    gc_counts = np.hstack([zeros, np.cumsum(gc, axis=1)])
+    # The last base of the primer ends the run, which starts at the base
+    # before it
+    start_gc = np.hstack([gc[:, 0:1], gc])
+    end_gc = gc[:, 0:1]
+    deltas = model.correct(start_gc, end_gc, gc_counts, False)
+    delta_h = delta_h[:, :width + 1] + deltas[0]
+    delta_s = delta_s[:, :width + 1] + deltas[1]
+    # Parameters are stored negated. SantaLucia 98 salt correction.
+    salt_adjustment = 0.368 * np.maximum(runs - 1, 0) * log(salt_conc / 1e3)
+    entropy = -delta_s + salt_adjustment
+    return -delta_h - (temperature + 273.15) * entropy / 1e3
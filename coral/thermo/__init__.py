@@ -1,2 +1,4 @@
 '''Thermodynamic analyis methods, primarily melting temperature calculators.'''
-from .tm import tm
+from .cache import LRUCache, tm_cache
+from .models import ThermoModel, get_model, register_model
+from .tm import tm, tm_batch, TmProfile
@@ -0,0 +1,170 @@
+'''Bounded memoization of pure sequence computations such as Tms.'''
+import collections
+import contextlib
+import hashlib
+
+
+CacheInfo = collections.namedtuple('CacheInfo',
+                                   ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    '''Size-bounded cache that discards the least recently used results.
+    A cache starts out disabled - while disabled, computations run as
+    usual and nothing is stored.'''
+
+    def __init__(self, maxsize=4096, enabled=False):
+        '''
+        :param maxsize: Maximum number of results to keep.
+        :type maxsize: int
+        :param enabled: Whether to start storing results right away.
+        :type enabled: bool
+        :returns: coral.thermo.LRUCache instance.
+        :raises: ValueError if `maxsize` is less than 1.
+
+        '''
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1.')
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._results = collections.OrderedDict()
+
+    def lookup(self, key, compute):
+        '''Find a stored result, computing and storing it if it's missing.
+
+        :param key: Everything the result depends on, e.g. the sequence,
+                    parameter set and concentrations.
+        :type key: hashable
+        :param compute: Function (without arguments) that computes the
+                        result.
+        :type compute: function
+        :returns: The result.
+
+        '''
+        if not self.enabled:
+            return compute()
+        try:
+            result = self._results.pop(key)
+        except KeyError:
+            self.misses += 1
+            result = compute()
+            if len(self._results) >= self.maxsize:
+                self._results.popitem(last=False)
+        else:
+            self.hits += 1
+        # (Re)insert as the most recently used
+        self._results[key] = result
+        return result
+
+    def enable(self, maxsize=None):
+        '''Start storing results.
+
+        :param maxsize: New maximum number of results to keep. The least
+                        recently used results are discarded if there are more.
+        :type maxsize: int
+
+        '''
+        if maxsize is not None:
+            if maxsize < 1:
+                raise ValueError('maxsize must be at least 1.')
+            self.maxsize = maxsize
+            self._trim()
+        self.enabled = True
+
+    def disable(self):
+        '''Stop storing and looking up results. Stored results are kept.'''
+        self.enabled = False
+
+    def clear(self):
+        '''Discard all stored results and reset the statistics.'''
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        '''Report the cache statistics.
+
+        :returns: Number of hits and misses, maximum size, and current size.
+        :rtype: coral.thermo.cache.CacheInfo
+
+        '''
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._results))
+
+    @contextlib.contextmanager
+    def enabled_in(self, maxsize=None, clear=False):
+        '''Enable the cache inside a `with` block, restoring its previous
+        state and size afterwards, e.g.
+        `with cr.thermo.tm_cache.enabled_in(): cr.reaction.pcr(...)`.
+
+        :param maxsize: Maximum number of results to keep.
+        :type maxsize: int
+        :param clear: Whether to discard stored results when entering the
+                      block.
+        :type clear: bool
+        :returns: The cache.
+        :rtype: coral.thermo.LRUCache
+
+        '''
+        previous = self.enabled
+        previous_maxsize = self.maxsize
+        if clear:
+            self.clear()
+        self.enable(maxsize)
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+            self.maxsize = previous_maxsize
+            self._trim()
+
+    @contextlib.contextmanager
+    def disabled_in(self):
+        '''Disable the cache inside a `with` block, restoring its previous
+        state afterwards.
+
+        :returns: The cache.
+        :rtype: coral.thermo.LRUCache
+
+        '''
+        previous = self.enabled
+        self.disable()
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+    def _trim(self):
+        '''Discard the least recently used results that don't fit.'''
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return ('LRUCache(hits={}, misses={}, maxsize={}, currsize={}, '
+                'enabled={})'.format(self.hits, self.misses, self.maxsize,
+                                     len(self._results), self.enabled))
+
+
+def sequence_key(seq):
+    '''Make a cache key for a sequence string. Short sequences are their
+    own key, while long ones are replaced by a digest so the cache doesn't
+    keep them alive.
+
+    :param seq: Sequence.
+    :type seq: str
+    :returns: The key.
+    :rtype: str
+
+    '''
+    if len(seq) <= 256:
+        return seq
+    return 'md5:' + hashlib.md5(seq).hexdigest()
+
+
+# Shared cache for coral.thermo.tm
+tm_cache = LRUCache()
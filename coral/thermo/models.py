@@ -0,0 +1,211 @@
+# -*- coding: utf-8
+'''Nearest-neighbor parameter sets compiled for Tm calculations.'''
+from math import log
+import numpy as np
+from . import tm_params
+
+
+# Universal gas constant (R)
+R = 1.9872
+
+# Dinucleotides in the order of their index, 4 * code1 + code2, where A, C,
+# G, and T have codes 0-3
+DINUCLEOTIDES = [a + b for a in 'ACGT' for b in 'ACGT']
+
+
+def schildkraut_melt(delta_h, delta_s, length, dna_conc, salt_conc):
+    '''Modified Schildkraut-Lifson equation (used by the 'breslauer' and
+    'cloning' methods). Works on single values or numpy arrays.
+
+    :param delta_h: Total enthalpy in cal/mol.
+    :type delta_h: float or numpy.ndarray
+    :param delta_s: Total entropy in cal/(mol K).
+    :type delta_s: float or numpy.ndarray
+    :param length: Sequence length.
+    :type length: int or numpy.ndarray
+    :param dna_conc: DNA concentration in M.
+    :type dna_conc: float
+    :param salt_conc: Salt concentration in M.
+    :type salt_conc: float
+    :returns: Melting temperature (Tm) in °C.
+    :rtype: float or numpy.ndarray
+
+    '''
+    numerator = -delta_h
+    # Modified dna_conc denominator
+    denominator = (-delta_s) + R * log(dna_conc / 16.0)
+    # Modified Schildkraut-Lifson equation adjustment
+    salt_adjustment = 16.6 * log(salt_conc) / log(10.0)
+    return numerator / denominator + salt_adjustment - 273.15
+
+
+def santalucia98_melt(delta_h, delta_s, length, dna_conc, salt_conc):
+    '''SantaLucia 98 equation, with salt correction of the entropy. Works on
+    single values or numpy arrays.
+
+    :param delta_h: Total enthalpy in cal/mol.
+    :type delta_h: float or numpy.ndarray
+    :param delta_s: Total entropy in cal/(mol K).
+    :type delta_s: float or numpy.ndarray
+    :param length: Sequence length.
+    :type length: int or numpy.ndarray
+    :param dna_conc: DNA concentration in M.
+    :type dna_conc: float
+    :param salt_conc: Salt concentration in M.
+    :type salt_conc: float
+    :returns: Melting temperature (Tm) in °C.
+    :rtype: float or numpy.ndarray
+
+    '''
+    # TODO: dna_conc should be divided by 2.0 when dna_conc >> template
+    # (like PCR)
+    numerator = -delta_h
+    # SantaLucia 98 salt correction
+    salt_adjustment = 0.368 * (length - 1) * log(salt_conc)
+    denominator = -delta_s + salt_adjustment + R * log(dna_conc / 4.0)
+    return numerator / denominator - 273.15
+
+
+def cloning_sl98_melt(delta_h, delta_s, length, dna_conc, salt_conc):
+    '''SantaLucia 98 equation, rescaled to approximate the 'cloning' method.
+    May be even better for cloning with Phusion than 'cloning' method. See
+    santalucia98_melt for parameters.'''
+    melt = santalucia98_melt(delta_h, delta_s, length, dna_conc, salt_conc)
+    melt *= 1.27329212575
+    melt += -2.55585450119
+    return melt
+
+
+class ThermoModel(object):
+    '''Nearest-neighbor parameter set compiled into lookup tables, with its
+    end corrections and melting equation. Register a model to make it
+    available by name to coral.thermo.tm and everything that calls it.'''
+
+    def __init__(self, name, params, corrections='breslauer', offsets=(0, 0),
+                 equation=schildkraut_melt):
+        '''
+        :param name: Name of the model, e.g. 'santalucia98'.
+        :type name: str
+        :param params: Parameter set in the format of
+                       coral.thermo.tm_params: 'delta_h' and 'delta_s' for
+                       each dinucleotide and 'delta_h_err' and 'delta_s_err'
+                       corrections.
+        :type params: dict
+        :param corrections: Which end corrections apply - 'breslauer' (GC
+                            content and symmetry) or 'santalucia98' (terminal
+                            GC or AT and symmetry).
+        :type corrections: str
+        :param offsets: Constants added to the delta_H and delta_S
+                        corrections.
+        :type offsets: tuple of floats
+        :param equation: Function computing the Tm in °C from the total
+                         delta_H (cal/mol), total delta_S (cal/(mol K)),
+                         sequence length, DNA concentration (M) and salt
+                         concentration (M), e.g. schildkraut_melt.
+        :type equation: function
+        :returns: coral.thermo.ThermoModel instance.
+        :raises: ValueError if `corrections` isn't 'breslauer' or
+                 'santalucia98'.
+
+        '''
+        if corrections not in ['breslauer', 'santalucia98']:
+            raise ValueError('Corrections must be breslauer or santalucia98.')
+        self.name = name
+        self.corrections = corrections
+        self.offsets = offsets
+        self.equation = equation
+        # Dicts for single sequences, arrays indexed by dinucleotide code for
+        # many sequences
+        self.pair_delta_h = dict(params['delta_h'])
+        self.pair_delta_s = dict(params['delta_s'])
+        self.delta_h_table = np.array([self.pair_delta_h[pair] for pair in
+                                       DINUCLEOTIDES])
+        self.delta_s_table = np.array([self.pair_delta_s[pair] for pair in
+                                       DINUCLEOTIDES])
+        self.delta_h_err = dict(params['delta_h_err'])
+        self.delta_s_err = dict(params['delta_s_err'])
+
+    def correct(self, start_gc, end_gc, gc_count, symmetric):
+        '''Sum the corrections to delta_H and delta_S. Works on single values
+        or numpy arrays.
+
+        :param start_gc: Whether the sequence starts with G or C.
+        :type start_gc: bool or numpy.ndarray
+        :param end_gc: Whether the sequence ends with G or C.
+        :type end_gc: bool or numpy.ndarray
+        :param gc_count: Number of G and C bases.
+        :type gc_count: int or numpy.ndarray
+        :param symmetric: Whether the sequence is its own reverse complement.
+        :type symmetric: bool or numpy.ndarray
+        :returns: delta_H and delta_S corrections.
+        :rtype: list
+
+        '''
+        deltas = []
+        for errors in [self.delta_h_err, self.delta_s_err]:
+            correction = 0
+            if self.corrections == 'santalucia98':
+                init_gc = 1 * start_gc + 1 * end_gc
+                correction += init_gc * errors['initGC']
+                correction += (2 - init_gc) * errors['initAT']
+            else:
+                correction += (gc_count > 0) * errors['anyGC']
+                correction += (gc_count == 0) * errors['onlyAT']
+            correction += symmetric * errors['symmetry']
+            deltas.append(correction)
+        deltas[0] += self.offsets[0]
+        deltas[1] += self.offsets[1]
+        return deltas
+
+    def __repr__(self):
+        return 'ThermoModel({!r})'.format(self.name)
+
+
+_MODELS = {}
+
+
+def register_model(model):
+    '''Make a model available by name, replacing any model with that name.
+
+    :param model: The model.
+    :type model: coral.thermo.ThermoModel
+
+    '''
+    _MODELS[model.name] = model
+
+
+def get_model(parameters):
+    '''Find a model by name.
+
+    :param parameters: Name of a registered model, or a model.
+    :type parameters: str or coral.thermo.ThermoModel
+    :returns: The model.
+    :rtype: coral.thermo.ThermoModel
+    :raises: ValueError if no model has that name.
+
+    '''
+    if isinstance(parameters, ThermoModel):
+        return parameters
+    try:
+        return _MODELS[parameters]
+    except (KeyError, TypeError):
+        raise ValueError('Unsupported parameter set.')
+
+
+# Methods that are currently verified to work using reference sequences:
+#   'cloning'
+#   'santalucia98'
+# The sugimoto and santalucia96 sets have always been evaluated with the
+# SantaLucia 98 equation by coral.thermo.tm.
+register_model(ThermoModel('breslauer', tm_params.BRESLAUER))
+register_model(ThermoModel('sugimoto', tm_params.SUGIMOTO,
+                           equation=santalucia98_melt))
+register_model(ThermoModel('santalucia96', tm_params.SANTALUCIA96,
+                           equation=santalucia98_melt))
+register_model(ThermoModel('santalucia98', tm_params.SANTALUCIA98,
+                           corrections='santalucia98',
+                           equation=santalucia98_melt))
+register_model(ThermoModel('cloning_sl98', tm_params.SANTALUCIA98,
+                           corrections='santalucia98',
+                           equation=cloning_sl98_melt))
+register_model(ThermoModel('cloning', tm_params.CLONING, offsets=(3.4, 12.4)))
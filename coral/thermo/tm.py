@@ -1,7 +1,10 @@
 # -*- coding: utf-8
 '''Calculate the thermodynamic melting temperatures of nucleotide sequences.'''
-from math import log, log10
-from . import tm_params
+import string
+import numpy as np
+import coral as cr
+from .cache import sequence_key, tm_cache
+from .models import get_model
 
 # TODO: Owczarzy et al 2004 has better salt correction
 # TODO: Remove sugimoto? It's missing important details (like salt correction)
@@ -14,83 +17,68 @@ from . import tm_params
 # TODO: Make new hybrid method - combine santalucia unified with owczarzy
 # corrections, compare to finnzymes.
 
-# Methods that are currently verified to work using reference sequences:
-#   'cloning'
-#   'santalucia98'
-
 
 def tm(seq, dna_conc=50, salt_conc=50, parameters='cloning'):
     '''Calculate nearest-neighbor melting temperature (Tm).
 
     :param seq: Sequence for which to calculate the tm.
-    :type seq: coral.DNA
+    :type seq: coral.DNA or str
     :param dna_conc: DNA concentration in nM.
     :type dna_conc: float
     :param salt_conc: Salt concentration in mM.
     :type salt_conc: float
-    :param parameters: Nearest-neighbor parameter set. Available options:
+    :param parameters: Nearest-neighbor parameter set - a
+                       coral.thermo.ThermoModel or the name of a registered
+                       one. Built-in options:
                        'breslauer': Breslauer86 parameters
                        'sugimoto': Sugimoto96 parameters
                        'santalucia96': SantaLucia96 parameters
                        'santalucia98': SantaLucia98 parameters
                        'cloning': breslauer without corrections
                        'cloning_sl98': santalucia98 fit to 'cloning'
-    :type parameters: str
+    :type parameters: str or coral.thermo.ThermoModel
     :returns: Melting temperature (Tm) in °C.
     :rtype: float
     :raises: ValueError if parameter argument is invalid.
 
     '''
-    if parameters == 'breslauer':
-        params = tm_params.BRESLAUER
-    elif parameters == 'sugimoto':
-        params = tm_params.SUGIMOTO
-    elif parameters == 'santalucia96':
-        params = tm_params.SANTALUCIA96
-    elif parameters == 'santalucia98' or parameters == 'cloning_sl98':
-        params = tm_params.SANTALUCIA98
-    elif parameters == 'cloning':
-        params = tm_params.CLONING
-    else:
-        raise ValueError('Unsupported parameter set.')
-
-    # Thermodynamic parameters
-    pars = {'delta_h': params['delta_h'], 'delta_s': params['delta_s']}
-    pars_error = {'delta_h': params['delta_h_err'],
-                  'delta_s': params['delta_s_err']}
-
-    # Error corrections - done first for use of reverse_complement parameters
-    if parameters == 'breslauer':
-        deltas = breslauer_corrections(seq, pars_error)
-    elif parameters == 'sugimoto':
-        deltas = breslauer_corrections(seq, pars_error)
-    elif parameters == 'santalucia96':
-        deltas = breslauer_corrections(seq, pars_error)
-    elif parameters == 'santalucia98' or parameters == 'cloning_sl98':
-        deltas = santalucia98_corrections(seq, pars_error)
-    elif parameters == 'cloning':
-        deltas = breslauer_corrections(seq, pars_error)
-        deltas[0] += 3.4
-        deltas[1] += 12.4
-
-    # Sum up the nearest-neighbor enthalpy and entropy
+    model = get_model(parameters)
     seq = str(seq).upper()
+    if tm_cache.enabled:
+        # Models are keyed by identity, so re-registering a name can't return
+        # stale results
+        key = ('tm', sequence_key(seq), dna_conc, salt_conc, model)
+        return tm_cache.lookup(key,
+                               lambda: _tm(seq, dna_conc, salt_conc, model))
+    return _tm(seq, dna_conc, salt_conc, model)
+
+
+def _tm(seq, dna_conc, salt_conc, model):
+    '''Calculate the Tm of an uppercase sequence string (see
+    coral.thermo.tm).'''
+    # Error corrections
+    symmetric = seq == seq[::-1].translate(_COMPLEMENT)
+    deltas = model.correct(seq[:1] in ('G', 'C'), seq[-1:] in ('G', 'C'),
+                           seq.count('G') + seq.count('C'), symmetric)
 
+    # Sum up the nearest-neighbor enthalpy and entropy
     # TODO: catch more cases when alphabets expand
     if 'N' in seq:
         raise ValueError('Can\'t calculate Tm of an N base.')
-    new_delt = _pair_deltas(seq, pars)
-    deltas[0] += new_delt[0]
-    deltas[1] += new_delt[1]
+    delta_h = 0
+    delta_s = 0
+    for i in range(len(seq) - 1):
+        pair = seq[i:i + 2]
+        delta_h += model.pair_delta_h[pair]
+        delta_s += model.pair_delta_s[pair]
+    deltas[0] += delta_h
+    deltas[1] += delta_s
 
     # Unit corrections
     salt_conc /= 1e3
     dna_conc /= 1e9
     deltas[0] *= 1e3
 
-    # Universal gas constant (R)
-    R = 1.9872
-
     # Supposedly this is what dnamate does, but the output doesn't match theirs
 #    melt = (-deltas[0] / (-deltas[1] + R * log(dna_conc / 4.0))) +
 #                          16.6 * log(salt_conc) - 273.15
@@ -101,125 +89,236 @@ def tm(seq, dna_conc=50, salt_conc=50, parameters='cloning'):
     # salt corrections added to the dS term.
     # So far, implementing this as described does not give results that match
     # any calculator but Biopython's
+    return model.equation(deltas[0], deltas[1], len(seq), dna_conc, salt_conc)
 
-    if parameters == 'breslauer' or parameters == 'cloning':
-        numerator = -deltas[0]
-        # Modified dna_conc denominator
-        denominator = (-deltas[1]) + R * log(dna_conc / 16.0)
-        # Modified Schildkraut-Lifson equation adjustment
-        salt_adjustment = 16.6 * log(salt_conc) / log(10.0)
-        melt = numerator / denominator + salt_adjustment - 273.15
-    elif parameters == 'santalucia98' or 'cloning_sl98':
-        # TODO: dna_conc should be divided by 2.0 when dna_conc >> template
-        # (like PCR)
-        numerator = -deltas[0]
-        # SantaLucia 98 salt correction
-        salt_adjustment = 0.368 * (len(seq) - 1) * log(salt_conc)
-        denominator = -deltas[1] + salt_adjustment + R * log(dna_conc / 4.0)
-        melt = -deltas[0] / denominator - 273.15
-    elif parameters == 'santalucia96':
-        # TODO: find a way to test whether the code below matches another
-        # algorithm. It appears to be correct, but need to test it.
-        numerator = -deltas[0]
-        denominator = -deltas[1] + R * log(dna_conc / 4.0)
-        # SantaLucia 96 salt correction
-        salt_adjustment = 12.5 * log10(salt_conc)
-        melt = numerator / denominator + salt_adjustment - 273.15
-    elif parameters == 'sugimoto':
-        # TODO: the stuff below is untested and probably wrong
-        numerator = -deltas[0]
-        denominator = -deltas[1] + R * log(dna_conc / 4.0)
-        # Sugimoto parameters were fit holding salt concentration constant
-        # Salt correction can be chosen / ignored? Remove sugimoto set since
-        # it's so similar to santalucia98?
-        salt_correction = 16.6 * log10(salt_conc)
-        melt = numerator / denominator + salt_correction - 273.15
-
-    if parameters == 'cloning_sl98':
-        # Corrections to make santalucia98 method approximate cloning method.
-        # May be even better for cloning with Phusion than 'cloning' method
-        melt *= 1.27329212575
-        melt += -2.55585450119
 
-    return melt
+# 2-bit codes of bases (complements sum to 3). Other characters are -1.
+_BASE_CODES = np.zeros(256, dtype=np.int64) - 1
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'Tt']):
+    for _base in _bases:
+        _BASE_CODES[ord(_base)] = _code
 
+_COMPLEMENT = string.maketrans('ACGT', 'TGCA')
 
-def _pair_deltas(seq, pars):
-    '''Add up nearest-neighbor parameters for a given sequence.
 
-    :param seq: DNA sequence for which to sum nearest neighbors
-    :type seq: str
-    :param pars: parameter set to use
-    :type pars: dict
-    :returns: nearest-neighbor delta_H and delta_S sums.
-    :rtype: tuple of floats
-
-    '''
-    delta0 = 0
-    delta1 = 0
-    for i in range(len(seq) - 1):
-        curchar = seq[i:i + 2]
-        delta0 += pars['delta_h'][curchar]
-        delta1 += pars['delta_s'][curchar]
-    return delta0, delta1
+def tm_batch(seqs, dna_conc=50, salt_conc=50, parameters='cloning'):
+    '''Calculate nearest-neighbor melting temperatures (Tm) of many
+    sequences at once. Gives the same results as coral.thermo.tm.
 
+    :param seqs: Sequences for which to calculate the tm.
+    :type seqs: coral.SequenceBatch, or list of coral.DNA or str
+    :param dna_conc: DNA concentration in nM.
+    :type dna_conc: float
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :param parameters: Nearest-neighbor parameter set (see
+                       coral.thermo.tm).
+    :type parameters: str or coral.thermo.ThermoModel
+    :returns: Melting temperature (Tm) in °C of each sequence (NaN for
+              empty sequences).
+    :rtype: numpy.ndarray
+    :raises: ValueError if parameter argument is invalid.
+             ValueError if a sequence has bases other than A, T, G, and C.
 
-def breslauer_corrections(seq, pars_error):
-    '''Sum corrections for Breslauer '84 method.
+    '''
+    model = get_model(parameters)
+    if not isinstance(seqs, cr.SequenceBatch):
+        seqs = cr.SequenceBatch(seqs)
+
+    codes = _BASE_CODES[seqs.data]
+    if (codes < 0).any():
+        raise ValueError('Can\'t calculate Tm of bases other than A, T, G, '
+                         'and C.')
+    lengths = seqs.lengths
+    starts = seqs.offsets[:-1]
+    last = seqs.offsets[1:] - 1
+    members = np.repeat(np.arange(len(seqs)), lengths)
+    nonempty = lengths > 0
+
+    # Sum up the nearest-neighbor enthalpy and entropy. bincount adds the
+    # pairs of each sequence in order, just like _pair_deltas.
+    pair_mask = np.ones(max(len(codes) - 1, 0), dtype=np.bool_)
+    pair_mask[last[nonempty & (last < len(pair_mask))]] = False
+    pairs = (4 * codes[:-1] + codes[1:])[pair_mask]
+    pair_members = members[:-1][pair_mask]
+    pair_deltas = []
+    for table in [model.delta_h_table, model.delta_s_table]:
+        pair_deltas.append(np.bincount(pair_members, weights=table[pairs],
+                                       minlength=len(seqs)))
+
+    # Terms for the corrections (empty sequences read a padding base, then
+    # become NaN at the end)
+    padded = np.append(codes, 0)
+    first = padded[starts]
+    end = padded[last]
+    mirror = np.repeat(starts + last, lengths) - np.arange(len(codes))
+    mismatches = np.bincount(members, weights=(codes + codes[mirror] != 3),
+                             minlength=len(seqs))
+    symmetric = mismatches == 0
+    gc_counts = np.bincount(members, weights=(codes == 1) | (codes == 2),
+                            minlength=len(seqs))
+    melt = _corrected_melt(model, pair_deltas, first, end, gc_counts,
+                           symmetric, lengths, dna_conc, salt_conc)
+    melt[~nonempty] = np.nan
+    return melt
 
-    :param seq: sequence for which to calculate corrections.
-    :type seq: str
-    :param pars_error: dictionary of error corrections
-    :type pars_error: dict
-    :returns: Corrected delta_H and delta_S parameters
-    :rtype: list of floats
 
-    '''
-    deltas_corr = [0, 0]
-    contains_gc = 'G' in str(seq) or 'C' in str(seq)
-    only_at = str(seq).count('A') + str(seq).count('T') == len(seq)
-    symmetric = seq == seq.reverse_complement()
-    terminal_t = str(seq)[0] == 'T' + str(seq)[-1] == 'T'
-
-    for i, delta in enumerate(['delta_h', 'delta_s']):
-        if contains_gc:
-            deltas_corr[i] += pars_error[delta]['anyGC']
-        if only_at:
-            deltas_corr[i] += pars_error[delta]['onlyAT']
-        if symmetric:
-            deltas_corr[i] += pars_error[delta]['symmetry']
-        if terminal_t and delta == 'delta_h':
-            deltas_corr[i] += pars_error[delta]['terminalT'] * terminal_t
-    return deltas_corr
-
-
-def santalucia98_corrections(seq, pars_error):
-    '''Sum corrections for SantaLucia '98 method (unified parameters).
-
-    :param seq: sequence for which to calculate corrections.
-    :type seq: str
-    :param pars_error: dictionary of error corrections
-    :type pars_error: dict
-    :returns: Corrected delta_H and delta_S parameters
-    :rtype: list of floats
+class TmProfile(object):
+    '''Melting temperatures of any part of a template. Cumulative sums of
+    the nearest-neighbor parameters are computed once, so the Tm of each
+    window of the template takes constant time. Results match
+    coral.thermo.tm up to floating-point rounding.'''
+
+    def __init__(self, template, dna_conc=50, salt_conc=50,
+                 parameters='cloning'):
+        '''
+        :param template: Sequence whose windows to calculate Tms for.
+        :type template: coral.DNA or str
+        :param dna_conc: DNA concentration in nM.
+        :type dna_conc: float
+        :param salt_conc: Salt concentration in mM.
+        :type salt_conc: float
+        :param parameters: Nearest-neighbor parameter set (see
+                           coral.thermo.tm).
+        :type parameters: str or coral.thermo.ThermoModel
+        :returns: coral.thermo.TmProfile instance.
+        :raises: ValueError if parameter argument is invalid.
+
+        '''
+        self.model = get_model(parameters)
+        self.dna_conc = dna_conc
+        self.salt_conc = salt_conc
+
+        self._seq = str(template).upper()
+        # Reverse complement for checking symmetry (non-ATGC bases are only
+        # there to keep the lengths equal)
+        self._rc = self._seq[::-1].translate(_COMPLEMENT)
+        self._codes = _BASE_CODES[np.frombuffer(self._seq, dtype=np.uint8)]
+        invalid = self._codes < 0
+        self._invalid = np.concatenate([[0], np.cumsum(invalid)])
+        codes = np.where(invalid, 0, self._codes)
+        gc = (codes == 1) | (codes == 2)
+        self._gc = np.concatenate([[0], np.cumsum(gc)])
+        pairs = 4 * codes[:-1] + codes[1:]
+        self._pair_sums = []
+        for table in [self.model.delta_h_table, self.model.delta_s_table]:
+            self._pair_sums.append(np.concatenate([[0],
+                                                   np.cumsum(table[pairs])]))
+
+    def __len__(self):
+        return len(self._seq)
+
+    def tms(self, starts, stops):
+        '''Calculate the Tms of many windows of the template.
+
+        :param starts: Start of each window.
+        :type starts: numpy.ndarray or list of ints
+        :param stops: End (exclusive) of each window.
+        :type stops: numpy.ndarray or list of ints
+        :returns: Tm of each window. Windows that are empty, fall outside
+                  the template, or have bases other than A, T, G, and C are
+                  NaN.
+        :rtype: numpy.ndarray
+
+        '''
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+        if not len(self):
+            return np.zeros(starts.shape) + np.nan
+        valid = (starts >= 0) & (stops > starts) & (stops <= len(self))
+        starts = np.where(valid, starts, 0)
+        stops = np.where(valid, stops, 1)
+        valid &= self._invalid[stops] == self._invalid[starts]
+
+        lengths = stops - starts
+        pair_deltas = [sums[stops - 1] - sums[starts] for sums in
+                       self._pair_sums]
+        first = self._codes[starts]
+        end = self._codes[stops - 1]
+        gc_counts = self._gc[stops] - self._gc[starts]
+        # Only even windows with complementary ends can be symmetric
+        symmetric = valid & (lengths % 2 == 0) & (first + end == 3)
+        n = len(self)
+        for i in np.flatnonzero(symmetric):
+            start = starts[i]
+            stop = stops[i]
+            symmetric[i] = self._seq[start:stop] == self._rc[n - stop:
+                                                             n - start]
+        melt = _corrected_melt(self.model, pair_deltas, first, end,
+                               gc_counts, symmetric, lengths, self.dna_conc,
+                               self.salt_conc)
+        melt[~valid] = np.nan
+        return melt
+
+    def tm(self, start, stop):
+        '''Calculate the Tm of a window of the template.
+
+        :param start: Start of the window.
+        :type start: int
+        :param stop: End (exclusive) of the window.
+        :type stop: int
+        :returns: Melting temperature (Tm) in °C.
+        :rtype: float
+        :raises: ValueError if the window is empty, falls outside the
+                 template, or has bases other than A, T, G, and C.
+
+        '''
+        melt = self.tms([start], [stop])[0]
+        if np.isnan(melt):
+            raise ValueError('Can\'t calculate Tm of an empty window or of '
+                             'bases other than A, T, G, and C.')
+        return float(melt)
+
+    def tm_windows(self, lengths):
+        '''Calculate the Tm of every window of the template with each of
+        the given lengths.
+
+        :param lengths: Window lengths.
+        :type lengths: list of ints
+        :returns: Array of Tms with a row for each length and a column for
+                  each start position. Windows that run past the end of the
+                  template or have bases other than A, T, G, and C are NaN.
+        :rtype: numpy.ndarray
+
+        '''
+        lengths = np.asarray(lengths, dtype=np.int64).reshape(-1, 1)
+        starts = np.arange(len(self)).reshape(1, -1)
+        starts, stops = np.broadcast_arrays(starts, starts + lengths)
+        return self.tms(starts.ravel(), stops.ravel()).reshape(starts.shape)
+
+
+def _corrected_melt(model, pair_deltas, first, end, gc_counts, symmetric,
+                    lengths, dna_conc, salt_conc):
+    '''Apply the corrections and melting equation of a model to arrays of
+    summed nearest-neighbor parameters.
+
+    :param model: Nearest-neighbor parameter set.
+    :type model: coral.thermo.ThermoModel
+    :param pair_deltas: Summed nearest-neighbor delta_H and delta_S.
+    :type pair_deltas: list of numpy.ndarray
+    :param first: Code of the first base of each sequence.
+    :type first: numpy.ndarray
+    :param end: Code of the last base of each sequence.
+    :type end: numpy.ndarray
+    :param gc_counts: Number of G and C bases in each sequence.
+    :type gc_counts: numpy.ndarray
+    :param symmetric: Whether each sequence is its own reverse complement.
+    :type symmetric: numpy.ndarray
+    :param lengths: Length of each sequence.
+    :type lengths: numpy.ndarray
+    :param dna_conc: DNA concentration in nM.
+    :type dna_conc: float
+    :param salt_conc: Salt concentration in mM.
+    :type salt_conc: float
+    :returns: Melting temperatures.
+    :rtype: numpy.ndarray
 
     '''
-    deltas_corr = [0, 0]
-    first = str(seq)[0]
-    last = str(seq)[-1]
-
-    start_gc = first == 'G' or first == 'C'
-    start_at = first == 'A' or first == 'T'
-    end_gc = last == 'G' or last == 'C'
-    end_at = last == 'A' or last == 'T'
-    init_gc = start_gc + end_gc
-    init_at = start_at + end_at
-
-    symmetric = seq == seq.reverse_complement()
-
-    for i, delta in enumerate(['delta_h', 'delta_s']):
-        deltas_corr[i] += init_gc * pars_error[delta]['initGC']
-        deltas_corr[i] += init_at * pars_error[delta]['initAT']
-        if symmetric:
-            deltas_corr[i] += pars_error[delta]['symmetry']
-    return deltas_corr
+    start_gc = (first == 1) | (first == 2)
+    end_gc = (end == 1) | (end == 2)
+    deltas = model.correct(start_gc, end_gc, gc_counts, symmetric)
+    delta_h = (deltas[0] + pair_deltas[0]) * 1e3
+    delta_s = deltas[1] + pair_deltas[1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return model.equation(delta_h, delta_s, lengths, dna_conc / 1e9,
+                              salt_conc / 1e3)
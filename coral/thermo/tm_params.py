@@ -242,3 +242,114 @@ CLONING = {
         'anyGC': 0.0,
         'symmetry': 0.0,
         'terminalT': 0.0}}
+
+
+# Internal single mismatches (Allawi & SantaLucia 1997-1999, Peyret et al
+# 1999), as 5'-top-3'/3'-bottom-5' stacks. Signs follow the sets above. A stack
+# missing here is found by reading the duplex from the other strand, e.g.
+# 'GA/TT' as 'TT/AG'.
+SANTALUCIA_MISMATCHES = {
+    'delta_h': {
+        'AG/TT': -1.0,
+        'AT/TG': 2.5,
+        'CG/GT': 4.1,
+        'CT/GG': 2.8,
+        'GG/CT': -3.3,
+        'GG/TT': -5.8,
+        'GT/CG': 4.4,
+        'GT/TG': -4.1,
+        'TG/AT': 0.1,
+        'TG/GT': 1.4,
+        'TT/AG': 1.3,
+        'AA/TG': 0.6,
+        'AG/TA': 0.7,
+        'CA/GG': 0.7,
+        'CG/GA': 4.0,
+        'GA/CG': 0.6,
+        'GG/CA': -0.5,
+        'TA/AG': -0.7,
+        'TG/AA': -3.0,
+        'AC/TT': -0.7,
+        'AT/TC': 1.2,
+        'CC/GT': 0.8,
+        'CT/GC': 1.5,
+        'GC/CT': -2.3,
+        'GT/CC': -5.2,
+        'TC/AT': -1.2,
+        'TT/AC': -1.0,
+        'AA/TC': -2.3,
+        'AC/TA': -5.3,
+        'CA/GC': -1.9,
+        'CC/GA': -0.6,
+        'GA/CC': -5.2,
+        'GC/CA': 0.7,
+        'TA/AC': -3.4,
+        'TC/AA': -7.6,
+        'AA/TA': -1.2,
+        'CA/GA': 0.9,
+        'GA/CA': 2.9,
+        'TA/AA': -4.7,
+        'AC/TC': 0.0,
+        'CC/GC': 1.5,
+        'GC/CC': -3.6,
+        'TC/AC': -6.1,
+        'AG/TG': 3.1,
+        'CG/GG': 4.9,
+        'GG/CG': 6.0,
+        'TG/AG': -1.6,
+        'AT/TT': 2.7,
+        'CT/GT': 5.0,
+        'GT/CT': 2.2,
+        'TT/AT': -0.2},
+    'delta_s': {
+        'AG/TT': -0.9,
+        'AT/TG': 8.3,
+        'CG/GT': 11.7,
+        'CT/GG': 8.0,
+        'GG/CT': -10.4,
+        'GG/TT': -16.3,
+        'GT/CG': 12.3,
+        'GT/TG': -9.5,
+        'TG/AT': 1.7,
+        'TG/GT': 6.2,
+        'TT/AG': 5.3,
+        'AA/TG': 2.3,
+        'AG/TA': 2.3,
+        'CA/GG': 2.3,
+        'CG/GA': 13.2,
+        'GA/CG': 1.0,
+        'GG/CA': -3.2,
+        'TA/AG': -0.7,
+        'TG/AA': -7.4,
+        'AC/TT': -0.2,
+        'AT/TC': 6.2,
+        'CC/GT': 4.5,
+        'CT/GC': 6.1,
+        'GC/CT': -5.4,
+        'GT/CC': -13.5,
+        'TC/AT': -0.7,
+        'TT/AC': -0.7,
+        'AA/TC': -4.6,
+        'AC/TA': -14.6,
+        'CA/GC': -3.7,
+        'CC/GA': 0.6,
+        'GA/CC': -14.2,
+        'GC/CA': 3.8,
+        'TA/AC': -8.0,
+        'TC/AA': -20.2,
+        'AA/TA': -1.7,
+        'CA/GA': 4.2,
+        'GA/CA': 9.8,
+        'TA/AA': -12.9,
+        'AC/TC': 4.4,
+        'CC/GC': 7.2,
+        'GC/CC': -8.9,
+        'TC/AC': -16.4,
+        'AG/TG': 9.5,
+        'CG/GG': 15.3,
+        'GG/CG': 15.8,
+        'TG/AG': -3.6,
+        'AT/TT': 10.8,
+        'CT/GT': 15.8,
+        'GT/CT': 8.4,
+        'TT/AT': 1.5}}
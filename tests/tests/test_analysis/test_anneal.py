@@ -1,7 +1,7 @@
 '''Test functionality of PCR class of reaction module.'''
 import os
 import coral as cr
-from nose.tools import assert_true, assert_raises
+from nose.tools import assert_equal, assert_true, assert_raises
 
 
 def test_basic():
@@ -214,3 +214,31 @@ def test_primer_larger_than_template():
     amplicon = cr.reaction.pcr(template, primer1, primer2)
 
     assert_true(expected == amplicon)
+
+
+def test_extension():
+    '''Test that matches extend over the origin and stop at mismatches.'''
+    seq = 'TTCGATCGGCATTACGGATTCAGAGCTAGCCAT'
+    template = cr.DNA(seq, circular=True)
+    primer = cr.Primer(cr.DNA('TTTT' + seq[-8:] + seq[:14]), 50)
+    assert_equal(cr.analysis.anneal(template, primer, min_tm=0),
+                 [[[14, 22]], []])
+    assert_equal(cr.analysis.anneal(template.linearize(), primer, min_tm=0),
+                 [[[14, 14]], []])
+
+
+def test_anneal_many():
+    '''Test that annealing many primers matches annealing each one.'''
+    current_path = os.path.dirname(__file__)
+    template = cr.io.read_dna(os.path.join(current_path,
+                                           'pMODKan-HO-pACT1GEV.ape'))
+    seqs = ['cgccagggttttcccagtcacgac', 'ggggggACAAGAGAGATTGGGAAGGAAAGGATCA',
+            'aggccctttcgtctcgcgcgttt', 'ggaggagggcggcgaggcgagcgacggaggggga',
+            'cgccagggttttcccagtcacgac']
+    primers = [cr.Primer(cr.DNA(seq), 50.6) for seq in seqs]
+    for dna in [template, template.circularize()]:
+        expected = [cr.analysis.anneal(dna, primer) for primer in primers]
+        assert_equal(cr.analysis.anneal_many(dna, primers), expected)
+    assert_equal(cr.analysis.anneal_many(template, []), [])
+    assert_raises(cr.analysis.PrimerLengthError, cr.analysis.anneal_many,
+                  template, primers, min_len=30)
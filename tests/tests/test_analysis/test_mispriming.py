@@ -0,0 +1,29 @@
+'''Tests for the mispriming scan.'''
+import coral as cr
+from nose.tools import assert_equal, assert_raises, assert_true
+
+
+def test_mispriming():
+    primer = 'ATGCGATAGCGATAGCCAGT'
+    internal = 'ATGCGATAGCTATAGCCAGT'
+    three_prime = 'ATGCGATAGCGATAGCCAGA'
+    spacer = 'GGGGGAAAAACCCCCTTTTT'
+    template = cr.DNA(spacer + primer + spacer + internal + spacer +
+                      str(cr.DNA(three_prime).reverse_complement()) + spacer)
+    sites = cr.analysis.mispriming(template, cr.Primer(cr.DNA(primer), 60),
+                                   min_dg=-5)
+    assert_equal([(site.strand, site.location, site.mismatches) for site in
+                  sites],
+                 [(0, 40, ()), (0, 80, (9,)), (1, 40, (0,))])
+    assert_true(sites[0].dg < sites[1].dg)
+    # The 3' mismatch is penalized when ranking
+    assert_true(sites[2].score - sites[2].dg > sites[1].score - sites[1].dg)
+
+    assert_equal(len(cr.analysis.mispriming(template, primer,
+                                            max_mismatches=0)), 1)
+    # Sites over the origin of circular templates
+    circular = template.circularize().rotate(110)
+    sites = cr.analysis.mispriming(circular, primer, max_mismatches=0)
+    assert_equal([(site.strand, site.location) for site in sites],
+                 [(0, 10)])
+    assert_raises(ValueError, cr.analysis.mispriming, template, '')
@@ -0,0 +1,35 @@
+'''
+Tests for the PatternSet multi-pattern search.
+
+'''
+
+import os
+import coral as cr
+from nose.tools import assert_equal, assert_raises
+
+
+def test_locate_many():
+    current_path = os.path.dirname(__file__)
+    template = cr.io.read_dna(os.path.join(current_path,
+                                           'pMODKan-HO-pACT1GEV.ape'))
+    patterns = ['GAATTC', 'GGATCC', 'GCNGC', 'CCNNGG', 'ATG', 'NNN',
+                'cgccagggttttcccagtcacgac', 'GAATTC']
+    expected = [template.locate(pattern) for pattern in patterns]
+    assert_equal(template.locate_many(patterns), expected)
+    pattern_set = cr.analysis.PatternSet(patterns)
+    assert_equal(template.locate_many(pattern_set), expected)
+
+
+def test_circular():
+    dna = cr.DNA('ATGCATGCAA', circular=True)
+    patterns = ['AAAT', 'AANTG', 'ATGCAAATGCATG']
+    assert_equal(dna.locate_many(patterns),
+                 [[[8], []], [[8], []], [[4], []]])
+    assert_raises(ValueError, dna.locate_many, ['A' * 20])
+
+
+def test_single_stranded():
+    pattern_set = cr.analysis.PatternSet(['GG', 'CNG'])
+    assert_equal(pattern_set.locate(cr.ssDNA('GGCAGG')), [[0, 4], [2]])
+    assert_raises(ValueError, pattern_set.locate, cr.ssDNA('G'))
+    assert_raises(ValueError, cr.analysis.PatternSet, ['A', ''])
@@ -0,0 +1,50 @@
+'''
+Tests for the SequenceIndex search index.
+
+'''
+
+import os
+import coral as cr
+from nose.tools import assert_equal, assert_false, assert_raises, assert_true
+
+
+def test_locate():
+    current_path = os.path.dirname(__file__)
+    template = cr.io.read_dna(os.path.join(current_path,
+                                           'pMODKan-HO-pACT1GEV.ape'))
+    index = cr.analysis.SequenceIndex(template)
+    for pattern in ['cgccagggttttcccagtcacgac', 'GAATTC', 'ATG', 'TTNAA',
+                    str(template[-10:]) + str(template[:10])]:
+        expected = [sorted(matches) for matches in template.locate(pattern)]
+        assert_equal(index.locate(pattern), expected)
+
+
+def test_linear():
+    dna = cr.DNA('ATGCATGCAA')
+    index = cr.analysis.SequenceIndex(dna)
+    assert_equal(index.locate('ATGC'), [[0, 4], [4]])
+    assert_equal(index.locate('AAAT'), [[], []])
+    assert_equal(index.locate('ATGCATGCAA'), [[0], []])
+    assert_raises(ValueError, index.locate, 'ATGCATGCAAT')
+
+
+def test_circular():
+    dna = cr.DNA('ATATAT', circular=True)
+    index = cr.analysis.SequenceIndex(dna)
+    assert_equal(index.locate('TA'), [[1, 3, 5], [1, 3, 5]])
+    assert_equal(index.locate('TATATATA'), dna.locate('TATATATA'))
+    ssdna = cr.ssDNA('GGATCC', circular=True)
+    assert_equal(cr.analysis.SequenceIndex(ssdna).locate('CCG'), [4])
+
+
+def test_build_index():
+    dna = cr.DNA('ATGCATGCAA', circular=True)
+    index = dna.build_index()
+    assert_true(dna._index is index)
+    assert_equal(dna.locate('AAAT'), [[8], []])
+    assert_true(dna.copy()._index is index)
+    # Changes to the sequence make the index stale
+    dna.top.seq = 'TTTTTTTTTT'
+    assert_equal(dna.locate('AAAT'), [[], []])
+    linear = dna.linearize()
+    assert_false(linear._index_key == linear._state_key())
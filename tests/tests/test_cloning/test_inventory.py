@@ -0,0 +1,176 @@
+'''Tests reuse of stored primers.'''
+import os
+import shutil
+import tempfile
+import coral as cr
+from nose.tools import assert_equal, assert_raises, assert_true
+
+
+SEQ = cr.DNA('ATGGTGAGCAAGGGCGAGGAGCTGTTCACCGGGGTGGTGCCCATCCTGGTCGAGCTGGACGGC'
+             'GACGTAAACGGCCACAAGTTCAGCGTGTCCGGCGAGGGCGAGGGCGATGCCACCTACGGCAAG'
+             'CTGACCCTGAAGTTCATCTGCACCACCGGCAAGCTGCCCGTGCCCTGGCCCACCCTCGTGACC')
+
+
+def test_primer_inventory():
+    '''Test reusing stored primers when designing primers.'''
+    fwd, rev = cr.cloning.primers(SEQ, tm=65)
+    stored = cr.Primer(fwd.anneal, name='stock', note='box 1')
+    other = cr.Primer(cr.ssDNA('GATCGATCGATACGATCGAT'), name='other')
+    inventory = cr.cloning.PrimerInventory([other, stored])
+    assert_equal(len(inventory), 2)
+
+    reused = cr.cloning.primer(SEQ, tm=65, inventory=inventory)
+    assert_equal(reused, stored)
+    assert_equal(reused.name, 'stock')
+    # Copies are returned
+    reused.name = 'changed'
+    assert_equal(inventory.primers[1].name, 'stock')
+    # Outside the Tm settings or with a different overhang, new primers are
+    # designed
+    assert_equal(cr.cloning.primer(SEQ, tm=60, inventory=inventory),
+                 cr.cloning.primer(SEQ, tm=60))
+    assert_equal(cr.cloning.primer(SEQ, tm=65, overhang=cr.DNA('GATC'),
+                                   inventory=inventory).name, '')
+    # Only the forward primer is stored
+    reused = cr.cloning.primers(SEQ, tm=65, inventory=inventory)
+    assert_equal(reused, [stored, rev])
+    assert_equal(inventory.find('TTTTTTTTTTTTTTTTTTTTTTTT'), None)
+    assert_raises(ValueError, cr.cloning.PrimerInventory, k=0)
+
+
+def test_inventory_rules():
+    '''Test that stored primers must follow the design rules.'''
+    stored = cr.Primer(cr.ssDNA('ATGGTGAGCAAGGGCGA'), name='stock')
+    inventory = cr.cloning.PrimerInventory([stored])
+    assert_equal(cr.cloning.primer(SEQ, tm=65, inventory=inventory).name,
+                 'stock')
+    assert_equal(cr.cloning.primer(SEQ, tm=65, end_gc=True,
+                                   inventory=inventory).name, '')
+    assert_equal(cr.cloning.primer(SEQ, tm=65, min_len=20,
+                                   inventory=inventory).name, '')
+    # The last 5 bases (GGCGA) have 4 Gs and Cs, and the longest run is GGG
+    assert_equal(inventory.find(SEQ, max_end_gc=3), None)
+    assert_equal(inventory.find(SEQ, max_end_gc=4).name, 'stock')
+    assert_equal(inventory.find(SEQ, max_run=2), None)
+    assert_equal(inventory.find(SEQ, max_run=3).name, 'stock')
+    assert_equal(inventory.find(SEQ, min_end_dg=-5), None)
+
+
+def test_inventory_one_end():
+    '''Test that only the primers that aren't stored are designed.'''
+    # No primer within the first 90 bases reaches a Tm of 69
+    at_rich = ('ATTAAAATAATATAATATTAAATAAAAAAAAAAAAATAAATTAATTTATTAATTAAAA'
+               'TAAATTAAATAAAAATTAAAATTATAATAAAATATTTTTAAA')
+    template = cr.DNA(at_rich) + SEQ
+    assert_raises(ValueError, cr.cloning.primers, template, tm=70)
+    inventory = cr.cloning.PrimerInventory(
+        [cr.Primer(cr.ssDNA(at_rich), name='long')])
+    fwd, rev = cr.cloning.primers(template, tm=70, inventory=inventory)
+    assert_equal(fwd.name, 'long')
+    assert_equal(rev, cr.cloning.primers(SEQ, tm=70)[1])
+
+
+def test_inventory_csv():
+    '''Test loading an inventory written by coral.io.write_primers.'''
+    primers = cr.cloning.primers(SEQ, tm=65,
+                                 overhangs=[cr.DNA('GATCGATAT'), None])
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'primers.csv')
+        cr.io.write_primers(primers, path, names=['fwd', 'rev'],
+                            notes=['a', 'b'])
+        loaded = cr.io.read_primers(path)
+        assert_equal(loaded, primers)
+        assert_equal([(primer.name, primer.note) for primer in loaded],
+                     [('fwd', 'a'), ('rev', 'b')])
+        inventory = cr.cloning.PrimerInventory.from_csv(path)
+    finally:
+        shutil.rmtree(directory)
+    reused = cr.cloning.primers(SEQ, tm=65,
+                                overhangs=[cr.DNA('GATCGATAT'), None],
+                                inventory=inventory)
+    assert_equal([primer.name for primer in reused], ['fwd', 'rev'])
+
+    # Gibson primers with the same overhangs are reused too
+    left = SEQ[:90]
+    right = SEQ[90:]
+    rev, fwd = cr.cloning.gibson_primers(left, right, 'right')
+    inventory.add(cr.Primer(rev.anneal, overhang=rev.overhang, name='gib'))
+    reused = cr.cloning.gibson_primers(left, right, 'right',
+                                       inventory=inventory)
+    assert_equal(reused, (rev, fwd))
+    assert_equal(reused[0].name, 'gib')
+    assert_true(reused[1].name != 'gib')
+
+
+def test_inventory_gibson_maxlen():
+    '''Test that stored Gibson primers must fit within maxlen.'''
+    left = SEQ[:90]
+    right = SEQ[90:]
+    primer_kwargs = {'tm_overshoot': 6}
+    rev, fwd = cr.cloning.gibson_primers(left, right, 'right',
+                                         primer_kwargs=primer_kwargs)
+    # One base longer than the designed primer, with the same overhang
+    longer = cr.ssDNA(str(left.flip()[:len(rev.anneal) + 1]))
+    inventory = cr.cloning.PrimerInventory(
+        [cr.Primer(longer, overhang=rev.overhang, name='long')])
+    reused = cr.cloning.gibson_primers(left, right, 'right',
+                                       primer_kwargs=primer_kwargs,
+                                       inventory=inventory)
+    assert_equal(reused[0].name, 'long')
+    # The designed primer fits but the stored one doesn't
+    reused = cr.cloning.gibson_primers(left, right, 'right', maxlen=len(rev),
+                                       primer_kwargs=primer_kwargs,
+                                       inventory=inventory)
+    assert_equal(reused, (rev, fwd))
+    assert_equal(reused[0].name, '')
+    assert_equal(inventory.find(left.flip(), tm_overshoot=6,
+                                overhang=rev.overhang, max_len=len(rev)),
+                 None)
+
+
+def test_inventory_structure():
+    '''Test that stored primers are checked for structure too.'''
+    fwd, rev = cr.cloning.primers(SEQ, tm=65)
+    inventory = cr.cloning.PrimerInventory(
+        [cr.Primer(fwd.anneal, name='stock')])
+    checked = []
+    structure = cr.cloning._primers._structure
+    cr.cloning._primers._structure = checked.append
+    try:
+        cr.cloning.primer(SEQ, tm=65, inventory=inventory)
+        assert_equal(checked, [])
+        reused = cr.cloning.primer(SEQ, tm=65, structure=True,
+                                   inventory=inventory)
+        assert_equal([primer.name for primer in checked], ['stock'])
+        assert_equal(reused.name, 'stock')
+        del checked[:]
+        cr.cloning.primers(SEQ, tm=65, structure=True, inventory=inventory)
+        assert_equal(checked, [fwd, rev])
+        assert_equal(checked[0].name, 'stock')
+    finally:
+        cr.cloning._primers._structure = structure
+
+
+def test_read_degenerate_primers():
+    '''Test reading primers with degenerate overhangs.'''
+    alphabet = cr.alphabets.Alphabet(symbols='ACGTNRYKMSWBDHV-')
+    primers = [cr.Primer(cr.ssDNA('ATGGTGAGCAAGGGCGA', alphabet=alphabet),
+                         overhang=cr.ssDNA('GATRYKMSWN', alphabet=alphabet)),
+               cr.Primer(cr.ssDNA('GCCGTCCAGCTCGAC', alphabet=alphabet),
+                         overhang=cr.ssDNA('YGATC', alphabet=alphabet))]
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'primers.csv')
+        cr.io.write_primers(primers, path, names=['fwd', 'rev'])
+        loaded = cr.io.read_primers(path, alphabet=alphabet)
+        inventory = cr.cloning.PrimerInventory.from_csv(path,
+                                                        alphabet=alphabet)
+    finally:
+        shutil.rmtree(directory)
+    assert_equal(loaded, primers)
+    assert_equal([str(primer.overhang) for primer in loaded],
+                 ['GATRYKMSWN', 'YGATC'])
+    assert_equal([str(primer.anneal) for primer in loaded],
+                 ['ATGGTGAGCAAGGGCGA', 'GCCGTCCAGCTCGAC'])
+    assert_equal(len(inventory), 2)
@@ -0,0 +1,39 @@
+'''Tests multiplex primer design.'''
+import random
+import coral as cr
+from nose.tools import assert_equal, assert_raises, assert_true
+
+
+def test_multiplex_primers():
+    '''Test multiplex_primers function.'''
+    rng = random.Random(5)
+    targets = [''.join(rng.choice('ACGT') for _ in range(200)) for _ in
+               range(20)]
+    # Designing each target on its own leaves dimers in the pool
+    separate = [cr.cloning.primers(cr.DNA(target), tm=60, tm_undershoot=4,
+                                   tm_overshoot=4) for target in targets]
+    pool = [primer.primer() for pair in separate for primer in pair]
+    assert_true(cr.structure.dimer_screen(pool, max_dg=-4.0))
+
+    multiplex = cr.cloning.multiplex_primers(targets, tm_window=(56, 64),
+                                             max_dimer_dg=-4.0)
+    assert_equal(len(multiplex), len(targets))
+    pool = [primer.primer() for pair in multiplex for primer in pair]
+    assert_equal(cr.structure.dimer_screen(pool, max_dg=-4.0), [])
+    for target, (forward, reverse) in zip(targets, multiplex):
+        assert_true(target.startswith(str(forward.anneal)))
+        reverse_target = str(cr.DNA(target).reverse_complement())
+        assert_true(reverse_target.startswith(str(reverse.anneal)))
+        for primer in [forward, reverse]:
+            assert_true(56 <= primer.tm <= 64)
+
+    # Overhangs are added to every primer
+    overhangs = [cr.DNA('GATCGATAT'), cr.DNA('CCTAGG')]
+    multiplex = cr.cloning.multiplex_primers(targets[:3], tm_window=(56, 64),
+                                             overhangs=overhangs)
+    for forward, reverse in multiplex:
+        assert_equal(str(forward.overhang), 'GATCGATAT')
+        assert_equal(str(reverse.overhang), 'CCTAGG')
+
+    assert_raises(ValueError, cr.cloning.multiplex_primers, targets,
+                  tm_window=(80, 82))
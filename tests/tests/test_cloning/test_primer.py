@@ -1,5 +1,6 @@
 '''Tests primer design module.'''
 from nose.tools import assert_equals, assert_not_equal, assert_raises
+from nose.tools import assert_almost_equal, assert_true
 import coral as cr
 
 
@@ -72,3 +73,87 @@ def test_primers():
     primers = [str(x.primer()) for x in primers_list]
     assert_equals(primers, ['ATGGTGAGCAAGGGCGAGGAG',
                             'TTACTTGTACAGCTCGTCCATGCCG'])
+
+
+def test_primer_candidates():
+    '''Test primer_candidates function.'''
+    template = cr.DNA('GATCGATCGATACGATCGATATGCGATATGATCGATAT')
+    candidates = cr.cloning.primer_candidates(template, tm=72)
+    assert_equals(candidates[0].sequence, 'GATCGATCGATACGATCGATATGCGAT')
+    assert_equals(str(cr.cloning.primer(template, tm=72)),
+                  candidates[0].sequence)
+    tm_diffs = [abs(candidate.tm - 72) for candidate in candidates]
+    assert_equals(tm_diffs, sorted(tm_diffs))
+    # Last 5 bases are GCGAT
+    assert_equals(candidates[0].end_gc_count, 3)
+    assert_almost_equal(candidates[0].end_dg, -6.58, places=2)
+    assert_equals(candidates[0].max_run, 1)
+
+    # 3' end rules
+    for candidate in cr.cloning.primer_candidates(template, tm=72,
+                                                  end_gc=True):
+        assert_true(candidate.sequence[-1] in 'GC')
+    for candidate in cr.cloning.primer_candidates(template, tm=72,
+                                                  max_end_gc=2,
+                                                  min_end_dg=-5):
+        assert_true(candidate.end_gc_count <= 2)
+        assert_true(candidate.end_dg >= -5)
+    assert_equals(cr.cloning.primer_candidates('AAAAAAGCGCGCGCGCCCCCGGGGG',
+                                               tm=60, max_run=5), [])
+    assert_raises(ValueError, cr.cloning.primer, 'AAAAAAGCGCGCGCGCCCCCGGGGG',
+                  tm=60, max_run=5)
+
+
+def test_design_primers_batch():
+    '''Test design_primers_batch function.'''
+    seq = ('ATGGTGAGCAAGGGCGAGGAGCTGTTCACCGGGGTGGTGCCCATCCTGGTCGAGCTGGACGGC'
+           'GACGTAAACGGCCACAAGTTCAGCGTGTCCGGCGAGGGCGAGGGCGATGCCACCTACGGCAAG'
+           'CTGACCCTGAAGTTCATCTGCACCACCGGCAAGCTGCCCGTGCCCTGGCCCACCCTCGTGACC')
+    dna_seq = cr.DNA(seq)
+    plasmid = dna_seq.circularize()
+    targets = [dna_seq, seq[:100], (plasmid, 150, 20), 'at', (dna_seq, 10, 5)]
+    expected = [cr.cloning.primers(dna_seq, tm=65),
+                cr.cloning.primers(dna_seq[:100], tm=65),
+                cr.cloning.primers(dna_seq[150:] + dna_seq[:20], tm=65)]
+    for processes in [None, 2]:
+        designs = cr.cloning.design_primers_batch(targets, tm=65,
+                                                  processes=processes)
+        assert_equals([design.primers for design in designs[:3]], expected)
+        assert_equals([design.error for design in designs[:3]],
+                      [None, None, None])
+        # Failures are reported without stopping the batch
+        for design in designs[3:]:
+            assert_equals(design.primers, None)
+            assert_true(design.error)
+
+    overhangs = [cr.DNA('GATCGATAT'), None]
+    designs = cr.cloning.design_primers_batch(targets[:1], tm=65,
+                                              overhangs=overhangs)
+    assert_equals(designs[0].primers,
+                  cr.cloning.primers(dna_seq, tm=65, overhangs=overhangs))
+    assert_raises(TypeError, cr.cloning.design_primers_batch, targets,
+                  temperature=65)
+    assert_raises(TypeError, cr.cloning.iter_design_primers, targets,
+                  temperature=65)
+
+    # Designs are streamed back in order
+    for processes in [None, 2]:
+        designs = cr.cloning.iter_design_primers(targets, tm=65,
+                                                 processes=processes)
+        assert_equals(next(designs).primers, expected[0])
+        assert_equals([design.primers for design in designs][:2],
+                      expected[1:])
+        # Stopping early closes the pool
+        designs = cr.cloning.iter_design_primers(targets, tm=65,
+                                                 processes=processes)
+        assert_equals(next(designs).primers, expected[0])
+        designs.close()
+
+    # Stored primers are reused
+    stored = cr.Primer(expected[0][0].anneal, name='stock')
+    inventory = cr.cloning.PrimerInventory([stored])
+    designs = cr.cloning.design_primers_batch(targets[:2], tm=65,
+                                              inventory=inventory)
+    assert_equals([design.primers for design in designs], expected[:2])
+    assert_equals([primer.name for primer in designs[0].primers],
+                  ['stock', ''])
@@ -1,5 +1,8 @@
 '''Test functionality of PCR class of reaction module.'''
-from nose.tools import assert_equal, assert_raises
+import os
+import shutil
+import tempfile
+from nose.tools import assert_equal, assert_raises, assert_true
 import coral as cr
 
 
@@ -141,3 +144,108 @@ class TestPCR(object):
         fwd, rev = cr.cloning.primers(template)
         assert_raises(cr.reaction._pcr.PrimingError, cr.reaction.pcr,
                       template, fwd, rev)
+
+    def test_products(self):
+        '''Test finding every product of a primer pair.'''
+        fwd, rev = cr.cloning.primers(self.template[30:-30])
+        products = cr.reaction.pcr_products(self.template, fwd, rev, 1000)
+        assert_equal(len(products), 1)
+        assert_equal(products[0].amplicon, self.template[30:-30])
+        assert_equal(len(products[0]), len(self.template) - 60)
+        assert_equal(cr.reaction.pcr_products(self.template, fwd, rev, 100),
+                     [])
+
+        # Repeated binding sites give every combination that points inwards
+        template = self.template + self.template
+        products = cr.reaction.pcr_products(template, fwd, rev, 1000)
+        assert_equal([(product.start, len(product)) for product in products],
+                     [(30, 140), (230, 140), (30, 340)])
+
+        # Circular templates are amplified over the origin
+        circular = self.template.circularize()
+        fwd = cr.cloning.primer(circular[-60:])
+        rev = cr.cloning.primer(circular[:60].reverse_complement())
+        products = cr.reaction.pcr_products(circular, fwd, rev, 1000)
+        assert_equal(len(products), 1)
+        assert_equal(products[0].amplicon,
+                     cr.reaction.pcr(circular, fwd, rev))
+
+    def test_screen(self):
+        '''Test screening templates against primer pairs.'''
+        fwd, rev = cr.cloning.primers(self.template[30:-30])
+        other = cr.cloning.primers(self.template[100:180])
+        pairs = [(fwd, rev), other, (fwd, fwd)]
+        plasmid_path = os.path.join(os.path.dirname(__file__),
+                                    'pMODKan-HO-pACT1GEV.ape')
+        templates = [self.template, self.template + self.template,
+                     plasmid_path, 'missing.ape']
+        # The plasmid contains the template
+        expected = [('0', 0, (140,), None),
+                    ('0', 1, (80,), None),
+                    ('0', 2, (), 'No products.'),
+                    ('1', 0, (140, 140, 340), None),
+                    ('1', 1, (80, 80, 280), None),
+                    ('1', 2, (), 'No products.'),
+                    (plasmid_path, 0, (140,), None),
+                    (plasmid_path, 1, (80,), None),
+                    (plasmid_path, 2, (), 'No products.')]
+        results = cr.reaction.pcr_screen(templates, pairs, max_size=1000)
+        assert_equal(results[:9], expected)
+        assert_true(all(result.reason.startswith('Could not read') for
+                        result in results[9:]))
+
+        # Same results in worker processes, reporting progress
+        reports = []
+        results = cr.reaction.pcr_screen(templates, pairs, max_size=1000,
+                                         processes=2, chunk_size=1,
+                                         progress=lambda *x: reports.append(x))
+        assert_equal(results[:9], expected)
+        assert_equal(reports, [(i, 4) for i in range(5)])
+
+        # Resuming skips the templates in the checkpoint
+        directory = tempfile.mkdtemp()
+        try:
+            checkpoint = os.path.join(directory, 'screen.csv')
+            first = cr.reaction.pcr_screen(templates[:2], pairs,
+                                           max_size=1000,
+                                           checkpoint=checkpoint)
+            reports = []
+            resumed = cr.reaction.pcr_screen(
+                templates, pairs, max_size=1000, checkpoint=checkpoint,
+                progress=lambda *x: reports.append(x))
+            assert_equal(resumed, results)
+            assert_equal(resumed[:6], first)
+            assert_equal(reports, [(2, 4), (3, 4), (4, 4)])
+
+            # Checkpoints only resume screens with the same pairs and settings
+            assert_raises(ValueError, cr.reaction.pcr_screen, templates,
+                          pairs[:2], max_size=1000, checkpoint=checkpoint)
+            assert_raises(ValueError, cr.reaction.pcr_screen, templates,
+                          pairs[::-1], max_size=1000, checkpoint=checkpoint)
+            assert_raises(ValueError, cr.reaction.pcr_screen, templates,
+                          pairs, max_size=500, checkpoint=checkpoint)
+
+            # The rows of a template that was cut off are screened again
+            with open(checkpoint, 'rb') as checkpoint_file:
+                lines = checkpoint_file.readlines()
+            with open(checkpoint, 'wb') as checkpoint_file:
+                checkpoint_file.writelines(lines[:-2])
+                checkpoint_file.write(lines[-2][:5])
+            reports = []
+            resumed = cr.reaction.pcr_screen(
+                templates, pairs, max_size=1000, checkpoint=checkpoint,
+                progress=lambda *x: reports.append(x))
+            assert_equal(resumed, results)
+            assert_equal(reports, [(3, 4), (4, 4)])
+            with open(checkpoint, 'rb') as checkpoint_file:
+                assert_equal(checkpoint_file.readlines(), lines)
+
+            # Files that can't be parsed are reported too
+            malformed = os.path.join(directory, 'malformed.gb')
+            with open(malformed, 'w') as malformed_file:
+                malformed_file.write('LOCUS       malformed\n')
+            result = cr.reaction.pcr_screen([malformed], pairs[:1])[0]
+            assert_equal(result[:3], (malformed, 0, ()))
+            assert_true(result.reason.startswith('Could not read'))
+        finally:
+            shutil.rmtree(directory)
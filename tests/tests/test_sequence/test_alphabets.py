@@ -0,0 +1,35 @@
+'''
+Tests for sequence alphabets.
+
+'''
+
+from coral.sequence import alphabets
+from coral.sequence.alphabets import Alphabet, AlphabetError
+from nose.tools import assert_equal, assert_false, assert_true, assert_raises
+
+
+def test_validate():
+    assert_equal(alphabets.dna.validate('atgcN-'), 'ATGCN-')
+    assert_raises(AlphabetError, alphabets.dna.validate, 'ATGCR')
+    assert_equal(alphabets.peptide.validate('mk*'), 'MK*')
+    assert_raises(AlphabetError, alphabets.peptide.validate, 'MK.')
+
+
+def test_complement():
+    assert_equal(alphabets.dna.complement('ATGCN-'), 'TACGN-')
+    assert_equal(alphabets.dna.complement('atgc'), 'tacg')
+    assert_equal(alphabets.rna.complement('AUGC'), 'UACG')
+    assert_raises(AlphabetError, alphabets.dna.complement, 'ATGCR')
+    assert_raises(AlphabetError, alphabets.peptide.complement, 'MK')
+
+
+def test_lookups():
+    assert_true(alphabets.dna.valid_lookup[ord('a')])
+    assert_false(alphabets.dna.valid_lookup[ord('R')])
+    assert_equal(alphabets.dna.complement_lookup[ord('G')], ord('C'))
+
+
+def test_recompile():
+    alphabet = Alphabet(symbols='AB')
+    alphabet.symbols = 'ABC'
+    assert_equal(alphabet.validate('abc'), 'ABC')
@@ -0,0 +1,60 @@
+'''
+Tests for the SequenceBatch container.
+
+'''
+
+import coral as cr
+from coral.sequence.alphabets import AlphabetError
+from nose.tools import assert_equal, assert_raises, assert_true
+
+
+class TestSequenceBatch(object):
+    '''Test operations over every member of a batch.'''
+    def __init__(self):
+        self.dnas = [cr.DNA('ATGGCCTAA', name='orf'), cr.DNA('GAATTC'),
+                     cr.DNA('TTCAGGA', circular=True), cr.DNA('')]
+        self.batch = cr.SequenceBatch(self.dnas)
+
+    def test_convert(self):
+        assert_equal(len(self.batch), 4)
+        assert_equal(self.batch.lengths.tolist(), [9, 6, 7, 0])
+        dnas = self.batch.to_dna()
+        assert_equal(dnas, self.dnas)
+        assert_equal(dnas[0].name, 'orf')
+        assert_true(dnas[2].circular)
+        assert_equal(str(self.batch[-3]), 'GAATTC')
+        assert_equal(self.batch[1:3].to_dna(), self.dnas[1:3])
+        assert_equal(self.batch[[2, 0]].names, ['', 'orf'])
+        assert_raises(AlphabetError, cr.SequenceBatch, ['ATGX'])
+
+    def test_reverse_complement(self):
+        expected = [dna.reverse_complement() for dna in self.dnas]
+        assert_equal(self.batch.reverse_complement().to_dna(), expected)
+
+    def test_slice(self):
+        assert_equal([str(dna) for dna in self.batch.slice(-4).to_dna()],
+                     ['CTAA', 'ATTC', 'AGGA', ''])
+        assert_equal([str(dna) for dna in self.batch.slice(1, 3).to_dna()],
+                     ['TG', 'AA', 'TC', ''])
+
+    def test_gc(self):
+        gc = self.batch.gc()
+        assert_equal(gc[:3].tolist(), [dna.gc() for dna in self.dnas[:3]])
+
+    def test_tm(self):
+        batch = self.batch[:3]
+        assert_equal(batch.tm().tolist(),
+                     [cr.thermo.tm(dna) for dna in self.dnas[:3]])
+
+    def test_locate(self):
+        assert_equal(self.batch.locate('GAATTC'),
+                     [[[], []], [[0], [0]], [[], []], [[], []]])
+        # The search wraps around circular sequences
+        assert_equal(self.batch.locate('GATT')[2], [[5], []])
+        assert_equal(self.batch.locate('TNN')[2],
+                     self.dnas[2].locate('TNN'))
+
+    def test_translate(self):
+        peptides = self.batch.translate()
+        assert_equal([str(peptide) for peptide in peptides],
+                     ['MA', 'EF', 'FR', ''])
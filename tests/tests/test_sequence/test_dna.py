@@ -1,5 +1,5 @@
 '''Tests for the DNA sequence class.'''
-from coral import DNA, Feature, RestrictionSite
+from coral import DNA, Feature, RestrictionSite, ssDNA
 from coral.sequence.alphabets import AlphabetError
 from nose.tools import assert_equal, assert_false, assert_true, assert_raises
 from nose.tools import assert_not_equal
@@ -45,6 +45,28 @@ class TestDNA(object):
         assert_false(nonpalindromic_seq_even.is_palindrome())
         assert_false(almost_palindrome_odd.is_palindrome())
 
+    def test_rotation(self):
+        plasmid = DNA('GATTACACCA', circular=True)
+        rotated = plasmid.rotate(3)
+        assert_true(plasmid.is_rotation(rotated))
+        assert_false(plasmid.is_rotation(DNA('GATTACACCT', circular=True)))
+        assert_equal(plasmid.top.min_rotation(), 4)
+        assert_equal(str(plasmid.canonical()), 'ACACCAGATT')
+        assert_equal(len(set([plasmid.canonical(), rotated.canonical()])), 1)
+        assert_true(DNA('ATAT', circular=True).is_rotation(DNA('TATA')))
+
+    def test_digest(self):
+        digest = self.test_dna.digest()
+        assert_equal(digest, '9d792439e47aed8c747cc4c034d136ae')
+        assert_equal(DNA('ATGC', bottom='GCAT').digest(), digest)
+        assert_not_equal(DNA('ATGC', bottom='GCA-').digest(), digest)
+        assert_not_equal(self.test_dna.circularize().digest(), digest)
+        copy = self.test_dna.copy()
+        assert_equal(copy.digest(), digest)
+        copy[0] = 'T'
+        assert_not_equal(copy.digest(), digest)
+        assert_equal(len(set([self.test_dna, DNA('ATGC', bottom='GCAT')])), 1)
+
     def test_getitem(self):
         assert_equal(str(self.test_dna[0]), 'A')
         assert_equal(str(self.test_dna[1]), 'T')
@@ -230,6 +252,97 @@ class TestFeatures(object):
         assert_true(self.dna.features[0] != self.dna.features[4])
         assert_false(self.dna.features[0] != self.dna.features[0])
 
+    def test_rotate(self):
+        rotated = self.dna.circularize().rotate(-30)
+        coding = rotated.select_features('Coding Feature')[0]
+        assert_equal((coding.start, coding.stop), (191, 10))
+        utr3 = rotated.select_features('3\'UTR Feature')[0]
+        assert_equal((utr3.start, utr3.stop), (111, 130))
+        # Features that cross the origin aren't kept when slicing
+        names = [feature.name for feature in rotated[:100].features]
+        assert_equal(names, ['Primer Feature', 'Promoter Feature',
+                             'Terminator Feature', 'RBS Feature'])
+        # Features ending at the end of the sequence keep their stop
+        end = DNA('ATGC', circular=True,
+                  features=[Feature('End', 2, 4, 'misc_feature')])
+        end_feature = end.rotate(0).features[0]
+        assert_equal((end_feature.start, end_feature.stop), (2, 4))
+
+    def test_rotate_zero_length_end(self):
+        # A zero-length feature at the end of the sequence moves to the
+        # origin when rotated, so it isn't in a slice that ends there
+        dna = DNA('ACGT' * 4 + 'AC', circular=True,
+                  features=[Feature('Last', 17, 18, 'misc_feature'),
+                            Feature('Empty', 17, 17, 'misc_feature')])
+        assert_equal(dna.excise(dna.features[0]).features, [])
+        assert_equal(dna.rotate(1)[1:18].features, [])
+        rotated = dna.rotate(1)
+        assert_equal(len(rotated.features), 2)
+        assert_equal(rotated[1:18].features, [])
+
+    def test_add(self):
+        added = self.dna[:50] + self.dna[50:]
+        assert_equal([feature.name for feature in added.features][:3],
+                     ['Misc Feature', 'Misc Feature', 'Coding Feature'])
+        assert_equal(added.features[-1],
+                     Feature('Origin Feature', 161, 180, 'rep_origin'))
+
+    def test_copy(self):
+        copy = self.dna.copy()
+        self.dna.features[2].move(5)
+        assert_equal(copy.features[2],
+                     Feature('Coding Feature', 21, 40, 'CDS'))
+
+    def test_edit_after_copy(self):
+        # Features are copied when the new sequence is made, even though
+        # they're only moved when they're read
+        copy = self.dna.copy()
+        rotated = self.dna.circularize().rotate(3)
+        added = self.dna + self.dna
+        repeated = self.dna * 2
+        self.dna.features[0].name = 'changed'
+        self.dna.features[0].strand = 1
+        for derived in [copy, rotated, added, repeated]:
+            assert_equal(derived.features[0].name, 'Misc Feature')
+            assert_equal(derived.features[0].strand, 0)
+        assert_equal(copy.copy().features[0].name, 'Misc Feature')
+
+    def test_copy_shares_features(self):
+        # Features are only copied when they're first read
+        copied = []
+        feature_copy = Feature.__dict__['copy']
+
+        def counting_copy(feature):
+            copied.append(feature)
+            return feature_copy(feature)
+        Feature.copy = counting_copy
+        try:
+            circular = self.dna.circularize()
+            derived = [self.dna.copy(), circular.rotate(3),
+                       self.dna + self.dna, self.dna * 2,
+                       self.dna.copy().copy()]
+            assert_equal(copied, [])
+            assert_equal(len(derived[0].features), 10)
+            assert_equal(len(copied), 10)
+        finally:
+            Feature.copy = feature_copy
+
+    def test_queries(self):
+        features = self.dna.features
+        assert_equal([feature.name for feature in
+                      features.overlapping(35, 45)],
+                     ['Coding Feature', 'Primer Feature'])
+        assert_equal([feature.name for feature in features.within(20, 62)],
+                     ['Coding Feature', 'Primer Feature'])
+        features[3].move(100)
+        assert_equal([feature.name for feature in features.within(20, 62)],
+                     ['Coding Feature'])
+        features.append(Feature('Wrap', 190, 5, 'misc_feature'))
+        overlapping = features.overlapping(195, 200)
+        assert_equal([feature.name for feature in overlapping], ['Wrap'])
+        assert_equal([feature.name for feature in features.within(185, 10)],
+                     ['Wrap'])
+
 
 class TestRestrictionSite(object):
     '''Test RestrictionSite class.'''
@@ -246,3 +359,146 @@ class TestRestrictionSite(object):
         '''Test len function.'''
         assert_equal(len(self.ecorv), 6)
         assert_equal(len(self.foki), 5)
+
+
+class TestPackedDNA(object):
+    '''Test DNA stored in 2-bit packed form.'''
+    def __init__(self):
+        self.seq = 'ATGCNNATGC-GGCCATTTAGC' * 3
+        self.dna = DNA(self.seq)
+        self.packed = DNA(self.seq, packed=True)
+
+    def test_str(self):
+        assert_true(self.packed.packed)
+        assert_equal(str(self.packed), str(self.dna))
+        assert_equal(self.packed.bottom.seq, self.dna.bottom.seq)
+
+    def test_getitem(self):
+        for key in [slice(3, 20), slice(-15, None), slice(None, -4),
+                    slice(None, None, -1), slice(5, 5)]:
+            assert_equal(self.packed[key], self.dna[key])
+        for i in [0, 4, -1]:
+            assert_equal(self.packed[i], self.dna[i])
+        assert_true(self.packed[3:20].packed)
+
+    def test_locate(self):
+        assert_equal(self.packed.locate('GCNNA'), self.dna.locate('GCNNA'))
+        assert_equal(self.packed.circularize().locate('AGCATG'),
+                     self.dna.circularize().locate('AGCATG'))
+
+    def test_reverse_complement(self):
+        assert_equal(self.packed.reverse_complement(),
+                     self.dna.reverse_complement())
+
+    def test_shared_buffer(self):
+        packed = self.dna.pack()
+        assert_true(packed.top._seq._data is packed.bottom._seq._data)
+        assert_equal(packed, self.dna)
+
+    def test_setitem(self):
+        packed = self.packed.copy()
+        packed[0] = 'C'
+        assert_true(packed.packed)
+        assert_equal(str(packed), 'C' + self.seq[1:])
+
+
+class TestLazyBottom(object):
+    '''Test the on-demand bottom strand of DNA.'''
+    def __init__(self):
+        self.dna = DNA('ATGCGATAGCGATAGC')
+
+    def test_derived(self):
+        dna = self.dna.copy()
+        assert_true(dna._explicit_bottom() is None)
+        assert_equal(str(dna.bottom), str(dna.top.reverse_complement()))
+        dna.top.seq = 'AAAACCCC'
+        assert_equal(str(dna.bottom), 'GGGGTTTT')
+
+    def test_edit_bottom(self):
+        dna = self.dna.copy()
+        dna.bottom[0] = 'A'
+        assert_equal(str(dna.bottom), 'ACTATCGCTATCGCAT')
+        assert_equal(str(dna.copy().bottom), 'ACTATCGCTATCGCAT')
+
+    def test_setitem(self):
+        dna = DNA('ATGC', bottom='GCA-')
+        dna[0] = 'G'
+        assert_equal(str(dna.bottom), 'GCAC')
+        del dna[1]
+        assert_equal(str(dna), 'GGC')
+        assert_equal(str(dna.bottom), 'GCC')
+
+    def test_operations(self):
+        dna = self.dna.circularize()
+        assert_true(dna.bottom.circular)
+        assert_false(dna.linearize().bottom.circular)
+        assert_equal(str(dna.rotate(3).bottom),
+                     str(dna.bottom.rotate(-3)))
+        assert_equal(str((dna[:5] + dna[5:]).bottom), str(dna.bottom))
+        assert_equal(hash(self.dna), hash(self.dna.copy()))
+
+
+class TestSliceViews(object):
+    '''Test that slices share their parent's sequence until copied.'''
+    def __init__(self):
+        self.seq = 'ATGCGATAGCGATAGC' * 4
+        self.dna = DNA(self.seq)
+
+    def test_view(self):
+        sliced = self.dna[5:30]
+        assert_true(sliced.top._seq._parent is self.dna.top._seq)
+        assert_equal(str(sliced), self.seq[5:30])
+        assert_equal(str(sliced[3:-3]), self.seq[8:27])
+        assert_equal(str(sliced[::-1]), self.seq[5:30][::-1])
+        assert_equal(sliced[-1], DNA(self.seq[29]))
+
+    def test_nested_view(self):
+        nested = self.dna[5:30][3:10]
+        assert_true(nested.top._seq._parent is self.dna.top._seq)
+        assert_equal(str(nested), self.seq[8:15])
+
+    def test_copy(self):
+        copy = self.dna[5:30].copy()
+        assert_true(isinstance(copy.top._seq, str))
+        assert_equal(str(copy), self.seq[5:30])
+
+    def test_mutate(self):
+        sliced = self.dna[5:30]
+        sliced[0] = 'C'
+        assert_equal(str(sliced), 'C' + self.seq[6:30])
+        assert_equal(str(self.dna), self.seq)
+
+    def test_bottom(self):
+        dna = DNA('ATGCATGC', bottom='GCATGCA-')
+        assert_equal(str(dna[2:6].bottom), 'ATGC')
+        assert_equal(str(dna[4:].bottom), 'GCAT')
+
+
+class TestConcatenation(object):
+    '''Test that repeated additions share chunks until flattened.'''
+    def test_sum(self):
+        parts = [DNA(seq) for seq in ['ATGC', 'GGCC', 'TTAA', 'CAGT']]
+        total = sum(parts)
+        assert_equal(len(total.top._seq._chunks), 4)
+        assert_equal(str(total), 'ATGCGGCCTTAACAGT')
+        assert_equal(str(total.bottom), 'ACTGTTAAGGCCGCAT')
+        assert_equal(total[5], DNA('G'))
+        assert_equal(str(total[2:6]), 'GCGG')
+
+    def test_branch(self):
+        base = DNA('ATGC') + DNA('GGCC')
+        first = base + DNA('AAAA')
+        second = base + DNA('TTTT')
+        assert_equal(str(first), 'ATGCGGCCAAAA')
+        assert_equal(str(second), 'ATGCGGCCTTTT')
+        assert_equal(str(base), 'ATGCGGCC')
+
+    def test_mul(self):
+        dna = DNA('ATGCAT')
+        dna.features.append(Feature('site', 1, 4, 'misc_feature'))
+        repeated = dna * 3
+        assert_equal(str(repeated), 'ATGCAT' * 3)
+        assert_equal([(f.start, f.stop) for f in repeated.features],
+                     [(1, 4), (7, 10), (13, 16)])
+        assert_equal(str(dna * 0), '')
+        assert_equal(str(ssDNA('ATG') * 2), 'ATGATG')
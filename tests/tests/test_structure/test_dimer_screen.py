@@ -0,0 +1,29 @@
+'''Tests for the dimer and hairpin screen.'''
+import coral as cr
+from nose.tools import assert_almost_equal, assert_equal, assert_raises
+
+
+def test_dimer_screen():
+    # The 3' end of the first primer binds the middle of the second
+    bound = 'TTTTTTTTTTTTGACGGC'
+    partner = 'CCCCCCCCGCCGTCCCCCCCC'
+    # Self-complementary ends make a hairpin and a self-dimer
+    hairpin = 'GCGCGCAAAAAAAAAAAAAGCGCGC'
+    interactions = cr.structure.dimer_screen([bound, partner, hairpin])
+    assert_equal([interaction[:4] for interaction in interactions],
+                 [('dimer', 2, 2, 6), ('hairpin', 2, 2, 6),
+                  ('dimer', 0, 1, 6)])
+    assert_almost_equal(interactions[2].dg, -5.345, places=3)
+
+    assert_equal(cr.structure.dimer_screen([bound, partner], max_dg=-6), [])
+    assert_equal(cr.structure.dimer_screen([bound, partner], min_run=7), [])
+    # Loops must be long enough
+    assert_equal(cr.structure.dimer_screen([hairpin[:6] + 'AA' +
+                                            hairpin[-6:]], max_dg=0)[0].kind,
+                 'dimer')
+
+    # Overhangs are included
+    primer = cr.Primer(cr.ssDNA(bound), 50, overhang=cr.ssDNA('GCCGTC'))
+    assert_equal([interaction.kind for interaction in
+                  cr.structure.dimer_screen([primer])], ['dimer', 'hairpin'])
+    assert_raises(ValueError, cr.structure.dimer_screen, [bound], min_run=0)
@@ -1,6 +1,8 @@
 '''Tests for the Tm analysis class.'''
 
-from nose.tools import assert_equal
+from nose.tools import assert_almost_equal, assert_equal, assert_raises
+from nose.tools import assert_false, assert_true
+import numpy as np
 import coral as cr
 
 
@@ -9,3 +11,94 @@ def test_finnzymes():
 
     melt = cr.thermo.tm(cr.DNA('ATGCGATAGCGATAGC'), parameters='cloning')
     assert_equal(melt, 55.2370030020752)
+
+
+def test_tm_batch():
+    '''Tests that batch Tms match single Tms for every parameter set.'''
+
+    seqs = ['ATGCGATAGCGATAGC', 'AATT', 'GCGC', 'A', 'TTTTAGGCAATGCA']
+    for parameters in ['breslauer', 'sugimoto', 'santalucia96',
+                       'santalucia98', 'cloning_sl98', 'cloning']:
+        melts = cr.thermo.tm_batch(seqs, parameters=parameters)
+        expected = [cr.thermo.tm(cr.DNA(seq), parameters=parameters) for
+                    seq in seqs]
+        assert_equal(melts.tolist(), expected)
+    assert_raises(ValueError, cr.thermo.tm_batch, ['ATNG'])
+    assert_raises(ValueError, cr.thermo.tm_batch, ['ATG'], parameters='x')
+
+
+def test_tm_profile():
+    '''Tests that profile Tms match Tms of the windows.'''
+
+    template = 'ATGCGATAGCGATAGCGAATTCTTTTAGGCAATGCANA'
+    profile = cr.thermo.TmProfile(template)
+    for start, stop in [(0, 16), (16, 22), (3, 30), (35, 36)]:
+        expected = cr.thermo.tm(cr.DNA(template[start:stop]))
+        assert_almost_equal(profile.tm(start, stop), expected, places=9)
+    windows = profile.tm_windows([6, 16])
+    assert_equal(windows.shape, (2, len(template)))
+    assert_almost_equal(windows[0, 16], profile.tm(16, 22), places=9)
+    assert_true(np.isnan(windows[1, 30]))
+    assert_raises(ValueError, profile.tm, 30, 38)
+    assert_raises(ValueError, profile.tm, 5, 5)
+    assert_raises(ValueError, cr.thermo.TmProfile('').tm, 0, 0)
+
+
+def test_thermo_model():
+    '''Tests using and registering ThermoModel instances.'''
+
+    seq = 'ATGCGATAGCGATAGC'
+    cloning = cr.thermo.get_model('cloning')
+    assert_equal(cr.thermo.tm(seq, parameters=cloning), 55.2370030020752)
+    assert_raises(ValueError, cr.thermo.get_model, 'x')
+
+    # A registered model is available by name everywhere
+    model = cr.thermo.ThermoModel('test_model', cr.thermo.tm_params.CLONING,
+                                  offsets=(3.4, 12.4))
+    assert_raises(ValueError, cr.thermo.tm, seq, parameters='test_model')
+    cr.thermo.register_model(model)
+    try:
+        assert_equal(cr.thermo.tm(seq, parameters='test_model'),
+                     55.2370030020752)
+    finally:
+        # Don't leave the model registered for other tests
+        del cr.thermo.models._MODELS['test_model']
+    assert_raises(ValueError, cr.thermo.get_model, 'test_model')
+    assert_equal(cr.thermo.tm_batch([seq], parameters=model).tolist(),
+                 [55.2370030020752])
+    assert_raises(ValueError, cr.thermo.ThermoModel, 'bad',
+                  cr.thermo.tm_params.CLONING, corrections='x')
+
+
+def test_tm_cache():
+    '''Tests memoizing Tms.'''
+
+    cache = cr.thermo.tm_cache
+    seq = 'ATGCGATAGCGATAGC'
+    with cache.enabled_in(maxsize=2, clear=True):
+        assert_equal(cr.thermo.tm(cr.DNA(seq)), 55.2370030020752)
+        assert_equal(cr.thermo.tm(seq.lower()), 55.2370030020752)
+        assert_equal(cache.info(), (1, 1, 2, 1))
+        cr.thermo.tm(seq, parameters='santalucia98')
+        cr.thermo.tm(seq, salt_conc=100)
+        assert_equal(cache.info(), (1, 3, 2, 2))
+        with cache.disabled_in():
+            cr.thermo.tm(seq)
+        assert_equal(cache.info().misses, 3)
+    assert_false(cache.enabled)
+    cr.thermo.tm(seq)
+    assert_equal(cache.info().misses, 3)
+    cache.clear()
+    assert_equal(cache.info(), (0, 0, 4096, 0))
+    assert_raises(ValueError, cr.thermo.LRUCache, 0)
+
+    # Results that don't fit once the size is restored are discarded,
+    # oldest first
+    small = cr.thermo.LRUCache(maxsize=2)
+    with small.enabled_in(maxsize=4):
+        for i in range(4):
+            small.lookup(i, lambda: i)
+    assert_equal(len(small), 2)
+    with small.enabled_in():
+        assert_equal(small.lookup(3, lambda: None), 3)
+        assert_equal(small.lookup(0, lambda: None), None)